@@ -1,49 +1,48 @@
-import cv2
 import os
 import argparse
+import json
+import sys
+import time
+from collections import deque
+from functools import lru_cache, partial
 
-from src.vision.card_recognizer import CardRecognizer
-from src.logic.poker_logic import calculate_equity as calculate_poker_equity
-from src.logic.blackjack_logic import get_basic_strategy_move, calculate_win_probability as calculate_blackjack_win_prob
-from src.llm.llm_coach import get_poker_advice, get_blackjack_advice
+# Moduły wizji (cv2, ultralytics), trenera (ollama) i serwera są importowane dopiero w ścieżkach,
+# które ich używają, dzięki czemu analiza rąk podanych tekstem (--cards) startuje w ułamku sekundy.
+from src.logic.hand_evaluator import card_to_int
+from src.logic.poker_logic import calculate_equity as calculate_poker_equity, validate_cards, validate_opponents
+from src.logic.blackjack_logic import MOVE_MAP, calculate_hand_value, get_basic_strategy_move, calculate_outcome_probabilities as calculate_blackjack_outcomes
+from src.logic.blackjack_ev import ShoeTracker, best_action, calculate_action_evs
 import src.config as config
+from src.metrics import METRICS, profile_once, start_console_reporter, start_prometheus_server
 
 def assign_poker_cards(detections):
+    import numpy as np
+    labels = detections.labels
     if len(detections) < 2:
-        return [], [d['label'] for d in detections]
-    detections.sort(key=lambda d: (d['box'][1] + d['box'][3]) / 2, reverse=True)
-    player_detections = detections[:2]
-    table_detections = detections[2:]
-    table_detections.sort(key=lambda d: d['box'][0])
-    return [d['label'] for d in player_detections], [d['label'] for d in table_detections]
+        return [], labels
+    # Dwie najniższe karty (największe y środka) to ręka gracza, reszta to stół od lewej do prawej.
+    by_height = np.argsort(-detections.centers_y, kind='stable')
+    table = by_height[2:][np.argsort(detections.boxes[by_height[2:], 0], kind='stable')]
+    return [labels[i] for i in by_height[:2]], [labels[i] for i in table]
 
 def assign_blackjack_cards(detections):
-    if not detections:
+    import numpy as np
+    if not len(detections):
         return [], []
-    detections.sort(key=lambda d: (d['box'][1] + d['box'][3]) / 2, reverse=True)
-    
-    player_cards = []
-    dealer_cards = []
-    
+    labels = detections.labels
     if len(detections) < 2:
-        return [d['label'] for d in detections], []
-        
-    hand_threshold_y = (detections[0]['box'][1] + detections[0]['box'][3]) / 2
-    hand_threshold_y -= 50
+        return labels, []
 
-    for det in detections:
-        if (det['box'][1] + det['box'][3]) / 2 > hand_threshold_y:
-            player_cards.append(det['label'])
-        else:
-            dealer_cards.append(det['label'])
-            
-    return player_cards, dealer_cards
+    centers_y = detections.centers_y
+    by_height = np.argsort(-centers_y, kind='stable')
+    hand_threshold_y = centers_y[by_height[0]] - 50
+    is_player = centers_y[by_height] > hand_threshold_y
+    return [labels[i] for i in by_height[is_player]], [labels[i] for i in by_height[~is_player]]
 
 def draw_analysis_on_image(image, detections, player_cards):
+    import cv2
     output_image = image.copy()
-    for det in detections:
-        box = list(map(int, det['box']))
-        label = det['label']
+    for box, label in zip(detections.boxes.astype(int).tolist(), detections.labels):
         color = (255, 200, 0)
         if label in player_cards:
             color = (0, 255, 0)
@@ -51,60 +50,405 @@ def draw_analysis_on_image(image, detections, player_cards):
         cv2.putText(output_image, f"{label}", (box[0], box[1] - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
     return output_image
 
+def draw_summary_on_image(image, lines):
+    import cv2
+    for i, line in enumerate(lines):
+        position = (10, 30 + i * 30)
+        cv2.putText(image, line, position, cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 0), 4)
+        cv2.putText(image, line, position, cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    return image
+
+def draw_live_overlay(frame, detections, result, advice=None):
+    if detections is None:
+        return frame
+    player_cards = result['player_cards'] if result else []
+    output_image = draw_analysis_on_image(frame, filter_unique_detections(detections), player_cards)
+    if result:
+        lines = list(result['summary'])
+        if advice:
+            # Ostatni fragment strumieniowanej porady w jednej linii.
+            lines.append("AI: " + advice.replace('\n', ' ')[-config.OVERLAY_ADVICE_CHARS:])
+        draw_summary_on_image(output_image, lines)
+    return output_image
+
 def filter_unique_detections(detections):
-    unique_detections = []
-    seen_labels = set()
-    for det in sorted(detections, key=lambda x: x['conf'], reverse=True):
-        if det['label'] not in seen_labels:
-            unique_detections.append(det)
-            seen_labels.add(det['label'])
-    return unique_detections
+    return detections.unique()
 
-def analyze_poker_frame(frame, recognizer):
-    detections, _ = recognizer.recognize(frame)
-    unique_detections = filter_unique_detections(detections)
-    if not unique_detections: return None
-    my_cards, community_cards = assign_poker_cards(unique_detections)
-    
-    print("\n--- ANALIZA POKERA ---")
-    print(f"Ręka: {my_cards}, Stół: {community_cards}")
-    
-    equity = calculate_poker_equity(my_cards, community_cards, config.POKER_NUM_OPPONENTS, config.POKER_SIMULATIONS_COUNT)
+# Wyniki liczone są raz na kanoniczny stan stołu (posortowane karty, liczba przeciwników),
+# więc ta sama ręka w kolejnych klatkach nie uruchamia ponownie symulacji. Porady trenera AI nie trafiają
+# do tej pamięci: udane odpowiedzi zapamiętuje pamięć porad, a błąd połączenia nie może zostać na stałe.
+@lru_cache(maxsize=config.RESULT_CACHE_SIZE)
+def _poker_state_result(my_cards, community_cards, num_opponents, ranges=None):
+    my_cards, community_cards = list(my_cards), list(community_cards)
+    equity_note = ""
+    with METRICS.timer('equity'):
+        if ranges:
+            from src.logic.poker_ranges import calculate_range_equity
+            equity = calculate_range_equity(my_cards, community_cards, ranges, config.POKER_SIMULATIONS_COUNT)
+            equity_note = f" (zakresy przeciwników: {' | '.join(ranges)})"
+        elif config.POKER_EQUITY_MODE == 'adaptive':
+            from src.logic.poker_adaptive import calculate_equity_adaptive
+            equity, (low, high), samples = calculate_equity_adaptive(my_cards, community_cards, num_opponents)
+            equity_note = f" (95% CI: {low:.2%} - {high:.2%}, próbek: {samples})"
+        else:
+            equity = calculate_poker_equity(my_cards, community_cards, num_opponents, config.POKER_SIMULATIONS_COUNT)
     game_stage = "Pre-flop" if not community_cards else "Flop" if len(community_cards) <= 3 else "Turn" if len(community_cards) == 4 else "River"
-    print(f"Szansa na wygraną: {equity:.2%}")
+    return equity, equity_note, game_stage
+
+def _poker_advice(my_cards, community_cards, equity, num_opponents, game_stage, quiet=False):
+    if not quiet:
+        print("\nPytam trenera AI o poradę dla POKERA...", file=sys.stderr)
+    from src.llm.llm_coach import get_poker_advice
+    with METRICS.timer('llm'):
+        return get_poker_advice(list(my_cards), list(community_cards), equity, num_opponents, game_stage)
+
+@lru_cache(maxsize=config.RESULT_CACHE_SIZE)
+def _blackjack_state_result(player_cards, dealer_up_card, shoe):
+    player_cards = list(player_cards)
+    action_evs = None
+    with METRICS.timer('blackjack_move'):
+        if config.BLACKJACK_USE_EV_ENGINE:
+            action_evs = calculate_action_evs(player_cards, dealer_up_card, shoe)
+            move_code = best_action(action_evs)
+            move_str, player_value = MOVE_MAP[move_code], calculate_hand_value(player_cards)
+        else:
+            move_str, move_code, player_value = get_basic_strategy_move(player_cards, dealer_up_card)
+    with METRICS.timer('blackjack_outcomes'):
+        win_prob = calculate_blackjack_outcomes(player_cards, dealer_up_card, move_code, shoe)[0]
+    return action_evs, move_code, move_str, player_value, win_prob
+
+def _blackjack_advice(player_cards, dealer_up_card, move_str, player_value, quiet=False):
+    if not quiet:
+        print("\nPytam trenera AI o poradę dla BLACKJACKA...", file=sys.stderr)
+    from src.llm.llm_coach import get_blackjack_advice
+    with METRICS.timer('llm'):
+        return get_blackjack_advice(list(player_cards), dealer_up_card, move_str, player_value)
+
+def cache_stats(recognizer=None):
+    stats = {}
+    for game, cached in (('poker', _poker_state_result), ('blackjack', _blackjack_state_result)):
+        info = cached.cache_info()
+        stats[game] = {'hits': info.hits, 'misses': info.misses, 'size': info.currsize}
+    # Opakowania rozpoznawania (FrameGate, RoiRecognizer) udostępniają własne liczniki.
+    while recognizer is not None:
+        if hasattr(recognizer, 'stats'):
+            stats[recognizer.stats_key] = recognizer.stats()
+        recognizer = getattr(recognizer, 'recognizer', None)
+    return stats
 
-    print("\nPytam trenera AI o poradę dla POKERA...")
-    advice = get_poker_advice(my_cards, community_cards, equity, config.POKER_NUM_OPPONENTS, game_stage)
-    print("\n--- PORADA TRENERA AI ---\n" + advice)
+def _no_print(*args, **kwargs):
+    pass
+
+# quiet=True wyłącza komunikaty w konsoli, np. w procesach serwera analizy obsługujących każde zapytanie HTTP.
+def analyze_poker_detections(detections, advise=True, quiet=False):
+    log = _no_print if quiet else print
+    with METRICS.timer('assign'):
+        unique_detections = filter_unique_detections(detections)
+        if not unique_detections: return None
+        my_cards, community_cards = assign_poker_cards(unique_detections)
     
-    return draw_analysis_on_image(frame, unique_detections, my_cards)
+    log("\n--- ANALIZA POKERA ---")
+    log(f"Ręka: {my_cards}, Stół: {community_cards}")
+    try:
+        validate_cards([card_to_int(card) for card in my_cards], [card_to_int(card) for card in community_cards])
+    except ValueError as e:
+        log(f"Nie można policzyć equity: {e}.")
+        return None
+
+    ranges = tuple(config.POKER_OPPONENT_RANGES or ())
+    num_opponents = len(ranges) or config.POKER_NUM_OPPONENTS
+    equity, equity_note, game_stage = _poker_state_result(
+        tuple(sorted(my_cards)), tuple(sorted(community_cards)), num_opponents, ranges)
+    log(f"Szansa na wygraną: {equity:.2%}{equity_note}")
+    advice = _poker_advice(my_cards, community_cards, equity, num_opponents, game_stage, quiet) if advise else None
+    if advice is not None:
+        log("\n--- PORADA TRENERA AI ---\n" + advice)
 
-def analyze_blackjack_frame(frame, recognizer):
-    detections, _ = recognizer.recognize(frame)
-    unique_detections = filter_unique_detections(detections)
-    if not unique_detections: return None
-    player_cards, dealer_cards = assign_blackjack_cards(unique_detections)
+    return {
+        'game': 'poker', 'detections': unique_detections, 'player_cards': my_cards,
+        'community_cards': community_cards, 'num_opponents': num_opponents, 'equity': equity, 'stage': game_stage,
+        'advice': advice, 'summary': [f"{game_stage}: {' '.join(my_cards)} | {' '.join(community_cards)}", f"Equity: {equity:.1%}"],
+    }
+
+def analyze_blackjack_detections(detections, shoe_tracker=None, advise=True, quiet=False):
+    log = _no_print if quiet else print
+    # But liczy każdą wykrytą kartę, także gdy ręki gracza i krupiera nie da się rozdzielić.
+    shoe = shoe_tracker.observe(detections.labels) if shoe_tracker else None
+    with METRICS.timer('assign'):
+        unique_detections = filter_unique_detections(detections)
+        if not unique_detections: return None
+        player_cards, dealer_cards = assign_blackjack_cards(unique_detections)
 
     if not player_cards or not dealer_cards:
-        print("Nie można rozpoznać ręki gracza i krupiera.")
+        log("Nie można rozpoznać ręki gracza i krupiera.")
         return None
-        
+
     dealer_up_card = dealer_cards[0]
-    
-    print("\n--- ANALIZA BLACKJACKA ---")
-    print(f"Twoja ręka: {player_cards}, Krupier pokazuje: {dealer_up_card}")
-    
-    move_str, move_code, player_value = get_basic_strategy_move(player_cards, dealer_up_card)
-    win_prob = calculate_blackjack_win_prob(player_cards, dealer_up_card, move_code)
-    
-    print(f"Twoja wartość: {player_value}, Rekomendowany ruch: {move_str}")
-    print(f"Szansa na wygraną przy tym ruchu: {win_prob:.2%}")
 
-    print("\nPytam trenera AI o poradę dla BLACKJACKA...")
-    advice = get_blackjack_advice(player_cards, dealer_up_card, move_str, player_value)
-    print("\n--- PORADA TRENERA AI ---\n" + advice)
+    log("\n--- ANALIZA BLACKJACKA ---")
+    log(f"Twoja ręka: {player_cards}, Krupier pokazuje: {dealer_up_card}")
+
+    action_evs, move_code, move_str, player_value, win_prob = _blackjack_state_result(
+        tuple(sorted(player_cards)), dealer_up_card, shoe)
+    if action_evs:
+        log("EV akcji: " + ", ".join(f"{code}: {ev:+.3f}" for code, ev in action_evs.items()))
+
+    if shoe_tracker:
+        log(f"Kart w bucie: {shoe_tracker.cards_remaining}")
+    log(f"Twoja wartość: {player_value}, Rekomendowany ruch: {move_str}")
+    log(f"Szansa na wygraną przy tym ruchu: {win_prob:.2%}")
+    advice = _blackjack_advice(player_cards, dealer_up_card, move_str, player_value, quiet) if advise else None
+    if advice is not None:
+        log("\n--- PORADA TRENERA AI ---\n" + advice)
+
+    return {
+        'game': 'blackjack', 'detections': unique_detections, 'player_cards': player_cards,
+        'dealer_cards': dealer_cards, 'player_value': player_value, 'move_code': move_code,
+        'action_evs': action_evs, 'win_probability': win_prob, 'advice': advice,
+        'summary': [f"{' '.join(player_cards)} ({player_value}) vs {dealer_up_card}", f"{move_code} | wygrana: {win_prob:.1%}"],
+    }
+
+@METRICS.timed('frame')
+def analyze_poker_frame(frame, recognizer):
+    with METRICS.timer('recognize'):
+        detections, _ = recognizer.recognize(frame)
+    result = analyze_poker_detections(detections)
+    if result is None: return None
+    with METRICS.timer('draw'):
+        return draw_analysis_on_image(frame, result['detections'], result['player_cards'])
+
+@METRICS.timed('frame')
+def analyze_blackjack_frame(frame, recognizer, shoe_tracker=None):
+    with METRICS.timer('recognize'):
+        detections, _ = recognizer.recognize(frame)
+    result = analyze_blackjack_detections(detections, shoe_tracker)
+    if result is None: return None
+    with METRICS.timer('draw'):
+        return draw_analysis_on_image(frame, result['detections'], result['player_cards'])
 
-    return draw_analysis_on_image(frame, unique_detections, player_cards)
+def request_streamed_advice(result, coach):
+    """Porada dla wyniku analizy strumieniowana w tle (CoachSession) do konsoli; nowy stan anuluje poprzednią."""
+    from src.llm.llm_coach import blackjack_prompt, poker_prompt
+    if result['game'] == 'poker':
+        key, prompt, suit_mapping = poker_prompt(result['player_cards'], result['community_cards'], result['equity'],
+                                                 result['num_opponents'], result['stage'])
+    else:
+        key, prompt, suit_mapping = blackjack_prompt(result['player_cards'], result['dealer_cards'][0],
+                                                     MOVE_MAP[result['move_code']], result['player_value'])
+    if key != coach.key:
+        print("\n--- PORADA TRENERA AI ---")
+    coach.request(key, prompt, suit_mapping, on_token=lambda token: print(token, end='', flush=True))
+
+def analyze_live_detections(detections, analyze_detections, coach):
+    result = analyze_detections(detections, advise=False)
+    if result is not None:
+        request_streamed_advice(result, coach)
+    return result
+
+def parse_cards(text, unique=True):
+    """
+    Karty z tekstu ("AS KD", "10h,jh"); ValueError dla nieznanej karty, a przy unique=True także dla powtórzonej
+    (blackjack z kilku talii dopuszcza jednakowe karty).
+    """
+    cards = text.replace(',', ' ').upper().split()
+    for card in cards:
+        try:
+            card_to_int(card)
+        except KeyError:
+            raise ValueError(f"nieznana karta '{card}'")
+    if unique and len(set(map(card_to_int, cards))) != len(cards):
+        raise ValueError(f"powtórzona karta w '{text.strip()}'")
+    return cards
+
+def analyze_spot(game, cards, table, num_opponents=None, advise=False, ranges=None):
+    """
+    Analiza rąk podanych tekstem, bez rozpoznawania obrazu: `table` to karty stołu (poker)
+    albo odkryta karta krupiera (blackjack), `ranges` - zakresy przeciwników pokera. Zwraca rekord JSON.
+    """
+    if game == 'poker':
+        player_cards, community_cards = parse_cards(cards), parse_cards(table or '')
+        if num_opponents is not None and num_opponents < 1:
+            raise ValueError(f"liczba przeciwników musi być co najmniej 1, podano {num_opponents}")
+        ranges = tuple(ranges or config.POKER_OPPONENT_RANGES or ())
+        num_opponents = len(ranges) or (config.POKER_NUM_OPPONENTS if num_opponents is None else num_opponents)
+        if len(player_cards) != 2 or len(community_cards) > 5:
+            raise ValueError("poker wymaga 2 kart gracza i najwyżej 5 kart stołu")
+        parse_cards(' '.join(player_cards + community_cards))  # karta nie może być jednocześnie w ręce i na stole
+        validate_opponents(num_opponents, player_cards, community_cards)
+        equity, _, game_stage = _poker_state_result(
+            tuple(sorted(player_cards)), tuple(sorted(community_cards)), num_opponents, ranges)
+        advice = _poker_advice(player_cards, community_cards, equity, num_opponents, game_stage) if advise else None
+        return {'game': 'poker', 'player_cards': player_cards, 'community_cards': community_cards,
+                'num_opponents': num_opponents, 'opponent_ranges': list(ranges) or None, 'equity': equity, 'stage': game_stage, 'advice': advice}
+    player_cards, dealer_cards = parse_cards(cards, unique=False), parse_cards(table or '', unique=False)
+    if len(player_cards) < 2 or len(dealer_cards) != 1:
+        raise ValueError("blackjack wymaga co najmniej 2 kart gracza i jednej karty krupiera")
+    action_evs, move_code, move_str, player_value, win_prob = _blackjack_state_result(
+        tuple(sorted(player_cards)), dealer_cards[0], None)
+    advice = _blackjack_advice(player_cards, dealer_cards[0], move_str, player_value) if advise else None
+    return {'game': 'blackjack', 'player_cards': player_cards, 'dealer_up_card': dealer_cards[0],
+            'player_value': player_value, 'move_code': move_code, 'move': move_str, 'action_evs': action_evs,
+            'win_probability': win_prob, 'advice': advice}
+
+def analyze_spots(args):
+    """
+    --cards: jeden rekord JSON na wyjściu. --cards -: linie "karty gracza | stół" (lub "| krupier")
+    ze standardowego wejścia, rekord JSONL na linię; błędna linia daje rekord z polem 'error'.
+    """
+    table = args.board if args.game == 'poker' else args.dealer
+    if args.cards != '-':
+        try:
+            record = analyze_spot(args.game, args.cards, table, args.opponents, args.advice, args.ranges)
+        except ValueError as e:
+            print(f"Błąd: {e}", file=sys.stderr)
+            sys.exit(2)
+        print(json.dumps(record, ensure_ascii=False))
+        return
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        cards, _, line_table = line.partition('|')
+        try:
+            record = analyze_spot(args.game, cards, line_table if line_table.strip() else table, args.opponents, args.advice, args.ranges)
+        except ValueError as e:
+            record = {'input': line.strip(), 'error': str(e)}
+        print(json.dumps(record, ensure_ascii=False), flush=True)
+
+def image_record(path, detections, result):
+    record = {'image': path, 'detections': detections.to_dicts()}
+    if result:
+        record.update((key, value) for key, value in result.items() if key not in ('detections', 'summary'))
+    return record
+
+def analysis_record(game, detections, advise=False):
+    # Wykonywane w procesie puli serwera, dlatego zwraca gotowy do serializacji rekord.
+    analyze_detections = analyze_poker_detections if game == 'poker' else analyze_blackjack_detections
+    return image_record(None, detections, analyze_detections(detections, advise=advise, quiet=True))
+
+def serve(game, recognizer, host, port):
+    from src.pipeline.analysis_server import AnalysisServer
+    server = AnalysisServer((host, port), recognizer, analysis_record, default_game=game)
+    print(f"Serwer analizy nasłuchuje na {server.url} (POST /analyze?game=poker|blackjack). Ctrl+C kończy.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Statystyki paczek: {server.batcher.stats()}")
+
+def analyze_image_dir(source, game, recognizer, output_path):
+    """
+    Analiza wsadowa katalogu lub wzorca glob: obrazy są dekodowane z wyprzedzeniem, rozpoznawane
+    paczkami i zapisywane na bieżąco jako jeden rekord JSONL na obraz (bez porad trenera AI).
+    """
+    from src.vision.image_reader import iter_image_paths, prefetch_images
+    paths = iter_image_paths(source)
+    if not paths:
+        print(f"Błąd: Nie znaleziono obrazów w '{source}'.")
+        return
+    analyze_detections = analyze_poker_detections if game == 'poker' else analyze_blackjack_detections
+    pending = deque()
+    written = 0
+    with open(output_path, 'w', encoding='utf-8') as out:
+        def readable_images():
+            for path, image in prefetch_images(paths, config.IMAGE_PREFETCH):
+                if image is None:
+                    print(f"Pominięto nieczytelny plik '{path}'.")
+                    out.write(json.dumps({'image': path, 'error': 'nie można odczytać obrazu'}, ensure_ascii=False) + '\n')
+                    continue
+                pending.append(path)
+                yield image
+
+        for detections, _ in recognizer.recognize_batch(readable_images()):
+            path = pending.popleft()
+            print(f"\n=== {path} ===")
+            result = analyze_detections(detections, advise=False)
+            out.write(json.dumps(image_record(path, detections, result), ensure_ascii=False) + '\n')
+            written += 1
+    print(f"\nZapisano wyniki {written} z {len(paths)} obrazów do '{output_path}'.")
+
+def _hand_key(result):
+    return tuple(result['player_cards']), tuple(result.get('community_cards') or result.get('dealer_cards') or ())
+
+def analyze_videos(sources, game, recognizer, output_path, annotated_dir=None, stride=None, sample_fps=None):
+    """
+    Analiza plików wideo i kamer (numery) jednocześnie: dekodowanie w wątkach strumieni, wspólny rozpoznawacz
+    z paczkami round-robin, nagrania z adnotacjami kodowane w osobnych wątkach i rekord JSONL przy każdej
+    zmianie rozdania w strumieniu (bez porad trenera AI).
+    """
+    from src.pipeline.video_streams import MultiStreamProcessor, VideoStream, VideoWriterThread
+    streams, stems = [], []
+    for i, source in enumerate(sources):
+        # Ten sam plik podany dwa razy dostaje osobną nazwę strumienia i osobne nagranie.
+        suffix = f"_{i}" if source in sources[:i] else ''
+        try:
+            streams.append(VideoStream(int(source) if source.isdigit() else source, source + suffix, stride, sample_fps))
+        except IOError as e:
+            print(f"Błąd: {e}")
+            continue
+        stems.append((f"kamera{source}" if source.isdigit() else os.path.splitext(os.path.basename(source))[0]) + suffix)
+    if not streams:
+        return
+
+    analyzers, writers = [], []
+    for stream, stem in zip(streams, stems):
+        if game == 'blackjack':
+            analyzers.append(partial(analyze_blackjack_detections, shoe_tracker=ShoeTracker(), advise=False))
+        else:
+            analyzers.append(partial(analyze_poker_detections, advise=False))
+        if annotated_dir:
+            writers.append(VideoWriterThread(os.path.join(annotated_dir, f"{stem}_analiza.mp4"), stream.output_fps))
+    # Dla każdego strumienia: ostatni zestaw kart, wynik jego analizy i ostatnio zapisane rozdanie.
+    states = [{'labels': None, 'result': None, 'hand': None} for _ in streams]
+    records = 0
+    started = time.monotonic()
+
+    with open(output_path, 'w', encoding='utf-8') as out:
+        def process(i, item, detections):
+            nonlocal records
+            index, timestamp, frame = item
+            state = states[i]
+            labels = tuple(sorted(set(detections.labels)))
+            # Te same karty w kolejnych klatkach nie uruchamiają ponownie analizy.
+            if labels != state['labels']:
+                state['labels'] = labels
+                state['result'] = analyzers[i](detections)
+                result = state['result']
+                if result is not None and _hand_key(result) != state['hand']:
+                    state['hand'] = _hand_key(result)
+                    record = image_record(None, result['detections'], result)
+                    record.update(stream=streams[i].name, frame=index, time_s=round(timestamp, 3))
+                    out.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    records += 1
+            if writers and writers[i].error is None:
+                with METRICS.timer('draw'):
+                    annotated = draw_live_overlay(frame, detections, state['result'])
+                try:
+                    writers[i].put(annotated)
+                except IOError as e:
+                    # Nieudane nagranie nie przerywa analizy strumienia.
+                    print(f"Błąd: {e}")
+
+        processor = MultiStreamProcessor(streams, recognizer, process)
+        try:
+            processor.run()
+        except KeyboardInterrupt:
+            print("Przerwano analizę wideo.")
+        finally:
+            processor.stop()
+            for writer in writers:
+                writer.close()
+
+    elapsed = time.monotonic() - started
+    frames = sum(stream.decoded for stream in streams)
+    print(f"\nPrzeanalizowano {frames} klatek z {len(streams)} strumieni w {elapsed:.1f} s ({frames / max(elapsed, 1e-9):.1f} klatek/s).")
+    print(f"Zapisano {records} rekordów rozdań do '{output_path}'.")
+    for writer in writers:
+        if writer.error is None:
+            print(f"Nagranie z adnotacjami: '{writer.path}' ({writer.written} klatek).")
+        else:
+            print(f"Nagranie '{writer.path}' nieudane: {writer.error}")
 
 def main():
     parser = argparse.ArgumentParser(description="Analizator gier karcianych AI.")
@@ -112,9 +456,54 @@ def main():
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument('--image', type=str, help="Ścieżka do obrazu do analizy.")
     group.add_argument('--camera', action='store_true', help="Użyj kamery na żywo.")
+    group.add_argument('--image-dir', type=str, help="Katalog lub wzorzec glob z obrazami do analizy wsadowej.")
+    group.add_argument('--video', type=str, nargs='+', metavar='ŹRÓDŁO', help="Pliki wideo lub numery kamer analizowane równolegle jednym modelem.")
+    group.add_argument('--cards', type=str, help="Karty gracza tekstem, np. \"AS KD\" - analiza bez obrazu; '-' czyta linie \"karty | stół\" ze standardowego wejścia.")
+    group.add_argument('--serve', action='store_true', help="Uruchom serwer HTTP analizy z modelem załadowanym na stałe (gra z argumentu jest domyślna).")
+    parser.add_argument('--board', type=str, help="Z --cards (poker): karty stołu, np. \"QH JH 2C\".")
+    parser.add_argument('--dealer', type=str, help="Z --cards (blackjack): odkryta karta krupiera.")
+    parser.add_argument('--opponents', type=int, help="Z --cards (poker): liczba przeciwników (domyślnie z configu).")
+    parser.add_argument('--ranges', type=str, nargs='+', help="Z --cards (poker): zakresy przeciwników, jeden na przeciwnika, np. \"QQ+, AKs\" \"any\".")
+    parser.add_argument('--advice', action='store_true', help="Z --cards: dołącz poradę trenera AI.")
+    parser.add_argument('--live', action='store_true', help="Z --camera: ciągła analiza w tle z podglądem w czasie rzeczywistym.")
+    parser.add_argument('--tiles', action='store_true', help="Z --image/--image-dir: rozpoznawanie na zachodzących kafelkach (zdjęcia w wysokiej rozdzielczości).")
+    parser.add_argument('--host', type=str, default=config.SERVER_HOST, help="Z --serve: adres nasłuchu.")
+    parser.add_argument('--port', type=int, default=config.SERVER_PORT, help="Z --serve: port nasłuchu.")
+    parser.add_argument('--output', type=str, default=config.BATCH_OUTPUT_JSONL, help="Z --image-dir/--video: plik wynikowy JSONL.")
+    parser.add_argument('--stride', type=int, default=config.VIDEO_FRAME_STRIDE, help="Z --video: analizuj co N-tą klatkę.")
+    parser.add_argument('--sample-fps', type=float, default=config.VIDEO_SAMPLE_FPS, help="Z --video: liczba analizowanych klatek na sekundę nagrania (zastępuje --stride).")
+    parser.add_argument('--annotated-dir', type=str, default=config.VIDEO_OUTPUT_DIR, help="Z --video: katalog nagrań z adnotacjami.")
+    parser.add_argument('--no-annotate', action='store_true', help="Z --video: nie zapisuj nagrań z adnotacjami.")
     parser.add_argument('--no-preview', action='store_true', help="Nie wyświetlaj okna z podglądem wyniku.")
+    parser.add_argument('--metrics-port', type=int, nargs='?', const=config.METRICS_PROMETHEUS_PORT,
+                        help="Udostępnij metryki etapów w formacie Prometheus pod http://localhost:PORT/metrics.")
+    parser.add_argument('--metrics-host', type=str, default=config.METRICS_PROMETHEUS_HOST,
+                        help="Z --metrics-port: adres nasłuchu metryk ('0.0.0.0' - dostępne z sieci).")
+    parser.add_argument('--metrics-json', type=str, help="Zapisz metryki etapów do pliku JSON po zakończeniu.")
+    parser.add_argument('--profile', type=str, nargs='?', const='', metavar='PLIK',
+                        help="Profiluj analizę pierwszej klatki (cProfile); opcjonalnie zapisz statystyki do pliku.")
     args = parser.parse_args()
 
+    if args.cards is not None:
+        analyze_spots(args)
+        return
+    if args.metrics_port:
+        server = start_prometheus_server(args.metrics_port, args.metrics_host)
+        host, port = server.server_address[:2]
+        print(f"Metryki dostępne pod http://{host}:{port}/metrics")
+    try:
+        run(args)
+    finally:
+        if args.metrics_json:
+            METRICS.dump_json(args.metrics_json)
+        if METRICS.snapshot()['stages']:
+            print("\n--- METRYKI ETAPÓW ---\n" + METRICS.summary())
+
+def run(args):
+    import cv2
+    from src.vision.card_recognizer import CardRecognizer
+    from src.vision.roi import RoiRecognizer, TiledRecognizer
+
     model_path = os.path.join('models', config.MODEL_PATH)
     try:
         recognizer = CardRecognizer(model_path)
@@ -122,35 +511,95 @@ def main():
         print(f"!!! Błąd krytyczny: {e}")
         return
     
+    if args.tiles and not args.camera:
+        recognizer = TiledRecognizer(recognizer)
+
     analysis_func = analyze_poker_frame if args.game == 'poker' else analyze_blackjack_frame
+    if args.profile is not None:
+        analysis_func = profile_once(analysis_func, args.profile or None)
 
     if args.image:
         if not os.path.exists(args.image):
             print(f"Błąd: Plik obrazu '{args.image}' nie został znaleziony.")
             return
-        frame = cv2.imread(args.image)
+        with METRICS.timer('decode'):
+            frame = cv2.imread(args.image)
         result_image = analysis_func(frame, recognizer)
         if result_image is not None:
             cv2.imwrite(config.OUTPUT_IMAGE_NAME, result_image)
             if not args.no_preview:
                 cv2.imshow('Analysis Result', result_image)
                 cv2.waitKey(0)
+    elif args.image_dir:
+        analyze_image_dir(args.image_dir, args.game, recognizer, args.output)
+    elif args.serve:
+        serve(args.game, recognizer, args.host, args.port)
+    elif args.video:
+        analyze_videos(args.video, args.game, recognizer, args.output, None if args.no_annotate else args.annotated_dir,
+                       args.stride, args.sample_fps)
     elif args.camera:
         cap = cv2.VideoCapture(0)
         if not cap.isOpened():
             print("Błąd: Nie można otworzyć kamery.")
             return
         
-        while True:
-            ret, frame = cap.read()
-            if not ret: break
-            cv2.imshow('Live Analyzer', frame)
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('q'): break
-            if key == ord(' '):
-                result_image = analysis_func(frame, recognizer)
-                if result_image is not None and not args.no_preview:
-                    cv2.imshow('Analysis Result', result_image)
+        # ROI opiera się na detekcjach z poprzedniej klatki, więc tylko w ciągłym trybie --live; przy analizie
+        # na spację poprzednia analiza może być sprzed wielu naciśnięć.
+        if config.ROI_ENABLED and args.live:
+            recognizer = RoiRecognizer(recognizer)
+        if config.FRAME_GATE_ENABLED:
+            from src.vision.frame_gate import FrameGate
+            recognizer = FrameGate(recognizer)
+
+        # But śledzony przez całą sesję kamery; 'r' oznacza nowe tasowanie, 'n' - nowe rozdanie.
+        shoe_tracker = ShoeTracker() if args.game == 'blackjack' else None
+
+        def handle_key(key):
+            if key == ord('r') and shoe_tracker:
+                shoe_tracker.reset()
+                print("Nowy but - skład kart wyzerowany.")
+            elif key == ord('n') and shoe_tracker:
+                shoe_tracker.new_round()
+                print("Nowe rozdanie.")
+
+        stop_reporter = start_console_reporter()
+        if args.live:
+            from src.pipeline.live_camera import LiveCameraPipeline
+            analyze_detections = partial(analyze_blackjack_detections, shoe_tracker=shoe_tracker) if shoe_tracker else analyze_poker_detections
+            overlay = draw_live_overlay
+            coach = None
+            if config.COACH_ASYNC:
+                # Model ładuje się w tle, zanim pojawi się pierwsza analiza.
+                from src.llm.async_coach import CoachSession
+                coach = CoachSession()
+                coach.prewarm()
+                analyze_detections = partial(analyze_live_detections, analyze_detections=analyze_detections, coach=coach)
+
+                def overlay(frame, detections, result):
+                    return draw_live_overlay(frame, detections, result, coach.text)
+
+            pipeline = LiveCameraPipeline(cap, recognizer, analyze_detections, overlay)
+            try:
+                pipeline.run(show=not args.no_preview, key_handler=handle_key)
+            finally:
+                if coach:
+                    coach.close()
+        else:
+            if shoe_tracker:
+                analysis_func = partial(analysis_func, shoe_tracker=shoe_tracker)
+            while True:
+                ret, frame = cap.read()
+                if not ret: break
+                cv2.imshow('Live Analyzer', frame)
+                key = cv2.waitKey(1) & 0xFF
+                if key == ord('q'): break
+                handle_key(key)
+                if key == ord(' '):
+                    result_image = analysis_func(frame, recognizer)
+                    if result_image is not None and not args.no_preview:
+                        cv2.imshow('Analysis Result', result_image)
+        stop_reporter.set()
+        print(f"Statystyki pamięci podręcznej: {cache_stats(recognizer)}")
         cap.release()
     cv2.destroyAllWindows()
 
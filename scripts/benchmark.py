@@ -0,0 +1,218 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import src.config as config
+
+BENCHMARKS = []
+
+
+def benchmark(name, number=1, items=1):
+    """
+    Rejestruje funkcję jako benchmark. Jeden pomiar to średnia z `number` wywołań; `items` to liczba
+    elementów (np. rąk) przetwarzanych w jednym wywołaniu, z której liczona jest przepustowość.
+    """
+    def register(fn):
+        BENCHMARKS.append({'name': name, 'fn': fn, 'number': number, 'items': items})
+        return fn
+    return register
+
+
+class Skip(Exception):
+    pass
+
+
+# --- Ewaluator rąk ---
+
+def _random_hands(count, seed=0):
+    from src.logic.hand_evaluator import RANKS, SUITS
+    deck = [rank + suit for rank in RANKS for suit in SUITS]
+    rng = random.Random(seed)
+    return [rng.sample(deck, 7) for _ in range(count)]
+
+
+EVALUATOR_HANDS = 20000
+_hands = []
+
+
+def _evaluate_hands():
+    from src.logic.poker_logic import _evaluate_hand
+    if not _hands:
+        _hands.extend(_random_hands(EVALUATOR_HANDS))
+    for hand in _hands:
+        _evaluate_hand(hand)
+
+
+benchmark('evaluator/evaluate_hand_7', items=EVALUATOR_HANDS)(_evaluate_hands)
+
+
+# --- Equity pokera ---
+
+EQUITY_SPOTS = {
+    'preflop': (['AH', 'KH'], []),
+    'flop': (['AH', 'KH'], ['QH', '7D', '2C']),
+    'turn': (['AH', 'KH'], ['QH', '7D', '2C', '9S']),
+    'river': (['AH', 'KH'], ['QH', '7D', '2C', '9S', '3H']),
+}
+
+for stage, (my_cards, community_cards) in EQUITY_SPOTS.items():
+    for num_opponents in (1, 2, 4):
+        def equity(my_cards=my_cards, community_cards=community_cards, num_opponents=num_opponents):
+            from src.logic.poker_logic import calculate_equity
+            # Preflop mierzona jest symulacja, a nie odczyt z tablicy equity preflop.
+            previous, config.POKER_USE_PREFLOP_TABLE = config.POKER_USE_PREFLOP_TABLE, False
+            try:
+                calculate_equity(my_cards, community_cards, num_opponents, config.POKER_SIMULATIONS_COUNT)
+            finally:
+                config.POKER_USE_PREFLOP_TABLE = previous
+        benchmark(f'equity/{stage}/opponents={num_opponents}', number=3)(equity)
+
+
+# --- Prawdopodobieństwa blackjacka ---
+
+BLACKJACK_SPOTS = {
+    'S': (['TH', '7D'], '9C'),
+    'H': (['TH', '6D'], 'TC'),
+    'D': (['6H', '5D'], '6C'),
+    'DS': (['AH', '7D'], '4C'),
+    'P': (['8H', '8D'], '7C'),
+}
+
+for move_code, (hand, up_card) in BLACKJACK_SPOTS.items():
+    def win_probability(hand=hand, up_card=up_card, move_code=move_code):
+        from src.logic import blackjack_ev, blackjack_logic
+        # Każde wywołanie liczy rozkłady krupiera i EV decyzji od zera, a nie z pamięci podręcznej poprzedniego.
+        blackjack_ev.clear_caches()
+        blackjack_logic.calculate_win_probability(hand, up_card, move_code)
+    benchmark(f'blackjack/win_probability/{move_code}', number=5)(win_probability)
+
+
+# --- Rozpoznawanie kart ---
+
+_recognition = {}
+
+
+def _recognition_inputs():
+    if 'images' not in _recognition:
+        import cv2
+        from src.vision.image_reader import iter_image_paths
+        try:
+            from src.vision.card_recognizer import CardRecognizer
+            _recognition['recognizer'] = CardRecognizer(os.path.join('models', config.MODEL_PATH))
+        except (IOError, ImportError) as e:
+            _recognition['error'] = str(e)
+        _recognition['images'] = [image for image in map(cv2.imread, iter_image_paths('tests')) if image is not None]
+    if 'error' in _recognition:
+        raise Skip(_recognition['error'])
+    return _recognition['recognizer'], _recognition['images']
+
+
+for augment in (True, False):
+    def recognize(augment=augment):
+        recognizer, images = _recognition_inputs()
+        previous, config.AUGMENT = config.AUGMENT, augment
+        try:
+            for image in images:
+                recognizer.recognize(image)
+        finally:
+            config.AUGMENT = previous
+    benchmark(f"recognition/tests_images/augment={'on' if augment else 'off'}")(recognize)
+
+
+def run_benchmark(entry, repeats):
+    entry['fn']()  # rozgrzewka: budowa tablic, mapowanie plików, ładowanie modelu
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(entry['number']):
+            entry['fn']()
+        timings.append((time.perf_counter() - start) / entry['number'])
+    median = statistics.median(timings)
+    return {'median_s': median, 'min_s': min(timings), 'repeats': repeats, 'items_per_s': entry['items'] / median}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """
+    Lista (nazwa, stosunek czasu do bazowego, czy regresja) dla benchmarków obecnych w obu zestawach.
+    Porównywany jest najlepszy pomiar, najmniej wrażliwy na chwilowe obciążenie maszyny.
+    """
+    rows = []
+    for name, result in results.items():
+        reference = baseline.get('results', {}).get(name)
+        if not reference or 'min_s' not in result or 'min_s' not in reference:
+            continue
+        ratio = result['min_s'] / reference['min_s']
+        rows.append((name, ratio, ratio > 1 + threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarki ewaluatora, equity, blackjacka i rozpoznawania kart.")
+    parser.add_argument('--only', nargs='+', default=[], help="Uruchom tylko benchmarki o nazwach zaczynających się od podanych prefiksów.")
+    parser.add_argument('--repeats', type=int, default=config.BENCHMARK_REPEATS, help="Liczba pomiarów każdego benchmarku.")
+    parser.add_argument('--output', help="Zapisz wyniki w formacie JSON do pliku ('-' - na standardowe wyjście).")
+    parser.add_argument('--baseline', default=config.BENCHMARK_BASELINE_PATH, help="Plik JSON z wynikami bazowymi.")
+    parser.add_argument('--save-baseline', action='store_true', help="Zapisz bieżące wyniki jako bazowe.")
+    parser.add_argument('--threshold', type=float, default=config.BENCHMARK_SLOWDOWN_THRESHOLD,
+                        help="Dopuszczalne spowolnienie względem bazy (0.2 = 20%%), powyżej którego kod wyjścia to 1.")
+    args = parser.parse_args()
+
+    selected = [entry for entry in BENCHMARKS if not args.only or entry['name'].startswith(tuple(args.only))]
+    results = {}
+    for entry in selected:
+        try:
+            results[entry['name']] = run_benchmark(entry, args.repeats)
+            result = results[entry['name']]
+            print(f"{entry['name']:<45} {result['median_s'] * 1000:>10.2f} ms  (min {result['min_s'] * 1000:.2f} ms)", file=sys.stderr)
+        except Skip as e:
+            results[entry['name']] = {'skipped': str(e)}
+            print(f"{entry['name']:<45} pominięty: {e}", file=sys.stderr)
+
+    report = {
+        'meta': {'timestamp': datetime.now(timezone.utc).isoformat(), 'commit': _git_commit(),
+                 'python': platform.python_version(), 'platform': platform.platform(), 'machine': platform.machine()},
+        'results': results,
+    }
+    if args.output == '-':
+        print(json.dumps(report, indent=2))
+    elif args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    exit_code = 0
+    if args.save_baseline:
+        directory = os.path.dirname(args.baseline)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Zapisano wyniki bazowe do '{args.baseline}'.", file=sys.stderr)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            rows = compare(results, json.load(f), args.threshold)
+        print(f"\nPorównanie z '{args.baseline}' (próg spowolnienia {args.threshold:.0%}):", file=sys.stderr)
+        for name, ratio, regressed in rows:
+            print(f"{name:<45} {ratio:>6.2f}x {'REGRESJA' if regressed else ''}", file=sys.stderr)
+        if any(regressed for _, _, regressed in rows):
+            exit_code = 1
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import src.config as config
+from src.logic.poker_vectorized import simulate_shares
+from src.logic.preflop_table import MAX_OPPONENTS, NUM_CLASSES, hand_class_cards, hand_class_name, write_table
+
+
+def compute_class(index, simulations, seed):
+    my_cards = hand_class_cards(index)
+    deck = [card for card in range(52) if card not in my_cards]
+    seeds = np.random.SeedSequence([seed, index]).spawn(MAX_OPPONENTS)
+    return [float(simulate_shares(my_cards, [], deck, num_opponents, simulations, np.random.default_rng(seeds[num_opponents - 1])).mean())
+            for num_opponents in range(1, MAX_OPPONENTS + 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generuje tablicę equity preflop dla 169 klas rąk startowych.")
+    parser.add_argument('--simulations', type=int, default=1000000, help="Liczba symulacji na klasę i liczbę przeciwników.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Liczba procesów.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=str, default=config.POKER_PREFLOP_TABLE_PATH)
+    args = parser.parse_args()
+
+    start = time.time()
+    equities = [None] * NUM_CLASSES
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(compute_class, index, args.simulations, args.seed): index for index in range(NUM_CLASSES)}
+        for done, future in enumerate(futures, 1):
+            index = futures[future]
+            equities[index] = future.result()
+            print(f"[{done}/{NUM_CLASSES}] {hand_class_name(index)}: " + " ".join(f"{e:.3f}" for e in equities[index]))
+
+    write_table(args.output, equities, args.simulations)
+    print(f"Zapisano tablicę w '{args.output}' ({time.time() - start:.0f} s).")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+import argparse
+import os
+import sys
+import time
+from itertools import product
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.logic.blackjack_logic import MOVE_MAP, Rules, default_rules
+from src.logic.strategy_chart import HARD, MOVE_CODES, PAIR, SOFT, build_chart, chart_offset, chart_path, save_chart
+
+
+def print_chart(chart):
+    dealer_values = range(2, 12)
+    print("      " + " ".join(f"{('A' if d == 11 else str(d)):>3}" for d in dealer_values))
+    rows = [('H', HARD, range(5, 21)), ('S', SOFT, range(13, 21)), ('P', PAIR, range(2, 12))]
+    for prefix, hand_type, totals in rows:
+        for total in totals:
+            codes = (MOVE_CODES[chart[chart_offset(hand_type, total, d)]] for d in dealer_values)
+            print(f"{prefix}{total:>4} " + " ".join(f"{code:>3}" for code in codes))
+    print("Legenda: " + ", ".join(f"{code} = {MOVE_MAP[code]}" for code in MOVE_CODES))
+
+
+def main():
+    defaults = default_rules()
+    parser = argparse.ArgumentParser(description="Generuje tablice strategii podstawowej blackjacka z dokładnych EV.")
+    parser.add_argument('--decks', type=int, nargs='+', default=[defaults.num_decks], help="Liczba talii w bucie.")
+    parser.add_argument('--h17', type=int, nargs='+', choices=[0, 1], default=[int(defaults.hits_soft_17)],
+                        help="1 - krupier dobiera na miękkie 17, 0 - stoi.")
+    parser.add_argument('--das', type=int, nargs='+', choices=[0, 1], default=[int(defaults.double_after_split)],
+                        help="1 - podwojenie po splicie dozwolone.")
+    parser.add_argument('--surrender', type=int, nargs='+', choices=[0, 1], default=[int(defaults.surrender)],
+                        help="1 - poddanie dozwolone.")
+    parser.add_argument('--show', action='store_true', help="Wypisz wygenerowane tablice.")
+    args = parser.parse_args()
+
+    for decks, h17, das, surrender in product(args.decks, args.h17, args.das, args.surrender):
+        rules = Rules(decks, bool(h17), bool(das), bool(surrender))
+        start = time.time()
+        chart = build_chart(rules)
+        path = chart_path(rules)
+        save_chart(path, rules, chart)
+        print(f"Zapisano '{path}' ({time.time() - start:.0f} s).")
+        if args.show:
+            print_chart(chart)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import src.config as config
+from src.vision.card_recognizer import CardRecognizer
+from src.vision.image_reader import iter_image_paths
+
+# Wariant = backend z opcjonalnym sufiksem: '-int8' (model skwantyzowany) albo '-noaug' (PyTorch bez augmentacji).
+VARIANTS = ('pytorch', 'pytorch-noaug', 'onnx', 'onnx-int8', 'openvino', 'openvino-int8')
+
+
+def _iou(a, b):
+    width = min(a[2], b[2]) - max(a[0], b[0])
+    height = min(a[3], b[3]) - max(a[1], b[1])
+    if width <= 0 or height <= 0:
+        return 0.0
+    inter = width * height
+    return inter / ((a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter)
+
+
+def match_detections(reference, detections, iou_threshold=0.5):
+    """Liczba detekcji zgodnych z referencją (ta sama etykieta, IoU >= progu), dopasowanie zachłanne."""
+    unmatched = list(reference)
+    matched = 0
+    for det in sorted(detections, key=lambda d: d['conf'], reverse=True):
+        candidates = [ref for ref in unmatched if ref['label'] == det['label'] and _iou(ref['box'], det['box']) >= iou_threshold]
+        if candidates:
+            unmatched.remove(max(candidates, key=lambda ref: _iou(ref['box'], det['box'])))
+            matched += 1
+    return matched
+
+
+def run_variant(variant, model_path, images, repeats):
+    backend, _, option = variant.partition('-')
+    recognizer = CardRecognizer(model_path, backend=backend, int8=option == 'int8')
+    augment = config.AUGMENT
+    config.AUGMENT = augment and option != 'noaug'
+    try:
+        recognizer.recognize(images[0])  # rozgrzewka: pierwsze wywołanie inicjalizuje backend
+        detections, latencies = [], []
+        for image in images:
+            for _ in range(repeats):
+                start = time.perf_counter()
+                result, _ = recognizer.recognize(image)
+                latencies.append(time.perf_counter() - start)
+            detections.append(result.to_dicts())
+    finally:
+        config.AUGMENT = augment
+    return detections, np.array(latencies) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Porównanie dokładności i opóźnienia backendów inferencji z modelem PyTorch.")
+    parser.add_argument('--variants', nargs='+', choices=VARIANTS, default=['pytorch', 'pytorch-noaug', 'onnx', 'openvino'],
+                        help="Warianty do porównania; pierwszy jest referencją.")
+    parser.add_argument('--images', default=config.CALIBRATION_IMAGES_DIR, help="Katalog lub wzorzec glob z obrazami testowymi.")
+    parser.add_argument('--repeats', type=int, default=3, help="Liczba pomiarów na obraz.")
+    args = parser.parse_args()
+
+    model_path = os.path.join('models', config.MODEL_PATH)
+    paths = iter_image_paths(args.images)
+    images = [image for image in map(cv2.imread, paths) if image is not None]
+    if not images:
+        print(f"Błąd: Brak obrazów w '{args.images}'.")
+        return
+
+    reference = None
+    print(f"{len(images)} obrazów, {args.repeats} pomiary na obraz, referencja: {args.variants[0]}")
+    print(f"{'wariant':<15}{'śr. ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'detekcji':>10}{'precyzja':>10}{'czułość':>10}")
+    for variant in args.variants:
+        try:
+            detections, latencies = run_variant(variant, model_path, images, args.repeats)
+        except (IOError, ImportError) as e:
+            print(f"{variant:<15}pominięty: {e}")
+            continue
+        if reference is None:
+            reference = detections
+        matched = sum(match_detections(ref, det) for ref, det in zip(reference, detections))
+        found = sum(map(len, detections))
+        expected = sum(map(len, reference))
+        precision = matched / found if found else 1.0
+        recall = matched / expected if expected else 1.0
+        print(f"{variant:<15}{latencies.mean():>9.1f}{np.percentile(latencies, 50):>9.1f}{np.percentile(latencies, 95):>9.1f}"
+              f"{found:>10}{precision:>10.1%}{recall:>10.1%}")
+
+
+if __name__ == '__main__':
+    main()
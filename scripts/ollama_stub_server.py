@@ -0,0 +1,137 @@
+import argparse
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = "To jest porada testowa z lokalnego serwera zastępczego Ollama. Graj rozważnie i pilnuj equity."
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class OllamaStubHandler(BaseHTTPRequestHandler):
+    """
+    Minimalna imitacja API Ollama (/api/chat, /api/version) do testowania trenera bez prawdziwego modelu:
+    pierwsze zapytanie płaci opóźnienie ładowania modelu, odpowiedź jest strumieniowana słowo po słowie.
+    """
+    protocol_version = 'HTTP/1.1'
+    server_version = 'OllamaStub/1.0'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, payload):
+        line = json.dumps(payload).encode('utf-8') + b'\n'
+        self.wfile.write(f"{len(line):X}\r\n".encode('ascii') + line + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path == '/api/version':
+            self._send_json({'version': 'stub'})
+        else:
+            self._send_json({'error': 'not found'}, 404)
+
+    def do_POST(self):
+        if self.path != '/api/chat':
+            self._send_json({'error': 'not found'}, 404)
+            return
+        request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        model = request.get('model', '')
+        self.server.requests.append(request)
+        self.server.load_model()
+
+        if not request.get('messages'):
+            self._send_json({'model': model, 'created_at': _now(), 'done': True, 'done_reason': 'load',
+                             'message': {'role': 'assistant', 'content': ''}})
+            return
+
+        words = self.server.reply.split(' ')
+        tokens = [word + (' ' if i < len(words) - 1 else '') for i, word in enumerate(words)]
+        if not request.get('stream', True):
+            time.sleep(self.server.token_delay * len(tokens))
+            self._send_json({'model': model, 'created_at': _now(), 'done': True, 'done_reason': 'stop',
+                             'message': {'role': 'assistant', 'content': ''.join(tokens)}})
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            for token in tokens:
+                time.sleep(self.server.token_delay)
+                self._write_chunk({'model': model, 'created_at': _now(), 'done': False,
+                                   'message': {'role': 'assistant', 'content': token}})
+            self._write_chunk({'model': model, 'created_at': _now(), 'done': True, 'done_reason': 'stop',
+                               'message': {'role': 'assistant', 'content': ''}})
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # klient anulował poradę
+
+
+class OllamaStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, reply=DEFAULT_REPLY, token_delay=0.05, load_delay=1.0, verbose=False):
+        super().__init__(address, OllamaStubHandler)
+        self.reply = reply
+        self.token_delay = token_delay
+        self.load_delay = load_delay
+        self.verbose = verbose
+        self.requests = []
+        self._loaded = threading.Event()
+        self._load_lock = threading.Lock()
+
+    def load_model(self):
+        with self._load_lock:
+            if not self._loaded.is_set():
+                time.sleep(self.load_delay)
+                self._loaded.set()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_stub_server(host='127.0.0.1', port=0, **options):
+    """Uruchamia serwer w wątku tła (port 0 - dowolny wolny); zwraca serwer, adres w `server.url`."""
+    server = OllamaStubServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, name='ollama-stub', daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lokalny serwer zastępczy API Ollama do testów trenera AI.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11435)
+    parser.add_argument('--reply', default=DEFAULT_REPLY, help="Treść zwracanej porady.")
+    parser.add_argument('--token-delay', type=float, default=0.05, help="Opóźnienie między słowami w sekundach.")
+    parser.add_argument('--load-delay', type=float, default=1.0, help="Czas 'ładowania modelu' przy pierwszym zapytaniu.")
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    server = OllamaStubServer((args.host, args.port), args.reply, args.token_delay, args.load_delay, args.verbose)
+    print(f"Serwer zastępczy Ollama nasłuchuje na {server.url} (ustaw OLLAMA_HOST w config.py). Ctrl+C kończy.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,5 @@
+import os
+
 MODEL_PATH = 'yolov8m_synthetic.pt'
 
 IMG_SIZE = 832
@@ -9,14 +11,138 @@ AUGMENT = True
 SAVE_PREDICT = False
 SHOW_PREDICT = False
 
+# Backend inferencji: 'pytorch' (model .pt), 'onnx' (ONNX Runtime) albo 'openvino'.
+# Modele ONNX/OpenVINO są eksportowane z MODEL_PATH przy pierwszym użyciu i zapisywane obok niego.
+INFERENCE_BACKEND = 'pytorch'
+# Kwantyzacja INT8 eksportowanego modelu, kalibrowana na obrazach z CALIBRATION_IMAGES_DIR.
+INFERENCE_INT8 = False
+CALIBRATION_IMAGES_DIR = 'tests'
+CALIBRATION_MAX_IMAGES = 300
+
+# Tryb wsadowy (--image-dir): liczba obrazów na jedno wywołanie modelu i liczba obrazów dekodowanych z wyprzedzeniem
+RECOGNITION_BATCH_SIZE = 8
+IMAGE_PREFETCH = 16
+BATCH_OUTPUT_JSONL = 'results.jsonl'
+
+# Tryb serwera (--serve): adres nasłuchu, okno zbierania zapytań w jedną paczkę inferencji (sekundy),
+# maksymalny rozmiar paczki, liczba procesów liczących equity/EV (None = liczba rdzeni) i limit rozmiaru obrazu
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 8765
+SERVER_BATCH_WINDOW = 0.01
+SERVER_MAX_BATCH = 8
+SERVER_WORKERS = None
+SERVER_MAX_IMAGE_BYTES = 20 * 1024 * 1024
+
+# Wideo i wiele strumieni (--video): co która klatka jest analizowana albo docelowa liczba analizowanych klatek
+# na sekundę (None - według VIDEO_FRAME_STRIDE), liczba zdekodowanych klatek buforowanych na strumień,
+# katalog i kodek nagrań z adnotacjami
+VIDEO_FRAME_STRIDE = 1
+VIDEO_SAMPLE_FPS = None
+VIDEO_QUEUE_SIZE = 8
+VIDEO_OUTPUT_DIR = 'video_output'
+VIDEO_FOURCC = 'mp4v'
+
+CACHE_DIR = 'cache'
+
+# Potok kamery (--live): klatka z błędem rozpoznawania jest pomijana, po tylu kolejnych błędach potok się zatrzymuje
+LIVE_MAX_CONSECUTIVE_ERRORS = 10
+
+# Tryb ROI dla kamery: pełna rozdzielczość tylko w obszarze kart wyznaczonym przez poprzednią klatkę
+# albo szybki przebieg w niskiej rozdzielczości; co ROI_FULL_REFRESH_FRAMES klatek analiza całej klatki.
+ROI_ENABLED = True
+ROI_LOWRES_SIZE = 320
+ROI_MARGIN = 0.25
+ROI_MIN_PADDING = 32
+ROI_MAX_AREA_FRACTION = 0.6
+ROI_FULL_REFRESH_FRAMES = 30
+
+# Kafelkowanie zdjęć w wysokiej rozdzielczości (--tiles): rozmiar kafelka w pikselach i ich zakładka
+TILE_SIZE = 832
+TILE_OVERLAP = 0.2
+
+# Pomijanie inferencji, gdy klatka z kamery się nie zmieniła: klatka pomniejszona do FRAME_SIGNATURE_SIZE px
+# porównywana w FRAME_GATE_GRID x FRAME_GATE_GRID blokach; zmiana to średnia różnica jasności bloku powyżej
+# FRAME_CHANGE_THRESHOLD, a po FRAME_GATE_REFRESH_FRAMES pominiętych klatkach inferencja jest wymuszana
+FRAME_GATE_ENABLED = True
+FRAME_SIGNATURE_SIZE = 64
+FRAME_GATE_GRID = 16
+FRAME_CHANGE_THRESHOLD = 6
+FRAME_GATE_REFRESH_FRAMES = 30
+# Liczba zapamiętanych wyników analizy (equity/EV i porada AI) dla kanonicznych stanów stołu
+RESULT_CACHE_SIZE = 256
+
 # Pokera
 POKER_NUM_OPPONENTS = 2
 POKER_SIMULATIONS_COUNT = 10000
+# Maksymalna liczba rozdań, przy której equity liczone jest dokładnie zamiast metodą Monte Carlo.
+POKER_EXACT_ENUMERATION_BUDGET = 50000
+# Silnik Monte Carlo: 'python' (pętla po rozdaniach) albo 'numpy' (wektorowe paczki rozdań).
+POKER_EQUITY_ENGINE = 'numpy'
+# 'fixed' - stała liczba symulacji, 'adaptive' - paczki na wielu rdzeniach aż do osiągnięcia zadanego błędu.
+POKER_EQUITY_MODE = 'fixed'
+POKER_ADAPTIVE_TARGET_STDERR = 0.005
+POKER_ADAPTIVE_MAX_SIMULATIONS = 1000000
+POKER_ADAPTIVE_CHUNK_SIZE = 5000
+POKER_WORKERS = None  # None = liczba rdzeni
+# Zakresy kart przeciwników w zapisie standardowym, jeden na przeciwnika (np. ['QQ+, AKs', 'any']);
+# None - dowolne karty i liczba przeciwników z POKER_NUM_OPPONENTS. Waga elementu po dwukropku: 'KQo:0.5'.
+POKER_OPPONENT_RANGES = None
+# Liczba zapamiętanych wyników equity dla (ręka, stół, zakresy)
+RANGE_EQUITY_CACHE_SIZE = 512
+HAND_RANKS_CACHE_PATH = os.path.join(CACHE_DIR, 'hand_ranks.bin')
+# Tablica equity preflop generowana przez scripts/build_preflop_table.py
+POKER_USE_PREFLOP_TABLE = True
+POKER_PREFLOP_TABLE_PATH = os.path.join('data', 'preflop_equity.bin')
 
 # Blackjacka
+BLACKJACK_NUM_DECKS = 4
 DEALER_HITS_ON_SOFT_17 = True
+BLACKJACK_DOUBLE_AFTER_SPLIT = True
+BLACKJACK_SURRENDER = False
+# Tablice strategii podstawowej generowane przez scripts/build_strategy_chart.py (w repozytorium dla 1, 2, 4, 6 i 8 talii)
+BLACKJACK_STRATEGY_DIR = os.path.join('data', 'strategy')
+# Zasady (talie, H17, DAS, poddanie) tablicy używanej, gdy brak tablicy dla bieżących zasad.
+BLACKJACK_FALLBACK_CHART_RULES = (4, True, True, False)
+# Rekomendacja z pełnego EV dla składu buta zamiast tabel strategii podstawowej.
+BLACKJACK_USE_EV_ENGINE = True
+# Maksymalna liczba zapamiętanych stanów (skład buta, suma) w obliczeniach krupiera i EV.
+BLACKJACK_CACHE_SIZE = 500000
+# Ile pierwszych dobranych kart gracza uwzględniać w składzie buta krupiera przy liczeniu EV.
+BLACKJACK_EV_DEALER_REMOVAL_DEPTH = 1
+# Po tylu kolejnych klatkach bez kart śledzenie buta zaczyna nowe rozdanie (klawisz 'n' - od razu).
+SHOE_ROUND_EMPTY_FRAMES = 5
 
 
 OLLAMA_MODEL = 'gemma3:4b'
+# Adres serwera Ollama (None - domyślny albo zmienna środowiskowa OLLAMA_HOST)
+OLLAMA_HOST = None
+# Jak długo serwer trzyma model w pamięci po ostatnim zapytaniu
+OLLAMA_KEEP_ALIVE = '30m'
+# Limit czasu jednej porady trenera w sekundach (łącznie ze strumieniowaniem)
+COACH_TIMEOUT = 60
+# Tryb na żywo: porady strumieniowane w tle (asyncio), nowy stan stołu anuluje nieaktualną poradę
+COACH_ASYNC = True
+# Liczba ostatnich znaków porady wyświetlanych na podglądzie na żywo
+OVERLAY_ADVICE_CHARS = 70
+# Trwała pamięć porad trenera (SQLite) współdzielona między sesjami. Klucz pokera używa kart z kanonicznymi
+# kolorami i equity zaokrąglonego do ADVICE_EQUITY_BUCKET, klucz blackjacka - typu i sumy ręki.
+ADVICE_CACHE_ENABLED = True
+ADVICE_CACHE_PATH = os.path.join(CACHE_DIR, 'advice.sqlite')
+ADVICE_CACHE_MAX_BYTES = 16 * 1024 * 1024
+ADVICE_EQUITY_BUCKET = 0.05
+
+# Benchmarki (scripts/benchmark.py): liczba pomiarów, plik wyników bazowych (w repozytorium) i dopuszczalne spowolnienie
+BENCHMARK_REPEATS = 5
+BENCHMARK_BASELINE_PATH = os.path.join('benchmarks', 'baseline.json')
+BENCHMARK_SLOWDOWN_THRESHOLD = 0.2
+
+# Pomiary czasu etapów analizy (src/metrics.py): percentyle liczone z ostatnich METRICS_WINDOW pomiarów etapu,
+# podsumowanie w konsoli co METRICS_SUMMARY_INTERVAL sekund w trybie kamery, port i adres endpointu Prometheus
+# (--metrics-port, --metrics-host); domyślnie tylko lokalnie, '0.0.0.0' udostępnia metryki w sieci
+METRICS_ENABLED = True
+METRICS_WINDOW = 1000
+METRICS_SUMMARY_INTERVAL = 30
+METRICS_PROMETHEUS_PORT = 9108
+METRICS_PROMETHEUS_HOST = '127.0.0.1'
 
 OUTPUT_IMAGE_NAME = 'analysis_result.jpg'
\ No newline at end of file
@@ -0,0 +1,143 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from itertools import permutations
+
+import src.config as config
+
+SUITS = 'HDCS'
+SUIT_SYMBOLS = {'H': '♥', 'D': '♦', 'C': '♣', 'S': '♠'}
+# Odmiana nazw kolorów w tej samej kolejności przypadków: mianownik, dopełniacz, celownik, narzędnik, miejscownik
+# liczby pojedynczej, potem mianownik, dopełniacz, celownik, narzędnik i miejscownik mnogiej. "Karo" się nie odmienia.
+SUIT_FORMS = {
+    'H': ('kier', 'kiera', 'kierowi', 'kierem', 'kierze', 'kiery', 'kierów', 'kierom', 'kierami', 'kierach'),
+    'D': ('karo',) * 10,
+    'C': ('trefl', 'trefla', 'treflowi', 'treflem', 'treflu', 'trefle', 'trefli', 'treflom', 'treflami', 'treflach'),
+    'S': ('pik', 'pika', 'pikowi', 'pikiem', 'piku', 'piki', 'pików', 'pikom', 'pikami', 'pikach'),
+}
+# Przymiotniki ("kierowy", "w karowym kolorze") mają wspólną końcówkę po temacie koloru.
+SUIT_ADJECTIVE_STEMS = {'H': 'kierow', 'D': 'karow', 'C': 'treflow', 'S': 'pikow'}
+_ADJECTIVE_ENDINGS = ('y', 'a', 'e', 'ego', 'ej', 'emu', 'ym', 'ą', 'ych', 'ymi', 'i')
+# Przy formach powtarzających się w odmianie (karo) zostaje pierwszy przypadek - mianownik.
+_SUIT_BY_FORM = {form: (suit, case) for suit, forms in SUIT_FORMS.items() for case, form in reversed(list(enumerate(forms)))}
+_SUIT_BY_STEM = {stem: suit for suit, stem in SUIT_ADJECTIVE_STEMS.items()}
+_SUIT_BY_SYMBOL = {symbol: suit for suit, symbol in SUIT_SYMBOLS.items()}
+
+
+def _alternatives(words):
+    return '|'.join(sorted(words, key=len, reverse=True))
+
+
+_SUIT_PATTERN = re.compile(
+    rf'\b(?:({_alternatives(_SUIT_BY_STEM)})({_alternatives(_ADJECTIVE_ENDINGS)})|({_alternatives(_SUIT_BY_FORM)}))\b'
+    r'|([♥♦♣♠])', re.IGNORECASE)
+
+
+def _normalize(card):
+    return 'T' + card[2:] if card.startswith('10') else card
+
+
+def canonical_suits(my_cards, community_cards):
+    """
+    Postać rąk niezależna od nazw kolorów: najmniejsza leksykograficznie spośród 24 permutacji kolorów.
+    Zwraca (klucz, permutacja kolor rzeczywisty -> kolor kanoniczny).
+    """
+    my_cards = [_normalize(card) for card in my_cards]
+    community_cards = [_normalize(card) for card in community_cards]
+    best_form, best_mapping = None, None
+    for permutation in permutations(SUITS):
+        mapping = dict(zip(SUITS, permutation))
+        form = (sorted(card[0] + mapping[card[1]] for card in my_cards),
+                sorted(card[0] + mapping[card[1]] for card in community_cards))
+        if best_form is None or form < best_form:
+            best_form, best_mapping = form, mapping
+    return ' '.join(best_form[0]) + '|' + ' '.join(best_form[1]), best_mapping
+
+
+def translate_suits(text, mapping):
+    """
+    Podmienia kolory w tekście porady według `mapping`: odmienione nazwy kolorów (z zachowaniem przypadka),
+    przymiotniki od nich i symbole kolorów.
+    """
+    def replace(match):
+        stem, ending, name, symbol = match.groups()
+        if symbol:
+            return SUIT_SYMBOLS[mapping[_SUIT_BY_SYMBOL[symbol]]]
+        if stem:
+            word, new_word = stem, SUIT_ADJECTIVE_STEMS[mapping[_SUIT_BY_STEM[stem.lower()]]] + ending
+        else:
+            suit, case = _SUIT_BY_FORM[name.lower()]
+            word, new_word = name, SUIT_FORMS[mapping[suit]][case]
+        return new_word.capitalize() if word[0].isupper() else new_word
+    return _SUIT_PATTERN.sub(replace, text)
+
+
+class AdviceCache:
+    """
+    Trwała pamięć porad trenera w SQLite. Po przekroczeniu `max_bytes` (suma długości porad)
+    usuwane są porady najdawniej używane.
+    """
+
+    def __init__(self, path, max_bytes):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS advice (key TEXT PRIMARY KEY, advice TEXT NOT NULL, "
+                "size INTEGER NOT NULL, used REAL NOT NULL)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS advice_used ON advice (used)")
+
+    def get(self, key):
+        with self._lock, self._connection:
+            row = self._connection.execute("SELECT advice FROM advice WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._connection.execute("UPDATE advice SET used = ? WHERE key = ?", (time.time(), key))
+        return row[0] if row else None
+
+    def put(self, key, advice):
+        size = len(advice.encode('utf-8'))
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO advice VALUES (?, ?, ?, ?)", (key, advice, size, time.time()))
+            total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM advice").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            evicted = []
+            for old_key, old_size in self._connection.execute("SELECT key, size FROM advice ORDER BY used"):
+                if total <= self.max_bytes:
+                    break
+                evicted.append((old_key,))
+                total -= old_size
+            self._connection.executemany("DELETE FROM advice WHERE key = ?", evicted)
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM advice").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_advice_cache():
+    """Wspólna instancja pamięci porad; None, gdy wyłączona w configu albo baza jest niedostępna."""
+    global _cache
+    if not config.ADVICE_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = AdviceCache(config.ADVICE_CACHE_PATH, config.ADVICE_CACHE_MAX_BYTES)
+            except (OSError, sqlite3.Error) as e:
+                print(f"Nie można otworzyć pamięci porad '{config.ADVICE_CACHE_PATH}': {e}")
+                _cache = False  # bez ponawiania prób w tej sesji
+        return _cache if _cache is not False else None
@@ -0,0 +1,123 @@
+import asyncio
+import threading
+
+import ollama
+
+import src.config as config
+from src.llm.llm_coach import CHAT_OPTIONS, cached_advice, chat_messages, store_advice
+
+
+class AsyncCoach:
+    """
+    Asynchroniczny klient trenera: jeden współdzielony AsyncClient (pula połączeń HTTP),
+    wstępne ładowanie modelu i porady strumieniowane fragment po fragmencie.
+    """
+
+    def __init__(self, host=None, model=None, timeout=None):
+        self.model = model or config.OLLAMA_MODEL
+        self.timeout = timeout or config.COACH_TIMEOUT
+        self.client = ollama.AsyncClient(host=host or config.OLLAMA_HOST, timeout=self.timeout)
+
+    async def prewarm(self):
+        """Zapytanie bez wiadomości ładuje model do pamięci serwera, zanim pojawi się pierwsza porada."""
+        try:
+            await asyncio.wait_for(self.client.chat(model=self.model, messages=[], keep_alive=config.OLLAMA_KEEP_ALIVE),
+                                   self.timeout)
+            return True
+        except Exception as e:
+            print(f"Nie udało się wstępnie załadować modelu '{self.model}': {e}")
+            return False
+
+    async def _stream(self, prompt, on_token):
+        parts = []
+        stream = await self.client.chat(model=self.model, messages=chat_messages(prompt), options=CHAT_OPTIONS,
+                                        stream=True, keep_alive=config.OLLAMA_KEEP_ALIVE)
+        async for chunk in stream:
+            token = chunk['message']['content']
+            if token:
+                parts.append(token)
+                if on_token:
+                    on_token(token)
+        return ''.join(parts)
+
+    async def advise(self, key, prompt, suit_mapping=None, on_token=None):
+        """
+        Porada dla sytuacji (klucz i prompt z llm_coach.poker_prompt / blackjack_prompt). Zapamiętana porada
+        trafia do `on_token` w całości; anulowanie zadania przerywa strumień bez zapisu porady.
+        """
+        advice = cached_advice(key, suit_mapping)
+        if advice is not None:
+            if on_token:
+                on_token(advice)
+            return advice
+        try:
+            advice = await asyncio.wait_for(self._stream(prompt, on_token), self.timeout)
+        except asyncio.TimeoutError:
+            message = f"\n[Przekroczono limit czasu porady: {self.timeout} s]"
+            if on_token:
+                on_token(message)
+            return message
+        except Exception as e:
+            message = f"Błąd komunikacji z Ollama dla modelu '{self.model}': {e}"
+            if on_token:
+                on_token(message)
+            return message
+        store_advice(key, advice, suit_mapping)
+        return advice
+
+    async def close(self):
+        await self.client.close()
+
+
+class CoachSession:
+    """
+    Pętla asyncio w osobnym wątku dla synchronicznego kodu (potok kamery). Jednocześnie trwa najwyżej
+    jedna porada: zapytanie o inną sytuację anuluje poprzednie, ta sama sytuacja nie przerywa strumienia.
+    """
+
+    def __init__(self, coach=None):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name='coach', daemon=True)
+        self._thread.start()
+        self.coach = coach or AsyncCoach()
+        self.key = None
+        self.text = ''  # dotychczas odebrana treść bieżącej porady
+        self._future = None
+        self._lock = threading.Lock()
+
+    def prewarm(self):
+        return asyncio.run_coroutine_threadsafe(self.coach.prewarm(), self.loop)
+
+    def request(self, key, prompt, suit_mapping=None, on_token=None):
+        """Zwraca concurrent.futures.Future z pełną poradą."""
+        def collect(token):
+            # Fragment anulowanego strumienia, który dotarł przed anulowaniem, nie trafia do nowej porady.
+            if self.key == key:
+                self.text += token
+                if on_token:
+                    on_token(token)
+
+        with self._lock:
+            if key == self.key and self._future is not None:
+                return self._future
+            if self._future is not None:
+                self._future.cancel()
+            self.key, self.text = key, ''
+            self._future = asyncio.run_coroutine_threadsafe(self.coach.advise(key, prompt, suit_mapping, collect), self.loop)
+            return self._future
+
+    def cancel(self):
+        with self._lock:
+            if self._future is not None:
+                self._future.cancel()
+            self.key = self._future = None
+            self.text = ''
+
+    def close(self):
+        self.cancel()
+        try:
+            asyncio.run_coroutine_threadsafe(self.coach.close(), self.loop).result(timeout=5)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
@@ -1,7 +1,51 @@
 import ollama
-from src.config import OLLAMA_MODEL
+from src.config import ADVICE_EQUITY_BUCKET, COACH_TIMEOUT, OLLAMA_HOST, OLLAMA_MODEL
+from src.llm.advice_cache import canonical_suits, get_advice_cache, translate_suits
+from src.logic.blackjack_logic import hand_signature
 
-def get_poker_advice(my_cards, community_cards, equity, num_opponents, game_stage):
+# Wersja treści promptów - zmiana promptu unieważnia porady zapamiętane dla poprzedniej wersji.
+PROMPT_VERSION = 1
+CHAT_OPTIONS = {'temperature': 0.5}
+
+# Wspólny klient HTTP z limitem czasu (moduł ollama domyślnie czeka na odpowiedź bez końca).
+_client = ollama.Client(host=OLLAMA_HOST, timeout=COACH_TIMEOUT)
+
+def _full_key(key):
+    return f"{OLLAMA_MODEL}|v{PROMPT_VERSION}|{key}"
+
+def cached_advice(key, suit_mapping=None):
+    """
+    Porada z pamięci albo None. Porady pokera są zapisywane z kolorami kanonicznymi (`suit_mapping`:
+    kolor rzeczywisty -> kanoniczny) i przy odczycie tłumaczone na kolory bieżącej ręki.
+    """
+    cache = get_advice_cache()
+    advice = cache.get(_full_key(key)) if cache is not None else None
+    if advice is not None and suit_mapping:
+        advice = translate_suits(advice, {canonical: suit for suit, canonical in suit_mapping.items()})
+    return advice
+
+def store_advice(key, advice, suit_mapping=None):
+    cache = get_advice_cache()
+    if cache is not None:
+        cache.put(_full_key(key), translate_suits(advice, suit_mapping) if suit_mapping else advice)
+
+def chat_messages(prompt):
+    return [{'role': 'user', 'content': prompt}]
+
+def _ask_coach(key, prompt, suit_mapping=None):
+    advice = cached_advice(key, suit_mapping)
+    if advice is not None:
+        return advice
+    try:
+        response = _client.chat(model=OLLAMA_MODEL, messages=chat_messages(prompt), options=CHAT_OPTIONS)
+        advice = response['message']['content']
+    except Exception as e:
+        return f"Błąd komunikacji z Ollama dla modelu '{OLLAMA_MODEL}': {e}"
+    store_advice(key, advice, suit_mapping)
+    return advice
+
+def poker_prompt(my_cards, community_cards, equity, num_opponents, game_stage):
+    """(klucz pamięci, prompt, permutacja kolorów) dla sytuacji pokerowej."""
     card_map = {
         'A': 'As', 'K': 'Król', 'Q': 'Dama', 'J': 'Walet', 'T': '10',
         'H': ' Kier', 'D': ' Karo', 'C': ' Trefl', 'S': ' Pik'
@@ -23,13 +67,15 @@ Zadanie:
 2. Zagrożenia: Jakie układy mogą mnie pokonać?
 3. Rekomendacja: Jaką strategię przyjąć (agresywną, pasywną, spasować) i dlaczego?
 """
-    try:
-        response = ollama.chat(model=OLLAMA_MODEL, messages=[{'role': 'user', 'content': prompt}], options={'temperature': 0.5})
-        return response['message']['content']
-    except Exception as e:
-        return f"Błąd komunikacji z Ollama dla modelu '{OLLAMA_MODEL}': {e}"
+    hand_key, suit_mapping = canonical_suits(my_cards, community_cards)
+    equity_bucket = int(equity / ADVICE_EQUITY_BUCKET)
+    return f"poker|{hand_key}|{game_stage}|{num_opponents}|{equity_bucket}", prompt, suit_mapping
 
-def get_blackjack_advice(player_hand, dealer_up_card, recommended_move, player_value):
+def get_poker_advice(my_cards, community_cards, equity, num_opponents, game_stage):
+    return _ask_coach(*poker_prompt(my_cards, community_cards, equity, num_opponents, game_stage))
+
+def blackjack_prompt(player_hand, dealer_up_card, recommended_move, player_value):
+    """(klucz pamięci, prompt, None) dla sytuacji blackjackowej."""
     card_map = {
         'A': 'As', 'K': 'Król', 'Q': 'Dama', 'J': 'Walet', 'T': '10',
         'H': ' Kier', 'D': ' Karo', 'C': ' Trefl', 'S': ' Pik'
@@ -50,8 +96,8 @@ Sytuacja:
 Zadanie:
 Wyjaśnij prostym językiem, dlaczego rekomendowany ruch jest najlepszy. Odnieś się do karty krupiera - czy jest ona dla niego 'słaba' (2-6) czy 'silna' (7-A)? Co to oznacza dla mojej decyzji?
 """
-    try:
-        response = ollama.chat(model=OLLAMA_MODEL, messages=[{'role': 'user', 'content': prompt}], options={'temperature': 0.5})
-        return response['message']['content']
-    except Exception as e:
-        return f"Błąd komunikacji z Ollama dla modelu '{OLLAMA_MODEL}': {e}"
\ No newline at end of file
+    hand_type, total, dealer_value = hand_signature(player_hand, dealer_up_card)
+    return f"blackjack|{hand_type}|{total}|{dealer_value}|{recommended_move}", prompt, None
+
+def get_blackjack_advice(player_hand, dealer_up_card, recommended_move, player_value):
+    return _ask_coach(*blackjack_prompt(player_hand, dealer_up_card, recommended_move, player_value))
\ No newline at end of file
@@ -0,0 +1,244 @@
+import threading
+from collections import Counter
+from functools import lru_cache
+
+import src.config as config
+from src.logic.blackjack_logic import (
+    _card_index, _dealer_distribution, _final_total, _hard_total, _outcome_against_dealer, dealer_distribution_by_index,
+    default_rules, full_shoe, normalize_card, remove_cards,
+)
+
+
+def _draw(shoe, index):
+    return shoe[:index] + (shoe[index] - 1,) + shoe[index + 1:]
+
+
+# EV liczone są przy założeniu, że krupier sprawdził zakrytą kartę i nie ma blackjacka (peek),
+# więc wszystkie akcje porównywane są w tej samej sytuacji.
+@lru_cache(maxsize=config.BLACKJACK_CACHE_SIZE)
+def _stand_ev(shoe, total, up_index, hits_soft_17):
+    if total > 21:
+        return -1.0
+    win, _, loss = _outcome_against_dealer(total, dealer_distribution_by_index(shoe, up_index, hits_soft_17, True))
+    return win - loss
+
+
+@lru_cache(maxsize=config.BLACKJACK_CACHE_SIZE)
+def _hit_ev(shoe, dealer_shoe, hard_total, has_ace, up_index, hits_soft_17, depth=0):
+    # Prawdopodobieństwa dobrania karty zawsze liczone są z aktualnego buta. Do rozkładu krupiera
+    # usuwane są tylko pierwsze BLACKJACK_EV_DEALER_REMOVAL_DEPTH dobrane karty: dalsze zmieniają
+    # go pomijalnie, a bez tego każda sekwencja dobrań wymagałaby osobnego przeliczenia krupiera.
+    remaining = sum(shoe)
+    ev = 0.0
+    for index, count in enumerate(shoe):
+        if not count:
+            continue
+        next_shoe = _draw(shoe, index)
+        next_dealer_shoe = next_shoe if depth < config.BLACKJACK_EV_DEALER_REMOVAL_DEPTH else dealer_shoe
+        next_hard, next_ace = hard_total + index + 1, has_ace or index == 0
+        total = _final_total(next_hard, next_ace)
+        if total > 21:
+            outcome = -1.0
+        else:
+            outcome = _stand_ev(next_dealer_shoe, total, up_index, hits_soft_17)
+            if total < 21:
+                outcome = max(outcome, _hit_ev(next_shoe, next_dealer_shoe, next_hard, next_ace, up_index, hits_soft_17,
+                                                     min(depth + 1, config.BLACKJACK_EV_DEALER_REMOVAL_DEPTH)))
+        ev += count / remaining * outcome
+    return ev
+
+
+def _double_ev(shoe, hard_total, has_ace, up_index, hits_soft_17):
+    remaining = sum(shoe)
+    ev = 0.0
+    for index, count in enumerate(shoe):
+        if count:
+            total = _final_total(hard_total + index + 1, has_ace or index == 0)
+            ev += count / remaining * _stand_ev(_draw(shoe, index), total, up_index, hits_soft_17)
+    return 2 * ev
+
+
+@lru_cache(maxsize=config.BLACKJACK_CACHE_SIZE)
+def _split_ev(shoe, pair_index, up_index, rules):
+    # Każda z dwóch rąk zaczyna się od karty pary i dostaje jedną kartę z buta; bez ponownego splitu.
+    # Asy po splicie dostają tylko jedną kartę.
+    remaining = sum(shoe)
+    ev = 0.0
+    for index, count in enumerate(shoe):
+        if not count:
+            continue
+        next_shoe = _draw(shoe, index)
+        hard_total, has_ace = pair_index + index + 2, pair_index == 0 or index == 0
+        total = _final_total(hard_total, has_ace)
+        hand_ev = _stand_ev(next_shoe, total, up_index, rules.hits_soft_17)
+        if pair_index != 0 and total < 21:
+            hand_ev = max(hand_ev, _hit_ev(next_shoe, next_shoe, hard_total, has_ace, up_index, rules.hits_soft_17))
+            if rules.double_after_split:
+                hand_ev = max(hand_ev, _double_ev(next_shoe, hard_total, has_ace, up_index, rules.hits_soft_17))
+        ev += count / remaining * hand_ev
+    return 2 * ev
+
+
+# Rozkłady (wygrana, remis, przegrana) przy grze według tych samych decyzji co EV powyżej; rozkład krupiera
+# może być warunkowany na brak blackjacka (no_blackjack) albo nie, ale decyzje zawsze zapadają po peeku.
+def _mix(shoe, outcome_after):
+    remaining = sum(shoe)
+    win = push = loss = 0.0
+    for index, count in enumerate(shoe):
+        if count:
+            w, p, l = outcome_after(index)
+            win += count / remaining * w
+            push += count / remaining * p
+            loss += count / remaining * l
+    return win, push, loss
+
+
+@lru_cache(maxsize=config.BLACKJACK_CACHE_SIZE)
+def _stand_outcomes(shoe, total, up_index, hits_soft_17, no_blackjack):
+    if total > 21:
+        return 0.0, 0.0, 1.0
+    return _outcome_against_dealer(total, dealer_distribution_by_index(shoe, up_index, hits_soft_17, no_blackjack))
+
+
+@lru_cache(maxsize=config.BLACKJACK_CACHE_SIZE)
+def _hit_outcomes(shoe, dealer_shoe, hard_total, has_ace, up_index, hits_soft_17, no_blackjack, depth=0):
+    # Po każdej dobranej karcie gracz dobiera dalej tylko wtedy, gdy _hit_ev daje więcej niż stanie.
+    def outcome_after(index):
+        next_shoe = _draw(shoe, index)
+        next_dealer_shoe = next_shoe if depth < config.BLACKJACK_EV_DEALER_REMOVAL_DEPTH else dealer_shoe
+        next_hard, next_ace = hard_total + index + 1, has_ace or index == 0
+        next_depth = min(depth + 1, config.BLACKJACK_EV_DEALER_REMOVAL_DEPTH)
+        total = _final_total(next_hard, next_ace)
+        if total < 21 and (_hit_ev(next_shoe, next_dealer_shoe, next_hard, next_ace, up_index, hits_soft_17, next_depth)
+                           > _stand_ev(next_dealer_shoe, total, up_index, hits_soft_17)):
+            return _hit_outcomes(next_shoe, next_dealer_shoe, next_hard, next_ace, up_index, hits_soft_17, no_blackjack,
+                                 next_depth)
+        return _stand_outcomes(next_dealer_shoe, total, up_index, hits_soft_17, no_blackjack)
+    return _mix(shoe, outcome_after)
+
+
+def _double_outcomes(shoe, hard_total, has_ace, up_index, hits_soft_17, no_blackjack):
+    return _mix(shoe, lambda index: _stand_outcomes(
+        _draw(shoe, index), _final_total(hard_total + index + 1, has_ace or index == 0), up_index, hits_soft_17, no_blackjack))
+
+
+def _split_outcomes(shoe, pair_index, up_index, rules, no_blackjack):
+    # Jedna z dwóch jednakowych rąk po splicie, z decyzją o dobieraniu i podwojeniu jak w _split_ev.
+    def outcome_after(index):
+        next_shoe = _draw(shoe, index)
+        hard_total, has_ace = pair_index + index + 2, pair_index == 0 or index == 0
+        total = _final_total(hard_total, has_ace)
+        if pair_index == 0 or total == 21:
+            return _stand_outcomes(next_shoe, total, up_index, rules.hits_soft_17, no_blackjack)
+        evs = {'S': _stand_ev(next_shoe, total, up_index, rules.hits_soft_17),
+               'H': _hit_ev(next_shoe, next_shoe, hard_total, has_ace, up_index, rules.hits_soft_17)}
+        if rules.double_after_split:
+            evs['D'] = _double_ev(next_shoe, hard_total, has_ace, up_index, rules.hits_soft_17)
+        move = best_action(evs)
+        if move == 'H':
+            return _hit_outcomes(next_shoe, next_shoe, hard_total, has_ace, up_index, rules.hits_soft_17, no_blackjack)
+        if move == 'D':
+            return _double_outcomes(next_shoe, hard_total, has_ace, up_index, rules.hits_soft_17, no_blackjack)
+        return _stand_outcomes(next_shoe, total, up_index, rules.hits_soft_17, no_blackjack)
+    return _mix(shoe, outcome_after)
+
+
+def action_outcomes(player_hand, move_code, up_index, shoe, rules, no_blackjack):
+    """(wygrana, remis, przegrana) dla ruchu ręką bez blackjacka; Hit z dalszym dobieraniem według EV."""
+    hard_total, has_ace = _hard_total(player_hand)
+    if move_code == 'P':
+        return _split_outcomes(shoe, _card_index(player_hand[0]), up_index, rules, no_blackjack)
+    if move_code == 'H':
+        return _hit_outcomes(shoe, shoe, hard_total, has_ace, up_index, rules.hits_soft_17, no_blackjack)
+    if move_code in ('D', 'DS'):
+        return _double_outcomes(shoe, hard_total, has_ace, up_index, rules.hits_soft_17, no_blackjack)
+    return _stand_outcomes(shoe, _final_total(hard_total, has_ace), up_index, rules.hits_soft_17, no_blackjack)
+
+
+def calculate_action_evs(player_hand, dealer_up_card, shoe=None, rules=None):
+    """
+    Oczekiwana wartość (w jednostkach stawki) każdej dozwolonej akcji: 'S', 'H', 'D', 'P', 'R'.
+    shoe to skład buta bez kart widocznych na stole; domyślnie pełny but bez tych kart.
+    """
+    rules = rules or default_rules()
+    player_hand = [normalize_card(c) for c in player_hand]
+    dealer_up_card = normalize_card(dealer_up_card)
+    if shoe is None:
+        shoe = remove_cards(full_shoe(rules.num_decks), player_hand + [dealer_up_card])
+    up_index = _card_index(dealer_up_card)
+
+    hard_total, has_ace = _hard_total(player_hand)
+    total = _final_total(hard_total, has_ace)
+    is_initial = len(player_hand) == 2
+    if is_initial and total == 21:
+        return {'S': 1.5}
+
+    evs = {'S': _stand_ev(shoe, total, up_index, rules.hits_soft_17)}
+    if total < 21:
+        evs['H'] = _hit_ev(shoe, shoe, hard_total, has_ace, up_index, rules.hits_soft_17)
+    if is_initial:
+        evs['D'] = _double_ev(shoe, hard_total, has_ace, up_index, rules.hits_soft_17)
+        if player_hand[0][0] == player_hand[1][0]:
+            evs['P'] = _split_ev(shoe, _card_index(player_hand[0]), up_index, rules)
+        if rules.surrender:
+            evs['R'] = -0.5
+    return evs
+
+
+def best_action(action_evs):
+    return max(action_evs, key=action_evs.get)
+
+
+def clear_caches():
+    for cached in (_stand_ev, _hit_ev, _split_ev, _stand_outcomes, _hit_outcomes, dealer_distribution_by_index,
+                   _dealer_distribution):
+        cached.cache_clear()
+
+
+class ShoeTracker:
+    """
+    Skład buta aktualizowany kartami rozpoznanymi w kolejnych klatkach sesji kamery.
+    Karta jest odejmowana raz na rozdanie: liczy się największa liczba egzemplarzy każdej karty widoczna
+    naraz w jednej klatce, więc dwie jednakowe karty z różnych talii odejmowane są obie, a te same karty
+    w kolejnych klatkach - tylko raz. Rozdanie kończy new_round() albo SHOE_ROUND_EMPTY_FRAMES kolejnych
+    klatek bez kart (pojedyncza klatka bez detekcji nie zaczyna nowego rozdania). observe() wołany jest
+    z wątku analizy, a reset() i new_round() z wątku interfejsu, więc stan chroni blokada.
+    """
+
+    def __init__(self, num_decks=None, empty_frames=None):
+        self.num_decks = num_decks or config.BLACKJACK_NUM_DECKS
+        self.empty_frames = empty_frames or config.SHOE_ROUND_EMPTY_FRAMES
+        self._lock = threading.Lock()
+        self.reset()
+
+    def _start_round(self):
+        self._round_cards = Counter()
+        self._empty_streak = 0
+
+    def reset(self):
+        with self._lock:
+            self.shoe = full_shoe(self.num_decks)
+            self._start_round()
+
+    def new_round(self):
+        with self._lock:
+            self._start_round()
+
+    def observe(self, cards):
+        """Etykiety wszystkich detekcji klatki (z powtórzeniami); zwraca skład buta po odjęciu nowych kart."""
+        current = Counter(normalize_card(c) for c in cards)
+        with self._lock:
+            if not current:
+                self._empty_streak += 1
+                if self._empty_streak >= self.empty_frames:
+                    self._start_round()
+                return self.shoe
+            self._empty_streak = 0
+            new_cards = current - self._round_cards
+            self._round_cards |= current
+            self.shoe = remove_cards(self.shoe, new_cards.elements())
+            return self.shoe
+
+    @property
+    def cards_remaining(self):
+        return sum(self.shoe)
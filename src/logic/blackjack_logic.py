@@ -1,41 +1,41 @@
-import random
+from collections import namedtuple
+from functools import lru_cache
+
 import src.config as config
+from src.logic.strategy_chart import FALLBACK, HARD, MOVE_CODES, PAIR, SOFT, chart_offset, load_chart, lookup_codes
 
 CARD_VALUES = {
     '2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, '9': 9, 
     'T': 10, 'J': 10, 'Q': 10, 'K': 10, 'A': 11
 }
 
-STRATEGY_HARD = {
-    17: 'S', 16: 'S', 15: 'S', 14: 'S', 13: 'S',
-    12: {2: 'H', 3: 'H', 4: 'S', 5: 'S', 6: 'S', 7: 'H'},
-    11: 'D', 10: 'D', 9: {2: 'H', 3: 'D', 4: 'D', 5: 'D', 6: 'D', 7: 'H'},
-    8: 'H',
+MOVE_MAP = {
+    'S': 'Stand (Nie dobieraj)', 'H': 'Hit (Dobierz)', 'D': 'Double Down (Podwój)',
+    'P': 'Split (Rozdziel)', 'DS': 'Double Down, jeśli można, inaczej Stand',
+    'R': 'Surrender (Poddaj się)', 'RS': 'Surrender, jeśli można, inaczej Stand',
+    'RP': 'Surrender, jeśli można, inaczej Split'
 }
 
-STRATEGY_SOFT = {
-    20: 'S', 19: 'S',
-    18: {2: 'DS', 3: 'DS', 4: 'DS', 5: 'DS', 6: 'DS', 7: 'S', 8: 'S', 9: 'H'},
-    17: 'H', 16: 'H', 15: 'H', 14: 'H', 13: 'H',
-}
+Rules = namedtuple('Rules', ['num_decks', 'hits_soft_17', 'double_after_split', 'surrender'])
 
-STRATEGY_PAIRS = {
-    'A': 'P', 'T': 'S',
-    '9': {2: 'P', 3: 'P', 4: 'P', 5: 'P', 6: 'P', 7: 'S', 8: 'P', 9: 'P', 10: 'S'},
-    '8': 'P', '7': 'P', '6': 'P', '5': 'D', '4': 'H',
-    '3': {2: 'P', 3: 'P', 4: 'P', 5: 'P', 6: 'P', 7: 'P', 8: 'H'},
-    '2': {2: 'P', 3: 'P', 4: 'P', 5: 'P', 6: 'P', 7: 'P', 8: 'H'},
-}
+def default_rules():
+    return Rules(config.BLACKJACK_NUM_DECKS, config.DEALER_HITS_ON_SOFT_17,
+                 config.BLACKJACK_DOUBLE_AFTER_SPLIT, config.BLACKJACK_SURRENDER)
 
-MOVE_MAP = {
-    'S': 'Stand (Nie dobieraj)', 'H': 'Hit (Dobierz)', 'D': 'Double Down (Podwój)',
-    'P': 'Split (Rozdziel)', 'DS': 'Double Down, jeśli można, inaczej Stand'
-}
+# Skład buta: liczba kart o wartości 1 (As), 2, ..., 9, 10 (dziesiątki i figury).
+def full_shoe(num_decks):
+    return (4 * num_decks,) * 9 + (16 * num_decks,)
 
-def _create_deck():
-    ranks = '23456789TJQKA'
-    suits = 'HDCS'
-    return [r + s for r in ranks for s in suits] * 4
+def _card_index(card):
+    return CARD_VALUES[card[0]] - 1 if card[0] != 'A' else 0
+
+def remove_cards(shoe, cards):
+    shoe = list(shoe)
+    for card in cards:
+        index = _card_index(normalize_card(card))
+        if shoe[index] > 0:
+            shoe[index] -= 1
+    return tuple(shoe)
 
 def normalize_card(card):
     if card.startswith('10'): return 'T' + card[2:]
@@ -54,86 +54,133 @@ def calculate_hand_value(hand):
         num_aces -= 1
     return value
 
-def get_basic_strategy_move(player_hand, dealer_up_card):
+def _chart_position(player_hand, dealer_up_card):
+    player_value = calculate_hand_value(player_hand)
+    hard_total, has_ace = _hard_total(player_hand)
+    if len(player_hand) == 2 and player_hand[0][0] == player_hand[1][0]:
+        hand_type, total = PAIR, CARD_VALUES[player_hand[0][0]]
+    elif has_ace and hard_total + 10 <= 21:
+        hand_type, total = SOFT, player_value
+    else:
+        hand_type, total = HARD, min(player_value, 21)
+    return hand_type, total, CARD_VALUES[dealer_up_card[0]], player_value
+
+def hand_signature(player_hand, dealer_up_card):
+    """(typ ręki: 'hard'/'soft'/'pair', suma lub wartość pary, wartość karty krupiera) - bez kolorów i figur."""
+    hand_type, total, dealer_value, _ = _chart_position([normalize_card(c) for c in player_hand], normalize_card(dealer_up_card))
+    return ('hard', 'soft', 'pair')[hand_type], total, dealer_value
+
+def _final_move_code(move_code, player_hand, player_value):
+    if player_value > 21: return 'S'
+    if len(player_hand) > 2: return FALLBACK.get(move_code, move_code)
+    return move_code
+
+def get_basic_strategy_move(player_hand, dealer_up_card, rules=None):
     player_hand = [normalize_card(c) for c in player_hand]
     dealer_up_card = normalize_card(dealer_up_card)
-    player_value = calculate_hand_value(player_hand)
-    dealer_value = CARD_VALUES.get(dealer_up_card[0], 0)
-    is_pair = len(player_hand) == 2 and player_hand[0][0] == player_hand[1][0]
-    is_soft = 'A' in [c[0] for c in player_hand] and player_value - 11 <= 10
-
-    move_code = 'H'
-    if is_pair: move_code = STRATEGY_PAIRS.get(player_hand[0][0], 'H')
-    elif is_soft and player_value > 12: move_code = STRATEGY_SOFT.get(player_value, 'H')
-    else: move_code = STRATEGY_HARD.get(player_value, 'S')
-
-    if isinstance(move_code, dict): move_code = move_code.get(dealer_value, 'H')
-    if player_value >= 17 and not is_soft: move_code = 'S'
-    if player_value > 21: move_code = 'S'
+    hand_type, total, dealer_value, player_value = _chart_position(player_hand, dealer_up_card)
 
+    move_code = MOVE_CODES[load_chart(rules or default_rules())[chart_offset(hand_type, total, dealer_value)]]
+    move_code = _final_move_code(move_code, player_hand, player_value)
     return MOVE_MAP.get(move_code), move_code, player_value
 
-def _play_dealer_hand(dealer_hand, deck):
-    hand = list(dealer_hand)
-    while True:
-        score = calculate_hand_value(hand)
-        is_soft = 'A' in [c[0] for c in hand] and score - 11 <= 10
-        if score > 17 or (score == 17 and not (is_soft and config.DEALER_HITS_ON_SOFT_17)):
-            break
-        hand.append(deck.pop())
-    return calculate_hand_value(hand)
-
-def _play_player_hand(player_hand, deck, move_code):
-    hand = list(player_hand)
-    if move_code in ['H', 'D', 'DS']:
-        hand.append(deck.pop())
-    return calculate_hand_value(hand)
-
-def _compare_hands(player_score, dealer_score):
-    if player_score > 21: return 'loss'
-    if dealer_score > 21 or player_score > dealer_score: return 'win'
-    if player_score == dealer_score: return 'push'
-    return 'loss'
+def get_basic_strategy_moves(player_hands, dealer_up_cards, rules=None):
+    """Wersja wsadowa get_basic_strategy_move: jeden wektorowy odczyt tablicy dla wszystkich rąk."""
+    player_hands = [[normalize_card(c) for c in hand] for hand in player_hands]
+    positions = [_chart_position(hand, normalize_card(up)) for hand, up in zip(player_hands, dealer_up_cards)]
+    if not positions:
+        return []
+    hand_types, totals, dealer_values, player_values = zip(*positions)
+    codes = lookup_codes(load_chart(rules or default_rules()), hand_types, totals, dealer_values)
+
+    moves = []
+    for hand, code, player_value in zip(player_hands, codes, player_values):
+        move_code = _final_move_code(MOVE_CODES[code], hand, player_value)
+        moves.append((MOVE_MAP.get(move_code), move_code, player_value))
+    return moves
+
+# Wynik krupiera: indeksy 0..4 to 17..21, indeks 5 to fura.
+DEALER_BUST = 5
+
+@lru_cache(maxsize=config.BLACKJACK_CACHE_SIZE)
+def _dealer_distribution(shoe, hard_total, has_ace, hits_soft_17):
+    total = hard_total + 10 if has_ace and hard_total + 10 <= 21 else hard_total
+    if total > 21:
+        return (0.0,) * DEALER_BUST + (1.0,)
+    is_soft = total != hard_total
+    if total > 17 or (total == 17 and not (is_soft and hits_soft_17)):
+        return tuple(1.0 if i == total - 17 else 0.0 for i in range(DEALER_BUST + 1))
+
+    remaining = sum(shoe)
+    distribution = [0.0] * (DEALER_BUST + 1)
+    for index, count in enumerate(shoe):
+        if not count:
+            continue
+        next_shoe = shoe[:index] + (count - 1,) + shoe[index + 1:]
+        outcome = _dealer_distribution(next_shoe, hard_total + index + 1, has_ace or index == 0, hits_soft_17)
+        for i in range(DEALER_BUST + 1):
+            distribution[i] += count / remaining * outcome[i]
+    return tuple(distribution)
+
+@lru_cache(maxsize=config.BLACKJACK_CACHE_SIZE)
+def dealer_distribution_by_index(shoe, up_index, hits_soft_17, no_blackjack=False):
+    excluded = {0: 9, 9: 0}.get(up_index) if no_blackjack else None
+    remaining = sum(count for index, count in enumerate(shoe) if index != excluded)
+
+    distribution = [0.0] * (DEALER_BUST + 1)
+    for index, count in enumerate(shoe):
+        if not count or index == excluded:
+            continue
+        next_shoe = shoe[:index] + (count - 1,) + shoe[index + 1:]
+        outcome = _dealer_distribution(next_shoe, up_index + index + 2, up_index == 0 or index == 0, hits_soft_17)
+        for i in range(DEALER_BUST + 1):
+            distribution[i] += count / remaining * outcome[i]
+    return tuple(distribution)
+
+def dealer_final_distribution(shoe, dealer_up_card, hits_soft_17=None, no_blackjack=False):
+    """
+    Rozkład końcowej sumy krupiera (17, 18, 19, 20, 21, fura) dla danego składu buta.
+    Przy no_blackjack=True zakryta karta jest warunkowana na brak blackjacka krupiera (peek).
+    """
+    if hits_soft_17 is None:
+        hits_soft_17 = config.DEALER_HITS_ON_SOFT_17
+    return dealer_distribution_by_index(shoe, _card_index(normalize_card(dealer_up_card)), hits_soft_17, no_blackjack)
+
+def _hard_total(hand):
+    return sum(_card_index(card) + 1 for card in hand), any(card[0] == 'A' for card in hand)
+
+def _final_total(hard_total, has_ace):
+    return hard_total + 10 if has_ace and hard_total + 10 <= 21 else hard_total
+
+def _outcome_against_dealer(player_score, dealer_distribution):
+    if player_score > 21:
+        return 0.0, 0.0, 1.0
+    win = dealer_distribution[DEALER_BUST] + sum(dealer_distribution[:max(0, min(player_score - 17, DEALER_BUST))])
+    push = dealer_distribution[player_score - 17] if player_score >= 17 else 0.0
+    return win, push, 1.0 - win - push
+
+def calculate_outcome_probabilities(player_hand, dealer_up_card, move_code, shoe=None, no_blackjack=True):
+    """
+    Dokładne prawdopodobieństwa (wygrana, remis, przegrana) dla ruchu, liczone po składzie buta
+    zamiast symulacji. Po Hit i po splicie gracz dobiera dalej według tych samych decyzji co silnik EV,
+    Double oznacza jedną kartę. Blackjack gracza rozstrzyga się od razu.
+    Domyślnie, jak w silniku EV, krupier sprawdził już zakrytą kartę i nie ma blackjacka (peek).
+    """
+    from src.logic.blackjack_ev import action_outcomes
 
-def calculate_win_probability(player_hand, dealer_up_card, move_code):
     player_hand = [normalize_card(c) for c in player_hand]
     dealer_up_card = normalize_card(dealer_up_card)
-    
-    wins, pushes, losses = 0.0, 0.0, 0.0
-    simulations = 100000
-
-    for _ in range(simulations):
-        deck = _create_deck()
-        visible_cards = player_hand + [dealer_up_card]
-        for card in visible_cards:
-            if card in deck: deck.remove(card)
-        random.shuffle(deck)
-
-        if move_code == 'P':
-            hand1_deck = deck[::2]
-            hand2_deck = deck[1::2]
-            
-            player_score1 = _play_player_hand([player_hand[0]], hand1_deck, 'H')
-            player_score2 = _play_player_hand([player_hand[1]], hand2_deck, 'H')
-            
-            dealer_hand = [dealer_up_card]
-            dealer_score = _play_dealer_hand(dealer_hand, hand1_deck + hand2_deck)
-
-            result1 = _compare_hands(player_score1, dealer_score)
-            result2 = _compare_hands(player_score2, dealer_score)
-
-            for result in [result1, result2]:
-                if result == 'win': wins += 0.5
-                elif result == 'push': pushes += 0.5
-                else: losses += 0.5
-        else:
-            player_final_score = _play_player_hand(player_hand, deck, move_code)
-            dealer_hand = [dealer_up_card]
-            dealer_score = _play_dealer_hand(dealer_hand, deck)
-            
-            result = _compare_hands(player_final_score, dealer_score)
-            if result == 'win': wins += 1
-            elif result == 'push': pushes += 1
-            else: losses += 1
-            
-    return wins / simulations
\ No newline at end of file
+    rules = default_rules()
+    if shoe is None:
+        shoe = remove_cards(full_shoe(rules.num_decks), player_hand + [dealer_up_card])
+    up_index = _card_index(dealer_up_card)
+
+    if len(player_hand) == 2 and calculate_hand_value(player_hand) == 21:
+        # Bez peeku remis z blackjackiem krupiera, każda inna ręka krupiera przegrywa.
+        hole_index = {0: 9, 9: 0}.get(up_index)
+        push = 0.0 if no_blackjack or hole_index is None else shoe[hole_index] / sum(shoe)
+        return 1.0 - push, push, 0.0
+    return action_outcomes(player_hand, move_code, up_index, shoe, rules, no_blackjack)
+
+def calculate_win_probability(player_hand, dealer_up_card, move_code):
+    return calculate_outcome_probabilities(player_hand, dealer_up_card, move_code)[0]
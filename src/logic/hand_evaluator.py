@@ -0,0 +1,188 @@
+import os
+import struct
+from array import array
+from itertools import combinations
+
+import src.config as config
+
+RANKS = '23456789TJQKA'
+SUITS = 'HDCS'
+
+# Karta jako liczba 0..51: rank * 4 + suit (kolejność jak w talii RANKS x SUITS).
+CARD_INDEX = {rank + suit: r * 4 + s for r, rank in enumerate(RANKS) for s, suit in enumerate(SUITS)}
+
+HIGH_CARD, PAIR, TWO_PAIR, TRIPS, STRAIGHT, FLUSH, FULL_HOUSE, QUADS, STRAIGHT_FLUSH = range(9)
+
+_TABLES_MAGIC = b'HRNK'
+_TABLES_VERSION = 1
+
+# Klucz układu rang: suma 5**rank po kartach (max 4 karty jednej rangi, więc cyfry w systemie piątkowym się nie przenoszą).
+_RANK_KEY = [5 ** (c >> 2) for c in range(52)]
+# Licznik kolorów: po 4 bity na kolor; dodanie 3 do każdej tetrady ustawia jej najwyższy bit, gdy w kolorze jest >= 5 kart.
+_SUIT_ADD = [1 << (4 * (c & 3)) for c in range(52)]
+_FLUSH_CHECK = 0x3333
+_FLUSH_BITS = 0x8888
+
+_tables = None
+
+
+def card_to_int(card):
+    if card.startswith('10'):
+        card = 'T' + card[2:]
+    return CARD_INDEX[card]
+
+
+def _pack(category, kickers):
+    value = category
+    for i in range(5):
+        value = (value << 4) | (kickers[i] if i < len(kickers) else 0)
+    return value
+
+
+def hand_category(value):
+    return value >> 20
+
+
+def _straight_top(mask):
+    for top in range(12, 3, -1):
+        if (mask >> (top - 4)) & 0x1F == 0x1F:
+            return top
+    if mask & 0x100F == 0x100F:
+        return 3
+    return None
+
+
+def _flush_value(mask):
+    top = _straight_top(mask)
+    if top is not None:
+        return _pack(STRAIGHT_FLUSH, [top])
+    return _pack(FLUSH, [r for r in range(12, -1, -1) if mask >> r & 1][:5])
+
+
+def _rank_value(counts):
+    ranks = [r for r in range(12, -1, -1) for _ in range(counts[r])]
+    groups = sorted(((counts[r], r) for r in range(13) if counts[r]), reverse=True)
+    first_count, first = groups[0]
+
+    if first_count == 4:
+        return _pack(QUADS, [first] + [r for r in ranks if r != first][:1])
+
+    if first_count == 3 and groups[1][0] >= 2:
+        return _pack(FULL_HOUSE, [first, groups[1][1]])
+
+    top = _straight_top(sum(1 << r for r in range(13) if counts[r]))
+    if top is not None:
+        return _pack(STRAIGHT, [top])
+
+    if first_count == 3:
+        return _pack(TRIPS, [first] + [r for r in ranks if r != first][:2])
+
+    if first_count == 2 and groups[1][0] == 2:
+        second = groups[1][1]
+        return _pack(TWO_PAIR, [first, second] + [r for r in ranks if r not in (first, second)][:1])
+
+    if first_count == 2:
+        return _pack(PAIR, [first] + [r for r in ranks if r != first][:3])
+
+    return _pack(HIGH_CARD, ranks[:5])
+
+
+def _rank_multisets(rank=0, remaining=7, counts=None):
+    counts = counts if counts is not None else [0] * 13
+    if rank == 13:
+        if sum(counts) >= 5:
+            yield counts
+        return
+    for count in range(min(4, remaining) + 1):
+        counts[rank] = count
+        yield from _rank_multisets(rank + 1, remaining - count, counts)
+    counts[rank] = 0
+
+
+def build_tables():
+    flush_table = array('i', [0] * 8192)
+    for size in (5, 6, 7):
+        for ranks in combinations(range(13), size):
+            mask = sum(1 << r for r in ranks)
+            flush_table[mask] = _flush_value(mask)
+
+    items = sorted((sum(n * 5 ** r for r, n in enumerate(counts)), _rank_value(counts))
+                   for counts in _rank_multisets())
+    keys = array('q', [key for key, _ in items])
+    values = array('i', [value for _, value in items])
+    return flush_table, keys, values
+
+
+def _write_tables(path, flush_table, keys, values):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(struct.pack('<4sII', _TABLES_MAGIC, _TABLES_VERSION, len(keys)))
+        flush_table.tofile(f)
+        keys.tofile(f)
+        values.tofile(f)
+    os.replace(tmp_path, path)
+
+
+def _read_tables(path):
+    with open(path, 'rb') as f:
+        magic, version, size = struct.unpack('<4sII', f.read(12))
+        if magic != _TABLES_MAGIC or version != _TABLES_VERSION:
+            return None
+        flush_table, keys, values = array('i'), array('q'), array('i')
+        flush_table.fromfile(f, 8192)
+        keys.fromfile(f, size)
+        values.fromfile(f, size)
+    return flush_table, keys, values
+
+
+def load_raw_tables(path=None):
+    """Zwraca (flush_table, keys, values): tablice gotowe także dla numpy.frombuffer."""
+    path = path or config.HAND_RANKS_CACHE_PATH
+    tables = None
+    if os.path.exists(path):
+        try:
+            tables = _read_tables(path)
+        except (OSError, EOFError, struct.error):
+            tables = None
+    if tables is None:
+        tables = build_tables()
+        try:
+            _write_tables(path, *tables)
+        except OSError:
+            pass
+    return tables
+
+
+def load_tables():
+    global _tables
+    if _tables is None:
+        flush_table, keys, values = load_raw_tables()
+        _tables = (list(flush_table), dict(zip(keys, values)))
+    return _tables
+
+
+def evaluate(cards):
+    """
+    Ocenia 5-7 kart zakodowanych jako liczby 0..51. Zwraca jedną liczbę:
+    większa wartość oznacza silniejszy układ, równe wartości oznaczają remis.
+    """
+    if not 5 <= len(cards) <= 7:
+        raise ValueError(f"ocena wymaga od 5 do 7 kart, podano {len(cards)}")
+    flush_table, rank_table = _tables or load_tables()
+    key = 0
+    suits = 0
+    for card in cards:
+        key += _RANK_KEY[card]
+        suits += _SUIT_ADD[card]
+    flush = (suits + _FLUSH_CHECK) & _FLUSH_BITS
+    if flush:
+        suit = (flush.bit_length() - 4) >> 2
+        mask = 0
+        for card in cards:
+            if card & 3 == suit:
+                mask |= 1 << (card >> 2)
+        return flush_table[mask]
+    return rank_table[key]
@@ -0,0 +1,103 @@
+import atexit
+import math
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import src.config as config
+from src.logic.poker_logic import _exact_equity, _fits_exact_budget, _prepare_cards, count_deals, validate_opponents
+from src.logic.poker_vectorized import simulate_shares
+
+# Kwantyl rozkładu normalnego dla 95% przedziału ufności.
+Z_95 = 1.96
+
+_pool = None
+_pool_workers = 0
+
+
+def _get_pool(workers):
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        _pool_workers = workers
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+# Procesy puli kończone są przy wyjściu z programu, także gdy nikt nie wywołał shutdown_pool().
+atexit.register(shutdown_pool)
+
+
+def _simulate_chunk(my_cards, community_cards, deck, num_opponents, simulations, seed_sequence):
+    shares = simulate_shares(my_cards, community_cards, deck, num_opponents, simulations, np.random.default_rng(seed_sequence))
+    return float(shares.sum()), float(np.square(shares).sum()), simulations
+
+
+def _estimate(total, total_sq, samples):
+    mean = total / samples
+    variance = max(total_sq / samples - mean * mean, 0.0)
+    return mean, math.sqrt(variance / samples)
+
+
+def calculate_equity_adaptive(my_cards, community_cards, num_opponents=1, target_stderr=None,
+                              max_simulations=None, chunk_size=None, workers=None, seed=None):
+    """
+    Monte Carlo w paczkach rozdzielanych na procesy, zatrzymywane, gdy błąd standardowy
+    equity spadnie poniżej target_stderr. Zwraca (equity, (dolna, górna granica 95% CI), liczba próbek).
+    Paczki mają własne ziarna z SeedSequence(seed) i są zliczane w kolejności zlecenia,
+    więc przy tym samym seed wynik jest powtarzalny niezależnie od liczby procesów.
+    """
+    target_stderr = target_stderr if target_stderr is not None else config.POKER_ADAPTIVE_TARGET_STDERR
+    max_simulations = max_simulations or config.POKER_ADAPTIVE_MAX_SIMULATIONS
+    chunk_size = chunk_size or config.POKER_ADAPTIVE_CHUNK_SIZE
+    workers = workers or config.POKER_WORKERS or os.cpu_count() or 1
+
+    my_cards, community_cards, deck = _prepare_cards(my_cards, community_cards)
+    validate_opponents(num_opponents, my_cards, community_cards)
+    if _fits_exact_budget(community_cards, deck, num_opponents, None):
+        equity = _exact_equity(my_cards, community_cards, deck, num_opponents)
+        return equity, (equity, equity), count_deals(len(deck), 5 - len(community_cards), num_opponents)
+
+    seeds = iter(np.random.SeedSequence(seed).spawn(math.ceil(max_simulations / chunk_size)))
+    chunk_args = (my_cards, community_cards, deck, num_opponents)
+
+    # Pierwsza paczka liczona na miejscu: oczywiste spoty kończą się bez angażowania puli procesów.
+    total, total_sq, samples = _simulate_chunk(*chunk_args, min(chunk_size, max_simulations), next(seeds))
+    mean, stderr = _estimate(total, total_sq, samples)
+
+    if stderr > target_stderr and samples < max_simulations:
+        pool = _get_pool(workers)
+        pending = deque()
+        submitted = samples
+        try:
+            while True:
+                while len(pending) < workers and submitted < max_simulations:
+                    size = min(chunk_size, max_simulations - submitted)
+                    pending.append(pool.submit(_simulate_chunk, *chunk_args, size, next(seeds)))
+                    submitted += size
+                if not pending:
+                    break
+                chunk_total, chunk_total_sq, chunk_samples = pending.popleft().result()
+                total += chunk_total
+                total_sq += chunk_total_sq
+                samples += chunk_samples
+                mean, stderr = _estimate(total, total_sq, samples)
+                if stderr <= target_stderr:
+                    break
+        finally:
+            # Paczki zlecone ponad potrzebę (wczesne zatrzymanie albo błąd) nie blokują puli kolejnym wywołaniom.
+            for future in pending:
+                future.cancel()
+
+    margin = Z_95 * stderr
+    return mean, (max(mean - margin, 0.0), min(mean + margin, 1.0)), samples
@@ -1,110 +1,122 @@
 import random
+from itertools import combinations
+from math import comb, factorial
 
-RANKS = '23456789TJQKA'
-SUITS = 'HDCS'
-RANK_VALUES = {rank: i for i, rank in enumerate(RANKS)}
+import src.config as config
+from src.logic.hand_evaluator import card_to_int, evaluate
+from src.logic.preflop_table import preflop_equity
 
 def _create_deck():
-    return [rank + suit for rank in RANKS for suit in SUITS]
+    return list(range(52))
 
 def _evaluate_hand(hand_7_cards):
-    ranks = sorted([RANK_VALUES[card[0]] for card in hand_7_cards], reverse=True)
-    suits = [card[1] for card in hand_7_cards]
-    
-    is_flush = None
-    for suit in SUITS:
-        if suits.count(suit) >= 5:
-            is_flush = suit
-            break
-
-    flush_ranks = sorted([RANK_VALUES[card[0]] for card in hand_7_cards if is_flush and card[1] == is_flush], reverse=True)
-    is_straight, straight_top_rank = _is_straight(flush_ranks if is_flush else ranks)
-
-    if is_flush and is_straight:
-        return (8, straight_top_rank)
-
-    rank_counts = {rank: ranks.count(rank) for rank in set(ranks)}
-    counts = sorted(rank_counts.items(), key=lambda item: (item[1], item[0]), reverse=True)
-    
-    if counts[0][1] == 4:
-        return (7, [counts[0][0]] + [r for r in ranks if r != counts[0][0]][:1])
-
-    if counts[0][1] == 3 and counts[1][1] >= 2:
-        return (6, [counts[0][0], counts[1][0]])
-
-    if is_flush:
-        return (5, flush_ranks[:5])
-
-    if is_straight:
-        return (4, straight_top_rank)
-
-    if counts[0][1] == 3:
-        return (3, [counts[0][0]] + [r for r in ranks if r != counts[0][0]][:2])
-
-    if counts[0][1] == 2 and counts[1][1] == 2:
-        return (2, [counts[0][0], counts[1][0]] + [r for r in ranks if r not in [counts[0][0], counts[1][0]]][:1])
-
-    if counts[0][1] == 2:
-        return (1, [counts[0][0]] + [r for r in ranks if r != counts[0][0]][:3])
-        
-    return (0, ranks[:5])
-
-def _is_straight(ranks):
-    unique_ranks = sorted(list(set(ranks)), reverse=True)
-    if len(unique_ranks) < 5:
-        return False, None
-    
-    if set(unique_ranks) >= {12, 0, 1, 2, 3}:
-        return True, 3
-
-    for i in range(len(unique_ranks) - 4):
-        if unique_ranks[i] - unique_ranks[i+4] == 4:
-            return True, unique_ranks[i]
-            
-    return False, None
-
-def calculate_equity(my_cards, community_cards, num_opponents=1, simulations=10000):
-    
-    normalize = lambda c: ('T' + c[2]) if c.startswith('10') else c
-    my_cards = [normalize(c) for c in my_cards]
-    community_cards = [normalize(c) for c in community_cards]
-    
-    deck = _create_deck()
-    
-    for card in my_cards + community_cards:
-        if card in deck:
-            deck.remove(card)
-            
-    wins = 0
-    ties = 0
+    return evaluate([card_to_int(card) for card in hand_7_cards])
+
+def _showdown_share(my_score, opponent_scores):
+    # Przy remisie pula dzielona jest tylko między graczy z najlepszym układem.
+    tied = 0
+    for opp_score in opponent_scores:
+        if opp_score > my_score:
+            return 0.0
+        if opp_score == my_score:
+            tied += 1
+    return 1 / (tied + 1)
+
+def count_deals(deck_size, cards_to_draw, num_opponents):
+    deals = comb(deck_size, cards_to_draw)
+    remaining = deck_size - cards_to_draw
+    for i in range(num_opponents):
+        deals *= comb(remaining - 2 * i, 2)
+    return deals // factorial(num_opponents)
+
+def _opponent_hands(cards, num_opponents, start=0, used=frozenset()):
+    # Zbiory rąk przeciwników bez powtórzeń permutacji: pierwsze karty kolejnych rąk rosną.
+    if num_opponents == 0:
+        yield ()
+        return
+    for i in range(start, len(cards)):
+        first = cards[i]
+        if first in used:
+            continue
+        for second in cards[i + 1:]:
+            if second in used:
+                continue
+            for others in _opponent_hands(cards, num_opponents - 1, i + 1, used | {first, second}):
+                yield ((first, second),) + others
+
+def _exact_equity(my_cards, community_cards, deck, num_opponents):
+    total = 0.0
+    deals = 0
+    for board_draw in combinations(deck, 5 - len(community_cards)):
+        board = community_cards + list(board_draw)
+        my_score = evaluate(my_cards + board)
+        drawn = set(board_draw)
+        rest = [card for card in deck if card not in drawn]
+        hand_scores = {hand: evaluate(list(hand) + board) for hand in combinations(rest, 2)}
+        for opponents in _opponent_hands(rest, num_opponents):
+            total += _showdown_share(my_score, (hand_scores[hand] for hand in opponents))
+            deals += 1
+    return total / deals
+
+def validate_cards(my_cards, community_cards):
+    """ValueError, gdy ręka nie ma dokładnie 2 kart, stół ma ich więcej niż 5 albo karta się powtarza."""
+    if len(my_cards) != 2:
+        raise ValueError(f"ręka gracza musi mieć 2 karty, rozpoznano {len(my_cards)}")
+    if len(community_cards) > 5:
+        raise ValueError(f"stół może mieć najwyżej 5 kart, rozpoznano {len(community_cards)}")
+    if len(set(my_cards) | set(community_cards)) != len(my_cards) + len(community_cards):
+        raise ValueError("ta sama karta występuje więcej niż raz")
+
+def max_opponents(known_cards, community_count):
+    """Najwięcej przeciwników, dla których starczy kart po dobraniu stołu (po 2 karty na rękę)."""
+    return (52 - known_cards - (5 - community_count)) // 2
+
+def validate_opponents(num_opponents, my_cards, community_cards):
+    """ValueError, gdy w talii nie starczy kart, żeby rozdać ręce wszystkim przeciwnikom i dobrać stół."""
+    limit = max_opponents(len(my_cards) + len(community_cards), len(community_cards))
+    if num_opponents > limit:
+        raise ValueError(f"w talii starczy kart najwyżej dla {limit} przeciwników, podano {num_opponents}")
+
+def _prepare_cards(my_cards, community_cards):
+    my_cards = [card_to_int(c) for c in my_cards]
+    community_cards = [card_to_int(c) for c in community_cards]
+    validate_cards(my_cards, community_cards)
+    dead_cards = set(my_cards + community_cards)
+    deck = [card for card in _create_deck() if card not in dead_cards]
+    return my_cards, community_cards, deck
+
+def _fits_exact_budget(community_cards, deck, num_opponents, exact_budget):
+    if exact_budget is None:
+        exact_budget = config.POKER_EXACT_ENUMERATION_BUDGET
+    cards_to_draw = 5 - len(community_cards)
+    return cards_to_draw >= 0 and count_deals(len(deck), cards_to_draw, num_opponents) <= exact_budget
+
+def calculate_equity(my_cards, community_cards, num_opponents=1, simulations=10000, exact_budget=None, engine=None):
+    my_cards, community_cards, deck = _prepare_cards(my_cards, community_cards)
+    validate_opponents(num_opponents, my_cards, community_cards)
+    if not community_cards and config.POKER_USE_PREFLOP_TABLE:
+        equity = preflop_equity(my_cards, num_opponents)
+        if equity is not None:
+            return equity
+
+    if _fits_exact_budget(community_cards, deck, num_opponents, exact_budget):
+        return _exact_equity(my_cards, community_cards, deck, num_opponents)
+
+    if (engine or config.POKER_EQUITY_ENGINE) == 'numpy':
+        from src.logic.poker_vectorized import simulate_shares
+        return float(simulate_shares(my_cards, community_cards, deck, num_opponents, simulations).mean())
+
+    cards_to_draw = 5 - len(community_cards)
+    total = 0.0
     for _ in range(simulations):
         sim_deck = deck[:]
         random.shuffle(sim_deck)
-        
+
         opponents_hands = [sim_deck[i*2:i*2+2] for i in range(num_opponents)]
-        
-        cards_to_draw = 5 - len(community_cards)
         remaining_community = sim_deck[num_opponents*2 : num_opponents*2 + cards_to_draw]
-        
-        my_hand_7 = my_cards + community_cards + remaining_community
-        my_score = _evaluate_hand(my_hand_7)
-        
-        is_winner = True
-        is_tie = False
-        
-        for opp_hand in opponents_hands:
-            opp_hand_7 = opp_hand + community_cards + remaining_community
-            opp_score = _evaluate_hand(opp_hand_7)
-            if opp_score > my_score:
-                is_winner = False
-                break
-            if opp_score == my_score:
-                is_tie = True
-
-        if is_winner:
-            if is_tie:
-                ties += 1
-            else:
-                wins += 1
-            
-    return wins / simulations + (ties / simulations) / (num_opponents + 1)
\ No newline at end of file
+        board = community_cards + remaining_community
+
+        my_score = evaluate(my_cards + board)
+        total += _showdown_share(my_score, (evaluate(opp_hand + board) for opp_hand in opponents_hands))
+
+    return total / simulations
@@ -0,0 +1,243 @@
+import re
+from functools import lru_cache
+from itertools import combinations
+from math import comb
+
+import numpy as np
+
+import src.config as config
+from src.logic.hand_evaluator import RANKS, SUITS, card_to_int
+from src.logic.poker_logic import validate_cards
+from src.logic.poker_vectorized import _score_holdings
+
+# Maksymalna liczba komórek (rozdania x układy zakresu) w jednej paczce symulacji.
+CHUNK_CELLS = 1 << 21
+MAX_CHUNK = 8192
+
+_RANK = '[2-9TJQKA]'
+_PAIR = re.compile(rf'^({_RANK})\1(\+)?$')
+_PAIR_SPAN = re.compile(rf'^({_RANK})\1-({_RANK})\2$')
+_NON_PAIR = re.compile(rf'^({_RANK})({_RANK})([SO])?(\+)?$')
+_NON_PAIR_SPAN = re.compile(rf'^({_RANK})({_RANK})([SO])?-({_RANK})({_RANK})([SO])?$')
+_COMBO = re.compile(rf'^({_RANK}[HDCS])({_RANK}[HDCS])$')
+ANY_RANGE = ('ANY', 'RANDOM', '*')
+
+
+def _pair_combos(rank):
+    return list(combinations([rank * 4 + suit for suit in range(len(SUITS))], 2))
+
+
+def _non_pair_combos(high, low, kind):
+    return [(high * 4 + high_suit, low * 4 + low_suit)
+            for high_suit in range(len(SUITS)) for low_suit in range(len(SUITS))
+            if kind is None or (kind == 'S') == (high_suit == low_suit)]
+
+
+def _token_combos(token):
+    """Układy (pary liczb 0..51) dla jednego elementu zapisu zakresu, np. QQ+, 22-55, AKs, ATo+, KTs-K7s, AhKh."""
+    index = RANKS.index
+    if token in ANY_RANGE:
+        return list(combinations(range(52), 2))
+    if match := _PAIR.match(token):
+        first = index(match[1])
+        return [combo for rank in range(first, len(RANKS) if match[2] else first + 1) for combo in _pair_combos(rank)]
+    if match := _PAIR_SPAN.match(token):
+        low, high = sorted((index(match[1]), index(match[2])))
+        return [combo for rank in range(low, high + 1) for combo in _pair_combos(rank)]
+    if match := _NON_PAIR.match(token):
+        high, low = index(match[1]), index(match[2])
+        if high == low:
+            raise ValueError(f"'{token}': para zapisywana jest bez s/o, np. QQ")
+        high, low = max(high, low), min(high, low)
+        lows = range(low, high) if match[4] else (low,)
+        return [combo for kicker in lows for combo in _non_pair_combos(high, kicker, match[3])]
+    if match := _NON_PAIR_SPAN.match(token):
+        high, first, kind, other_high, last, other_kind = match.groups()
+        if high != other_high or kind != other_kind or index(first) >= index(high) or index(last) >= index(high):
+            raise ValueError(f"'{token}': przedział musi mieć wspólną starszą kartę i typ, np. KTs-K7s")
+        low, top = sorted((index(first), index(last)))
+        return [combo for kicker in range(low, top + 1) for combo in _non_pair_combos(index(high), kicker, kind)]
+    if match := _COMBO.match(token):
+        first, second = card_to_int(match[1]), card_to_int(match[2])
+        if first == second:
+            raise ValueError(f"'{token}': powtórzona karta")
+        return [(first, second)]
+    raise ValueError(f"nieznany element zakresu '{token}'")
+
+
+def normalize_range(text):
+    return ','.join(token.strip().upper() for token in text.split(',') if token.strip())
+
+
+@lru_cache(maxsize=256)
+def compile_range(text):
+    """
+    Zakres w zapisie standardowym ("QQ+, AKs, KQo:0.5") jako tablice układów (k, 2) i ich wag (k,).
+    Waga po dwukropku (domyślnie 1) dotyczy wszystkich układów elementu; późniejszy element nadpisuje wcześniejszy.
+    Tablice są współdzielone między wywołaniami, dlatego tylko do odczytu.
+    """
+    weights = {}
+    for token in normalize_range(text).split(','):
+        token, _, weight = token.partition(':')
+        try:
+            weight = float(weight) if weight else 1.0
+        except ValueError:
+            raise ValueError(f"nieprawidłowa waga w '{token}:{weight}'")
+        if weight < 0:
+            raise ValueError(f"ujemna waga w '{token}'")
+        for first, second in _token_combos(token):
+            weights[(min(first, second), max(first, second))] = weight
+    weights = {combo: weight for combo, weight in weights.items() if weight > 0}
+    if not weights:
+        raise ValueError(f"pusty zakres '{text}'")
+    combos = np.array(sorted(weights), dtype=np.int64)
+    combo_weights = np.array([weights[tuple(combo)] for combo in combos.tolist()], dtype=np.float64)
+    combos.flags.writeable = combo_weights.flags.writeable = False
+    return combos, combo_weights
+
+
+def _live_ranges(ranges, dead_cards):
+    """Zakresy bez układów zawierających znane karty (gracza i stołu), najwęższy pierwszy."""
+    dead = np.zeros(52, dtype=bool)
+    dead[list(dead_cards)] = True
+    live = []
+    for text in ranges:
+        combos, weights = compile_range(text)
+        keep = ~(dead[combos[:, 0]] | dead[combos[:, 1]])
+        if not keep.any():
+            raise ValueError(f"zakres '{text}' nie ma układów zgodnych z kartami gracza i stołu")
+        live.append((combos[keep], weights[keep]))
+    # Kolejność przeciwników nie zmienia wyniku, a losowanie najwęższego zakresu jako pierwszego
+    # zmniejsza rozrzut wag próbek.
+    return sorted(live, key=lambda item: len(item[0]))
+
+
+def _shares(scores):
+    # Udział w puli: wygrana 1, remis z j najlepszymi przeciwnikami 1/(j+1).
+    my_scores = scores[:, 0]
+    best_opponent = scores[:, 1:].max(axis=1)
+    tied = (scores[:, 1:] == my_scores[:, None]).sum(axis=1)
+    return (my_scores > best_opponent) + (my_scores == best_opponent) / (tied + 1)
+
+
+def _opponent_tuples(live):
+    """Wszystkie zgodne (bez wspólnych kart) zestawienia układów przeciwników z iloczynem wag."""
+    masks = [(np.int64(1) << combos[:, 0]) | (np.int64(1) << combos[:, 1]) for combos, _ in live]
+    indices = np.arange(len(live[0][0]))[:, None]
+    used, weights = masks[0], live[0][1]
+    for i in range(1, len(live)):
+        rows, cols = np.nonzero((used[:, None] & masks[i][None, :]) == 0)
+        indices = np.concatenate([indices[rows], cols[:, None]], axis=1)
+        used, weights = used[rows] | masks[i][cols], weights[rows] * live[i][1][cols]
+    holdings = np.stack([live[i][0][indices[:, i]] for i in range(len(live))], axis=1)
+    return holdings, weights, used
+
+
+def _exact_range_equity(my_cards, community_cards, deck, live):
+    holdings, weights, used = _opponent_tuples(live)
+    if not len(holdings):
+        raise ValueError("zakresy przeciwników wykluczają się wzajemnie")
+    cards_to_draw = 5 - len(community_cards)
+    runouts = np.array(list(combinations(deck, cards_to_draw)), dtype=np.int64).reshape(comb(len(deck), cards_to_draw), cards_to_draw)
+    runout_masks = (np.int64(1) << runouts).sum(axis=1)
+    community_cards = np.asarray(community_cards, dtype=np.int64)
+    my_cards = np.asarray(my_cards, dtype=np.int64)
+    total = weight_sum = 0.0
+    step = max(1, CHUNK_CELLS // (len(runouts) * (len(live) + 1)))
+    for start in range(0, len(holdings), step):
+        chunk, chunk_weights, chunk_used = holdings[start:start + step], weights[start:start + step], used[start:start + step]
+        rows, cols = np.nonzero((chunk_used[:, None] & runout_masks[None, :]) == 0)
+        boards = np.concatenate([np.broadcast_to(community_cards, (len(rows), len(community_cards))), runouts[cols]], axis=1)
+        players = np.concatenate([np.broadcast_to(my_cards, (len(rows), 1, 2)), chunk[rows]], axis=1)
+        # Każde zestawienie ma tyle samo możliwych dokładań, więc waga komórki to waga zestawienia.
+        total += float((_shares(_score_holdings(players, boards)) * chunk_weights[rows]).sum())
+        weight_sum += float(chunk_weights[rows].sum())
+    return total / weight_sum
+
+
+def _sample_opponents(live, dead_cards, n, rng):
+    """
+    Losuje układy przeciwników kolejno z ich zakresów, pomijając karty już rozdane (bez odrzucania rozdań).
+    Zwraca karty (n, m, 2), maskę użytych kart (n, 52) i wagi próbek: iloczyn sum wag układów dostępnych
+    na każdym kroku, który koryguje losowanie sekwencyjne do rozkładu łącznego zakresów.
+    """
+    used = np.zeros((n, 52), dtype=bool)
+    used[:, list(dead_cards)] = True
+    holdings = np.empty((n, len(live), 2), dtype=np.int64)
+    sample_weights = np.ones(n)
+    rows = np.arange(n)
+    for i, (combos, weights) in enumerate(live):
+        if i == 0:
+            # Pierwszy zakres jest już oczyszczony ze znanych kart - ten sam rozkład dla każdego rozdania.
+            cumulative = np.cumsum(weights)
+            choice = np.searchsorted(cumulative, rng.random(n) * cumulative[-1], side='right')
+        else:
+            available = np.where(used[:, combos[:, 0]] | used[:, combos[:, 1]], 0.0, weights)
+            cumulative = np.cumsum(available, axis=1)
+            totals = cumulative[:, -1]
+            choice = (cumulative <= (rng.random(n) * totals)[:, None]).sum(axis=1)
+            sample_weights *= totals
+        choice = np.minimum(choice, len(combos) - 1)
+        holdings[:, i] = combos[choice]
+        used[rows, holdings[:, i, 0]] = True
+        used[rows, holdings[:, i, 1]] = True
+    return holdings, used, sample_weights
+
+
+def _simulate_range_equity(my_cards, community_cards, live, simulations, rng):
+    cards_to_draw = 5 - len(community_cards)
+    dead_cards = my_cards + community_cards
+    my_cards = np.asarray(my_cards, dtype=np.int64)
+    community_cards = np.asarray(community_cards, dtype=np.int64)
+    # Szeroki zakres (np. dowolne karty) oznacza duże macierze dostępności, więc mniejsze paczki.
+    widest = max((len(combos) for combos, _ in live[1:]), default=1)
+    chunk = max(1, min(MAX_CHUNK, CHUNK_CELLS // widest))
+    total = weight_sum = 0.0
+    for start in range(0, simulations, chunk):
+        n = min(chunk, simulations - start)
+        holdings, used, sample_weights = _sample_opponents(live, dead_cards, n, rng)
+        # Dokładane karty stołu: najmniejsze losowe klucze wśród kart, które nie zostały jeszcze rozdane.
+        keys = np.where(used, 2.0, rng.random((n, 52)))
+        runouts = np.argpartition(keys, cards_to_draw - 1, axis=1)[:, :cards_to_draw] if cards_to_draw else np.empty((n, 0), dtype=np.int64)
+        boards = np.concatenate([np.broadcast_to(community_cards, (n, len(community_cards))), runouts], axis=1)
+        players = np.concatenate([np.broadcast_to(my_cards, (n, 1, 2)), holdings], axis=1)
+        total += float((_shares(_score_holdings(players, boards)) * sample_weights).sum())
+        weight_sum += float(sample_weights.sum())
+    if weight_sum == 0:
+        raise ValueError("zakresy przeciwników wykluczają się wzajemnie")
+    return total / weight_sum
+
+
+def count_range_deals(live, deck_size, cards_to_draw):
+    """Górne oszacowanie liczby rozdań do dokładnego przeliczenia: iloczyn rozmiarów zakresów razy dokładania."""
+    tuples = 1
+    for combos, _ in live:
+        tuples *= len(combos)
+    return tuples * comb(deck_size - 2 * len(live), cards_to_draw)
+
+
+@lru_cache(maxsize=config.RANGE_EQUITY_CACHE_SIZE)
+def _cached_range_equity(my_cards, community_cards, ranges, simulations, exact_budget, seed):
+    deck = [card for card in range(52) if card not in my_cards + community_cards]
+    live = _live_ranges(ranges, my_cards + community_cards)
+    cards_to_draw = 5 - len(community_cards)
+    if count_range_deals(live, len(deck), cards_to_draw) <= exact_budget:
+        return _exact_range_equity(list(my_cards), list(community_cards), deck, live)
+    return _simulate_range_equity(list(my_cards), list(community_cards), live, simulations, np.random.default_rng(seed))
+
+
+def calculate_range_equity(my_cards, community_cards, ranges, simulations=None, exact_budget=None, seed=None):
+    """
+    Equity ręki przeciwko przeciwnikom z zakresami kart (jeden zapis zakresu na przeciwnika, 'any' - dowolne karty).
+    Przy wąskich zakresach liczona dokładnie, inaczej Monte Carlo z losowaniem układów uwzględniającym usunięte karty.
+    Wynik jest zapamiętywany dla (ręka, stół, zakresy).
+    """
+    my_cards = tuple(sorted(card_to_int(card) for card in my_cards))
+    community_cards = tuple(sorted(card_to_int(card) for card in community_cards))
+    validate_cards(my_cards, community_cards)
+    ranges = tuple(normalize_range(text) for text in ranges)
+    if not ranges:
+        raise ValueError("brak zakresów przeciwników")
+    return _cached_range_equity(my_cards, community_cards, ranges,
+                                simulations or config.POKER_SIMULATIONS_COUNT,
+                                config.POKER_EXACT_ENUMERATION_BUDGET if exact_budget is None else exact_budget, seed)
@@ -0,0 +1,84 @@
+import numpy as np
+
+from src.logic.hand_evaluator import load_raw_tables
+
+CHUNK_SIZE = 8192
+
+_CARDS = np.arange(52)
+_CARD_RANK_BIT = (1 << (_CARDS >> 2)).astype(np.int32)
+_CARD_SUIT = (_CARDS & 3).astype(np.int8)
+# Wagi rang, dla których suma po dowolnych 7 kartach jednoznacznie wyznacza układ rang
+# (jak w SKPokerEval); pozwalają zamienić wyszukiwanie binarne na jeden odczyt z gęstej tablicy.
+_SEVEN_CARD_RANK_WEIGHTS = np.array([0, 1, 5, 22, 98, 453, 2031, 8698, 22854, 83661, 262349, 636345, 1479181], dtype=np.int32)
+_CARD_SEVEN_KEY = _SEVEN_CARD_RANK_WEIGHTS[_CARDS >> 2]
+# Ten sam licznik kolorów co w hand_evaluator: 4 bity na kolor.
+_CARD_SUIT_ADD = (1 << (4 * (_CARDS & 3))).astype(np.int32)
+_FLUSH_SUIT = np.zeros(0x8001, dtype=np.int8)
+_FLUSH_SUIT[[0x8, 0x80, 0x800, 0x8000]] = np.arange(4)
+
+_tables = None
+
+
+def _load_tables():
+    global _tables
+    if _tables is None:
+        flush_table, keys, values = load_raw_tables()
+        keys = np.frombuffer(keys, dtype=np.int64)
+        values = np.frombuffer(values, dtype=np.int32)
+
+        counts = keys[:, None] // 5 ** np.arange(13, dtype=np.int64) % 5
+        seven = counts.sum(axis=1) == 7
+        seven_values, class_ids = np.unique(values[seven], return_inverse=True)
+        seven_table = np.zeros(int(_SEVEN_CARD_RANK_WEIGHTS[-1]) * 7 + 1, dtype=np.uint16)
+        seven_table[counts[seven] @ _SEVEN_CARD_RANK_WEIGHTS] = class_ids
+
+        _tables = (np.frombuffer(flush_table, dtype=np.int32), seven_table, seven_values)
+    return _tables
+
+
+def deal(deck, num_cards, n, rng):
+    """Losuje n rozdań po num_cards różnych kart z talii, w losowej kolejności."""
+    deck = np.asarray(deck, dtype=np.int64)
+    random_keys = rng.random((n, len(deck)))
+    chosen = np.argpartition(random_keys, num_cards - 1, axis=1)[:, :num_cards]
+    order = np.argsort(np.take_along_axis(random_keys, chosen, axis=1), axis=1)
+    return deck[np.take_along_axis(chosen, order, axis=1)]
+
+
+def _score_holdings(holdings, boards):
+    """Ocenia 7-kartowe ręce: karty graczy (n, m, 2) z planszami (n, 5); sumy planszy liczone są raz na rozdanie."""
+    flush_table, seven_table, seven_values = _load_tables()
+    rank_keys = _CARD_SEVEN_KEY[boards].sum(axis=-1)[:, None] + _CARD_SEVEN_KEY[holdings].sum(axis=-1)
+    scores = seven_values[seven_table[rank_keys]]
+
+    suit_sums = _CARD_SUIT_ADD[boards].sum(axis=-1)[:, None] + _CARD_SUIT_ADD[holdings].sum(axis=-1)
+    flush_bits = (suit_sums + 0x3333) & 0x8888
+    rows, players = np.nonzero(flush_bits)
+    if len(rows):
+        flush_cards = np.concatenate([holdings[rows, players], boards[rows]], axis=1)
+        flush_suit = _FLUSH_SUIT[flush_bits[rows, players]]
+        masks = np.where(_CARD_SUIT[flush_cards] == flush_suit[:, None], _CARD_RANK_BIT[flush_cards], 0).sum(axis=-1)
+        scores[rows, players] = flush_table[masks]
+    return scores
+
+
+def simulate_shares(my_cards, community_cards, deck, num_opponents, simulations, rng=None):
+    """Zwraca udział w puli (1, część przy remisie albo 0) dla każdego z losowych rozdań."""
+    rng = rng if rng is not None else np.random.default_rng()
+    cards_to_draw = 5 - len(community_cards)
+    hidden = num_opponents * 2
+    my_cards = np.asarray(my_cards, dtype=np.int64)
+    community_cards = np.asarray(community_cards, dtype=np.int64)
+    shares = np.empty(simulations)
+    for start in range(0, simulations, CHUNK_SIZE):
+        n = min(CHUNK_SIZE, simulations - start)
+        dealt = deal(deck, hidden + cards_to_draw, n, rng)
+        boards = np.concatenate([np.broadcast_to(community_cards, (n, len(community_cards))), dealt[:, hidden:]], axis=1)
+        holdings = np.concatenate([np.broadcast_to(my_cards, (n, 1, 2)), dealt[:, :hidden].reshape(n, num_opponents, 2)], axis=1)
+
+        scores = _score_holdings(holdings, boards)
+        my_scores = scores[:, 0]
+        best_opponent = scores[:, 1:].max(axis=1)
+        tied = (scores[:, 1:] == my_scores[:, None]).sum(axis=1)
+        shares[start:start + n] = (my_scores > best_opponent) + (my_scores == best_opponent) / (tied + 1)
+    return shares
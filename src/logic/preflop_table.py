@@ -0,0 +1,90 @@
+import mmap
+import os
+import struct
+
+import src.config as config
+from src.logic.hand_evaluator import RANKS
+
+TABLE_MAGIC = b'PFEQ'
+TABLE_VERSION = 1
+NUM_CLASSES = 169
+MAX_OPPONENTS = 9
+# magic, wersja, liczba klas, maks. liczba przeciwników, liczba symulacji na wpis
+HEADER = struct.Struct('<4sHHHI')
+
+_table = None
+_table_loaded = False
+
+
+def hand_class_index(first, second):
+    """Indeks klasy ręki startowej (0..168) dla kart zakodowanych jako liczby 0..51."""
+    high, low = max(first >> 2, second >> 2), min(first >> 2, second >> 2)
+    if high == low:
+        return high
+    offset = 13 if (first & 3) == (second & 3) else 13 + 78
+    return offset + high * (high - 1) // 2 + low
+
+
+def hand_class_name(index):
+    if index < 13:
+        return RANKS[index] * 2
+    suited = index < 13 + 78
+    index -= 13 if suited else 13 + 78
+    high = 1
+    while (high + 1) * high // 2 <= index:
+        high += 1
+    low = index - high * (high - 1) // 2
+    return RANKS[high] + RANKS[low] + ('s' if suited else 'o')
+
+
+def hand_class_cards(index):
+    """Przykładowe dwie karty (liczby 0..51) reprezentujące klasę."""
+    name = hand_class_name(index)
+    high, low = RANKS.index(name[0]), RANKS.index(name[1])
+    if high == low:
+        return [high * 4, low * 4 + 1]
+    return [high * 4, low * 4 + (0 if name[2] == 's' else 1)]
+
+
+def write_table(path, equities, simulations):
+    """equities: lista 169 list po MAX_OPPONENTS wartości (dla 1..9 przeciwników)."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(TABLE_MAGIC, TABLE_VERSION, NUM_CLASSES, MAX_OPPONENTS, simulations))
+        for row in equities:
+            f.write(struct.pack(f'<{MAX_OPPONENTS}f', *row))
+    os.replace(tmp_path, path)
+
+
+def _open_table(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        try:
+            table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return None
+    if len(table) < HEADER.size:
+        return None
+    magic, version, num_classes, max_opponents, _ = HEADER.unpack_from(table)
+    expected_size = HEADER.size + NUM_CLASSES * MAX_OPPONENTS * 4
+    if (magic, version, num_classes, max_opponents) != (TABLE_MAGIC, TABLE_VERSION, NUM_CLASSES, MAX_OPPONENTS) \
+            or len(table) != expected_size:
+        print(f"Ostrzeżenie: pomijam tablicę preflop '{path}' (nieobsługiwany format lub wersja).")
+        return None
+    return table
+
+
+def preflop_equity(my_cards, num_opponents):
+    """Equity z tablicy preflop dla dwóch kart (liczby 0..51) albo None, gdy tablica jest niedostępna."""
+    global _table, _table_loaded
+    if not _table_loaded:
+        _table = _open_table(config.POKER_PREFLOP_TABLE_PATH)
+        _table_loaded = True
+    if _table is None or len(my_cards) != 2 or not 1 <= num_opponents <= MAX_OPPONENTS:
+        return None
+    offset = HEADER.size + (hand_class_index(*my_cards) * MAX_OPPONENTS + num_opponents - 1) * 4
+    return struct.unpack_from('<f', _table, offset)[0]
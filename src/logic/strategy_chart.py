@@ -0,0 +1,135 @@
+import os
+import struct
+import sys
+from functools import lru_cache
+
+import src.config as config
+
+CHART_MAGIC = b'BJST'
+CHART_VERSION = 1
+HEADER = struct.Struct('<4sHBBBB')
+
+HARD, SOFT, PAIR = range(3)
+NUM_TOTALS = 22
+NUM_DEALER = 12
+CHART_SIZE = 3 * NUM_TOTALS * NUM_DEALER
+
+# Kod ruchu zapisany w tablicy to indeks w MOVE_CODES. Ruchy z drugą literą mają wariant
+# zastępczy, gdy podwojenie albo poddanie nie jest już możliwe (ręka ma więcej niż dwie karty).
+MOVE_CODES = ('S', 'H', 'P', 'D', 'DS', 'R', 'RS', 'RP')
+FALLBACK = {'D': 'H', 'DS': 'S', 'R': 'H', 'RS': 'S', 'RP': 'P'}
+_CODE_INDEX = {code: i for i, code in enumerate(MOVE_CODES)}
+
+_RANK_BY_INDEX = 'A23456789T'
+
+
+def chart_offset(hand_type, total, dealer_value):
+    return (hand_type * NUM_TOTALS + total) * NUM_DEALER + dealer_value
+
+
+def chart_path(rules):
+    name = (f"blackjack_strategy_{rules.num_decks}d_{'h17' if rules.hits_soft_17 else 's17'}_"
+            f"{'das' if rules.double_after_split else 'nodas'}_{'sur' if rules.surrender else 'nosur'}.bin")
+    return os.path.join(config.BLACKJACK_STRATEGY_DIR, name)
+
+
+def _chart_code(action_evs, allow_split=True):
+    if not allow_split:
+        action_evs = {code: ev for code, ev in action_evs.items() if code != 'P'}
+    best = max(action_evs, key=action_evs.get)
+    if best not in ('D', 'R'):
+        return best
+    others = {code: ev for code, ev in action_evs.items() if code not in ('D', 'R')}
+    fallback = max(others, key=others.get)
+    if best == 'D':
+        return 'DS' if fallback == 'S' else 'D'
+    return {'S': 'RS', 'P': 'RP'}.get(fallback, 'R')
+
+
+def _average_evs(weighted_evs):
+    total_weight = sum(weight for weight, _ in weighted_evs)
+    codes = set.intersection(*(set(evs) for _, evs in weighted_evs))
+    return {code: sum(weight * evs[code] for weight, evs in weighted_evs) / total_weight for code in codes}
+
+
+def build_chart(rules):
+    """
+    Strategia podstawowa wyprowadzona z dokładnych EV (blackjack_ev) dla pełnego buta i danych zasad.
+    Sumy twarde zależą od sumy, nie od składu: EV są uśredniane po wszystkich parach kart o tej sumie
+    z wagą prawdopodobieństwa ich rozdania.
+    """
+    from src.logic.blackjack_ev import calculate_action_evs
+    from src.logic.blackjack_logic import full_shoe, remove_cards
+
+    chart = bytearray(CHART_SIZE)
+    for dealer_value in range(2, 12):
+        up_card = _RANK_BY_INDEX[dealer_value - 1 if dealer_value < 11 else 0] + 'H'
+        shoe = remove_cards(full_shoe(rules.num_decks), [up_card])
+
+        def evs(first, second):
+            hand = [_RANK_BY_INDEX[first] + 'D', _RANK_BY_INDEX[second] + 'C']
+            weight = shoe[first] * (shoe[second] - (first == second)) * (1 if first == second else 2)
+            return weight, calculate_action_evs(hand, up_card, remove_cards(shoe, hand), rules)
+
+        for total in range(4, NUM_TOTALS):
+            combos = [(i, j) for i in range(1, 10) for j in range(i + 1, 10) if i + j + 2 == total]
+            if not combos:
+                combos = [(i, i) for i in range(1, 10) if 2 * i + 2 == total]
+            code = _chart_code(_average_evs([evs(i, j) for i, j in combos]), allow_split=False) if combos else 'S'
+            chart[chart_offset(HARD, total, dealer_value)] = _CODE_INDEX[code]
+
+        for total in range(12, NUM_TOTALS):
+            other = total - 12
+            code = _chart_code(evs(0, other)[1], allow_split=other != 0)
+            chart[chart_offset(SOFT, total, dealer_value)] = _CODE_INDEX[code]
+
+        for pair_value in range(2, 12):
+            index = pair_value - 1 if pair_value < 11 else 0
+            chart[chart_offset(PAIR, pair_value, dealer_value)] = _CODE_INDEX[_chart_code(evs(index, index)[1])]
+    return bytes(chart)
+
+
+def save_chart(path, rules, chart):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(CHART_MAGIC, CHART_VERSION, rules.num_decks, rules.hits_soft_17,
+                            rules.double_after_split, rules.surrender))
+        f.write(chart)
+
+
+def _read_chart(path, rules):
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) != HEADER.size + CHART_SIZE:
+        return None
+    header = HEADER.unpack_from(data)
+    expected = (CHART_MAGIC, CHART_VERSION, rules.num_decks, rules.hits_soft_17, rules.double_after_split, rules.surrender)
+    return data[HEADER.size:] if header == expected else None
+
+
+@lru_cache(maxsize=None)
+def load_chart(rules):
+    """
+    Tablica strategii dla zasad. Generowanie trwa kilkadziesiąt sekund, więc nie odbywa się podczas analizy:
+    brakująca tablica zastępowana jest tablicą dla BLACKJACK_FALLBACK_CHART_RULES z ostrzeżeniem.
+    """
+    path = chart_path(rules)
+    chart = _read_chart(path, rules) if os.path.exists(path) else None
+    if chart is not None:
+        return chart
+    fallback = type(rules)(*config.BLACKJACK_FALLBACK_CHART_RULES)
+    if rules == fallback:
+        raise FileNotFoundError(f"Brak tablicy strategii '{path}' - wygeneruj ją: python scripts/build_strategy_chart.py")
+    print(f"Ostrzeżenie: brak tablicy strategii dla zasad {tuple(rules)} ('{path}'), używam tablicy dla {tuple(fallback)}. "
+          f"Wygeneruj ją: python scripts/build_strategy_chart.py --decks {rules.num_decks} --h17 {int(rules.hits_soft_17)} "
+          f"--das {int(rules.double_after_split)} --surrender {int(rules.surrender)}", file=sys.stderr)
+    return load_chart(fallback)
+
+
+def lookup_codes(chart, hand_types, totals, dealer_values):
+    """Wektorowy odczyt: tablice typów rąk, sum i kart krupiera -> tablica indeksów MOVE_CODES."""
+    import numpy as np
+    dense = np.frombuffer(chart, dtype=np.uint8).reshape(3, NUM_TOTALS, NUM_DEALER)
+    return dense[np.asarray(hand_types), np.asarray(totals), np.asarray(dealer_values)]
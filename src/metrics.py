@@ -0,0 +1,204 @@
+import io
+import json
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+import src.config as config
+
+QUANTILES = (0.5, 0.95, 0.99)
+PROMETHEUS_PREFIX = 'card_analyzer'
+
+
+def _quantile(sorted_values, q):
+    # Metoda najbliższej rangi: wartość, poniżej której leży co najmniej q próbek.
+    return sorted_values[max(0, math.ceil(q * len(sorted_values)) - 1)]
+
+
+class Metrics:
+    """
+    Czasy etapów analizy (ruchome okno ostatnich `window` pomiarów na etap, do percentyli)
+    oraz liczniki zdarzeń. Bezpieczne do użycia z wielu wątków.
+    """
+
+    def __init__(self, window=None):
+        self.window = window or config.METRICS_WINDOW
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._totals = {}
+        self._counters = {}
+
+    def record(self, stage, seconds):
+        with self._lock:
+            if stage not in self._samples:
+                self._samples[stage] = deque(maxlen=self.window)
+                self._totals[stage] = [0, 0.0]
+            self._samples[stage].append(seconds)
+            totals = self._totals[stage]
+            totals[0] += 1
+            totals[1] += seconds
+
+    @contextmanager
+    def timer(self, stage):
+        if not config.METRICS_ENABLED:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def timed(self, stage):
+        """Dekorator mierzący każde wywołanie funkcji jako etap `stage`."""
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.timer(stage):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name, value=1):
+        if not config.METRICS_ENABLED:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def drain(self):
+        """Surowe pomiary etapów i liczniki zebrane od ostatniego wywołania (zerowane), np. do przekazania z procesu."""
+        with self._lock:
+            drained = {'stages': {stage: list(values) for stage, values in self._samples.items()},
+                       'counters': dict(self._counters)}
+            self._samples.clear()
+            self._totals.clear()
+            self._counters.clear()
+        return drained
+
+    def merge(self, drained):
+        """Dołącza pomiary z drain() innego procesu."""
+        for stage, values in drained['stages'].items():
+            for seconds in values:
+                self.record(stage, seconds)
+        for name, value in drained['counters'].items():
+            self.count(name, value)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+            self._counters.clear()
+
+    def snapshot(self):
+        """Percentyle okna (w ms), łączna liczba i suma czasów etapów oraz liczniki."""
+        with self._lock:
+            samples = {stage: sorted(values) for stage, values in self._samples.items()}
+            totals = {stage: list(total) for stage, total in self._totals.items()}
+            counters = dict(self._counters)
+        stages = {}
+        for stage, values in samples.items():
+            count, total = totals[stage]
+            stages[stage] = {'count': count, 'total_s': total, 'mean_ms': 1000 * total / count,
+                             **{f"p{round(q * 100)}_ms": 1000 * _quantile(values, q) for q in QUANTILES}}
+        return {'stages': stages, 'counters': counters}
+
+    def summary(self):
+        snapshot = self.snapshot()
+        lines = [f"{'etap':<22}{'liczba':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"]
+        for stage, values in sorted(snapshot['stages'].items()):
+            lines.append(f"{stage:<22}{values['count']:>8}{values['p50_ms']:>10.1f}{values['p95_ms']:>10.1f}{values['p99_ms']:>10.1f}")
+        if snapshot['counters']:
+            lines.append("liczniki: " + ", ".join(f"{name}={value}" for name, value in sorted(snapshot['counters'].items())))
+        return "\n".join(lines)
+
+    def dump_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'timestamp': time.time(), **self.snapshot()}, f, indent=2)
+
+    def prometheus_text(self):
+        """Format tekstowy Prometheus: etapy jako summary w sekundach, liczniki jako counter."""
+        snapshot = self.snapshot()
+        name = f"{PROMETHEUS_PREFIX}_stage_seconds"
+        lines = [f"# HELP {name} Czas etapu analizy klatki.", f"# TYPE {name} summary"]
+        for stage, values in sorted(snapshot['stages'].items()):
+            for q in QUANTILES:
+                lines.append(f'{name}{{stage="{stage}",quantile="{q}"}} {values[f"p{round(q * 100)}_ms"] / 1000:.6f}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {values["total_s"]:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {values["count"]}')
+        for counter, value in sorted(snapshot['counters'].items()):
+            metric = f"{PROMETHEUS_PREFIX}_{counter}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+
+def start_console_reporter(interval=None, metrics=METRICS):
+    """Wątek tła wypisujący podsumowanie co `interval` sekund; zwraca Event, którego ustawienie go kończy."""
+    interval = interval or config.METRICS_SUMMARY_INTERVAL
+    stop_event = threading.Event()
+
+    def report():
+        while not stop_event.wait(interval):
+            if metrics.snapshot()['stages']:
+                print("\n--- METRYKI ETAPÓW ---\n" + metrics.summary())
+
+    threading.Thread(target=report, name='metrics-reporter', daemon=True).start()
+    return stop_event
+
+
+def start_prometheus_server(port=None, host=None, metrics=METRICS):
+    """Serwer HTTP w wątku tła udostępniający metryki pod /metrics (domyślnie tylko pod METRICS_PROMETHEUS_HOST)."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = metrics.prometheus_text().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    port = config.METRICS_PROMETHEUS_PORT if port is None else port
+    server = ThreadingHTTPServer((host or config.METRICS_PROMETHEUS_HOST, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    return server
+
+
+def profile_once(fn, path=None, top=25):
+    """
+    Opakowanie, które pierwsze wywołanie `fn` wykonuje pod cProfile: wypisuje `top` funkcji
+    według czasu łącznego i opcjonalnie zapisuje pełne statystyki do `path` (np. dla snakeviz).
+    """
+    import cProfile
+    import pstats
+    profiled = False
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        nonlocal profiled
+        if profiled:
+            return fn(*args, **kwargs)
+        profiled = True
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(fn, *args, **kwargs)
+        finally:
+            if path:
+                profiler.dump_stats(path)
+            output = io.StringIO()
+            pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(top)
+            print("\n--- PROFIL KLATKI (cProfile) ---\n" + output.getvalue())
+    return wrapper
@@ -0,0 +1,181 @@
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import cv2
+import numpy as np
+
+import src.config as config
+from src.metrics import METRICS
+
+
+def _reset_worker_metrics():
+    # Proces potomny (fork) dziedziczy pomiary rodzica, które nie mogą wrócić do niego drugi raz.
+    METRICS.reset()
+
+
+def _analyze_with_metrics(analyze_fn, game, detections, advise):
+    """Wykonywane w procesie puli: rekord razem z pomiarami etapów, bo METRICS procesu nie jest widoczne w /metrics."""
+    record = analyze_fn(game, detections, advise)
+    return record, METRICS.drain()
+
+
+class MicroBatcher:
+    """
+    Zbiera obrazy z wielu wątków i wysyła je do recognizer.recognize_batch() jedną paczką:
+    paczka zamyka się po `window` sekundach od pierwszego obrazu albo po `max_batch` obrazach.
+    """
+
+    def __init__(self, recognizer, max_batch=None, window=None):
+        self.recognizer = recognizer
+        self.max_batch = max_batch or config.SERVER_MAX_BATCH
+        self.window = config.SERVER_BATCH_WINDOW if window is None else window
+        self.batches = 0
+        self.images = 0
+        self._queue = queue.Queue()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, image):
+        """Zwraca concurrent.futures.Future z detekcjami obrazu."""
+        future = Future()
+        self._queue.put((image, future))
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get(timeout=0.1)]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return [(image, future) for image, future in batch if future.set_running_or_notify_cancel()]
+
+    def _loop(self):
+        while not self._stop_event.is_set():
+            try:
+                batch = self._collect()
+            except queue.Empty:
+                continue
+            if not batch:
+                continue
+            try:
+                results = list(self.recognizer.recognize_batch([image for image, _ in batch], batch_size=len(batch)))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.images += len(batch)
+            METRICS.count('server_batches')
+            for (_, future), (detections, _) in zip(batch, results):
+                future.set_result(detections)
+
+    def stats(self):
+        return {'batches': self.batches, 'images': self.images,
+                'mean_batch': self.images / self.batches if self.batches else 0.0}
+
+    def close(self):
+        self._stop_event.set()
+        self._thread.join(timeout=5)
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /analyze?game=poker|blackjack[&advice=1][&name=...] - treść zapytania to zakodowany obraz (JPEG/PNG),
+    odpowiedź to rekord JSON jak w trybie --image-dir. GET /health - stan serwera, GET /metrics - metryki etapów.
+    """
+    server_version = 'CardAnalyzer/1.0'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, body, status=200, content_type='application/json'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, payload, status=200):
+        self._send(json.dumps(payload, ensure_ascii=False).encode('utf-8'), status)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == '/health':
+            self._send_json({'status': 'ok', 'default_game': self.server.default_game, **self.server.batcher.stats()})
+        elif path == '/metrics':
+            self._send(METRICS.prometheus_text().encode('utf-8'), content_type='text/plain; version=0.0.4; charset=utf-8')
+        else:
+            self._send_json({'error': 'nie znaleziono'}, 404)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != '/analyze':
+            self._send_json({'error': 'nie znaleziono'}, 404)
+            return
+        query = parse_qs(url.query)
+        game = query.get('game', [self.server.default_game])[0]
+        advise = query.get('advice', ['0'])[0] in ('1', 'true', 'yes')
+        if game not in ('poker', 'blackjack'):
+            self._send_json({'error': f"nieznana gra '{game}'"}, 400)
+            return
+        length = int(self.headers.get('Content-Length', 0))
+        if not 0 < length <= config.SERVER_MAX_IMAGE_BYTES:
+            self._send_json({'error': f"nieprawidłowy rozmiar obrazu: {length} B"}, 413 if length else 400)
+            return
+        with METRICS.timer('decode'):
+            image = cv2.imdecode(np.frombuffer(self.rfile.read(length), np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            self._send_json({'error': 'nie można odczytać obrazu'}, 400)
+            return
+        try:
+            with METRICS.timer('server_request'):
+                detections = self.server.batcher.submit(image).result()
+                record, worker_metrics = self.server.pool.submit(
+                    _analyze_with_metrics, self.server.analyze_fn, game, detections, advise).result()
+            METRICS.merge(worker_metrics)
+        except Exception as e:
+            self._send_json({'error': f"błąd analizy: {e}"}, 500)
+            return
+        record['image'] = query.get('name', [None])[0]
+        self._send_json(record)
+
+
+class AnalysisServer(ThreadingHTTPServer):
+    """
+    Serwer analizy z modelem załadowanym raz: rozpoznawanie kart w mikro-paczkach (MicroBatcher),
+    equity i EV w puli procesów. `analyze_fn(game, detections, advise)` musi dać się zserializować
+    (funkcja na poziomie modułu) i zwracać rekord JSON; czasy etapów zmierzone w procesach puli
+    są dołączane do METRICS serwera.
+    """
+    daemon_threads = True
+
+    def __init__(self, address, recognizer, analyze_fn, default_game='poker', workers=None, verbose=False):
+        super().__init__(address, AnalysisRequestHandler)
+        self.analyze_fn = analyze_fn
+        self.default_game = default_game
+        self.verbose = verbose
+        self.pool = ProcessPoolExecutor(max_workers=workers or config.SERVER_WORKERS, initializer=_reset_worker_metrics)
+        self.pool.submit(int).result()  # procesy startują teraz, zanim powstaną wątki serwera
+        self.batcher = MicroBatcher(recognizer)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def server_close(self):
+        super().server_close()
+        self.batcher.close()
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,139 @@
+import queue
+import threading
+
+import cv2
+
+import src.config as config
+
+
+class DropOldestQueue:
+    """Ograniczona kolejka: gdy jest pełna, nowy element wypiera najstarszy zamiast blokować producenta."""
+
+    def __init__(self, maxsize=1):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def put(self, item):
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        return self._queue.get(timeout=timeout)
+
+    def empty(self):
+        return self._queue.empty()
+
+
+class LiveCameraPipeline:
+    """
+    Potok ciągłej analizy obrazu z kamery: wątek przechwytywania -> wątek rozpoznawania kart
+    -> wątek analizy gry. Podgląd działa w wątku głównym z szybkością kamery i nakłada
+    ostatnie gotowe detekcje oraz wynik analizy, nie czekając na wolniejsze etapy.
+    """
+
+    def __init__(self, capture, recognizer, analyze_fn, overlay_fn, queue_size=1):
+        self.capture = capture
+        self.recognizer = recognizer
+        self.analyze_fn = analyze_fn
+        self.overlay_fn = overlay_fn
+        self.frames = DropOldestQueue(queue_size)
+        self.detections = DropOldestQueue(queue_size)
+        self.stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._latest_frame = None
+        self._latest_detections = None
+        self._latest_result = None
+        self.error = None
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name='capture', daemon=True),
+            threading.Thread(target=self._inference_loop, name='inference', daemon=True),
+            threading.Thread(target=self._analysis_loop, name='analysis', daemon=True),
+        ]
+
+    def _capture_loop(self):
+        while not self.stop_event.is_set():
+            ret, frame = self.capture.read()
+            if not ret:
+                self.stop_event.set()
+                break
+            with self._lock:
+                self._latest_frame = frame
+            self.frames.put(frame)
+
+    def _inference_loop(self):
+        failures = 0
+        while not self.stop_event.is_set():
+            try:
+                frame = self.frames.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            try:
+                detections, _ = self.recognizer.recognize(frame)
+            except Exception as e:
+                failures += 1
+                print(f"Błąd rozpoznawania klatki: {e}")
+                # Pojedyncza klatka jest pomijana; ciągłe błędy (np. uszkodzony model) kończą potok.
+                if failures >= config.LIVE_MAX_CONSECUTIVE_ERRORS:
+                    self.error = e
+                    self.stop_event.set()
+                continue
+            failures = 0
+            with self._lock:
+                self._latest_detections = detections
+            self.detections.put(detections)
+
+    def _analysis_loop(self):
+        while not self.stop_event.is_set():
+            try:
+                detections = self.detections.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            try:
+                result = self.analyze_fn(detections)
+            except Exception as e:
+                print(f"Błąd analizy klatki: {e}")
+                continue
+            if result is not None:
+                with self._lock:
+                    self._latest_result = result
+
+    def snapshot(self):
+        with self._lock:
+            return self._latest_frame, self._latest_detections, self._latest_result
+
+    def run(self, window_name='Live Analyzer', show=True, key_handler=None):
+        for thread in self._threads:
+            thread.start()
+        shown = None
+        try:
+            while not self.stop_event.is_set():
+                if not show:
+                    self.stop_event.wait(0.05)
+                    continue
+                frame, detections, result = self.snapshot()
+                if frame is not None and frame is not shown:
+                    cv2.imshow(window_name, self.overlay_fn(frame, detections, result))
+                    shown = frame
+                key = cv2.waitKey(1) & 0xFF
+                if key == ord('q'):
+                    break
+                if key_handler:
+                    key_handler(key)
+        finally:
+            self.stop()
+        if self.error is not None:
+            raise RuntimeError(f"rozpoznawanie kart przerwane po {config.LIVE_MAX_CONSECUTIVE_ERRORS} kolejnych błędach") from self.error
+
+    def stop(self):
+        self.stop_event.set()
+        for thread in self._threads:
+            if thread.is_alive():
+                thread.join(timeout=5)
@@ -0,0 +1,202 @@
+import os
+import queue
+import threading
+import time
+
+import cv2
+
+import src.config as config
+from src.metrics import METRICS
+from src.pipeline.live_camera import DropOldestQueue
+
+
+class VideoStream:
+    """
+    Źródło klatek (plik wideo albo numer kamery) dekodowane w osobnym wątku. Analizowana jest co `stride`-ta
+    klatka (albo tyle klatek na sekundę, ile podano w `sample_fps`); pozostałe są tylko pomijane przez grab().
+    Plik wstrzymuje dekodowanie, gdy bufor jest pełny, kamera wypiera najstarszą klatkę.
+    """
+
+    def __init__(self, source, name=None, stride=None, sample_fps=None, queue_size=None):
+        self.source = source
+        self.name = name or str(source)
+        self.live = isinstance(source, int)
+        self.capture = cv2.VideoCapture(source)
+        if not self.capture.isOpened():
+            raise IOError(f"Nie można otworzyć źródła wideo '{source}'.")
+        fps = self.capture.get(cv2.CAP_PROP_FPS)
+        self.fps = fps if fps and fps > 0 else 30.0
+        stride = stride or config.VIDEO_FRAME_STRIDE
+        sample_fps = sample_fps or config.VIDEO_SAMPLE_FPS
+        if sample_fps:
+            stride = round(self.fps / sample_fps)
+        self.stride = max(1, stride)
+        queue_size = queue_size or config.VIDEO_QUEUE_SIZE
+        self.frames = DropOldestQueue(queue_size) if self.live else queue.Queue(queue_size)
+        self.decoded = 0
+        self._finished = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._read_loop, name=f'decode-{self.name}', daemon=True)
+        self._thread.start()
+
+    @property
+    def output_fps(self):
+        return self.fps / self.stride
+
+    @property
+    def exhausted(self):
+        return self._finished.is_set() and self.frames.empty()
+
+    def _put(self, item):
+        if self.live:
+            self.frames.put(item)
+            return
+        while not self._stop_event.is_set():
+            try:
+                self.frames.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _read_loop(self):
+        start = time.monotonic()
+        index = 0
+        try:
+            while not self._stop_event.is_set():
+                if index % self.stride:
+                    if not self.capture.grab():
+                        break
+                else:
+                    with METRICS.timer('decode'):
+                        ret, frame = self.capture.read()
+                    if not ret:
+                        break
+                    timestamp = time.monotonic() - start if self.live else index / self.fps
+                    self.decoded += 1
+                    self._put((index, timestamp, frame))
+                index += 1
+        finally:
+            self.capture.release()
+            self._finished.set()
+
+    def get(self):
+        """Następna zdekodowana klatka (indeks, czas w sekundach, obraz) albo None, gdy żadna nie czeka."""
+        try:
+            return self.frames.get(timeout=0)
+        except queue.Empty:
+            return None
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread.join(timeout=5)
+
+
+class VideoWriterThread:
+    """
+    Kodowanie klatek z adnotacjami do pliku wideo w osobnym wątku; rozmiar nagrania z pierwszej klatki.
+    Błąd kodera (np. nieobsługiwany kodek) zatrzymuje wątek i trafia do `error`, a put() zgłasza go jako IOError
+    zamiast czekać w nieskończoność na miejsce w kolejce.
+    """
+
+    def __init__(self, path, fps, fourcc=None, queue_size=None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.fps = fps
+        self.codec = fourcc or config.VIDEO_FOURCC
+        self.fourcc = cv2.VideoWriter_fourcc(*self.codec)
+        self.written = 0
+        self.error = None
+        self._frames = queue.Queue(queue_size or config.VIDEO_QUEUE_SIZE)
+        self._thread = threading.Thread(target=self._write_loop, name=f'encode-{os.path.basename(path)}', daemon=True)
+        self._thread.start()
+
+    def _write_loop(self):
+        writer = None
+        try:
+            while True:
+                frame = self._frames.get()
+                if frame is None:
+                    break
+                if writer is None:
+                    height, width = frame.shape[:2]
+                    writer = cv2.VideoWriter(self.path, self.fourcc, self.fps, (width, height))
+                    if not writer.isOpened():
+                        raise IOError(f"nie można utworzyć nagrania '{self.path}' (kodek {self.codec})")
+                with METRICS.timer('encode'):
+                    writer.write(frame)
+                self.written += 1
+        except Exception as e:
+            self.error = e
+        finally:
+            if writer is not None:
+                writer.release()
+
+    def _offer(self, item):
+        """Wstawia element do kolejki, dopóki wątek kodera żyje; False, gdy zakończył pracę."""
+        while self._thread.is_alive():
+            try:
+                self._frames.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def put(self, frame):
+        if self.error is not None or not self._offer(frame):
+            raise IOError(f"kodowanie nagrania przerwane: {self.error}") from self.error
+
+    def close(self):
+        self._offer(None)
+        self._thread.join()
+
+class MultiStreamProcessor:
+    """
+    Jeden rozpoznawacz dla wielu strumieni: klatki są zbierane po kolei z każdego strumienia (round-robin)
+    w paczki po `batch_size` dla recognize_batch(), a wyniki trafiają do `process_fn(indeks strumienia,
+    (indeks klatki, czas, obraz), detekcje)` w kolejności klatek każdego strumienia.
+    """
+
+    def __init__(self, streams, recognizer, process_fn, batch_size=None):
+        self.streams = streams
+        self.recognizer = recognizer
+        self.process_fn = process_fn
+        self.batch_size = batch_size or config.RECOGNITION_BATCH_SIZE
+        self.batches = 0
+        self._next_stream = 0
+
+    def _collect(self):
+        batch = []
+        while len(batch) < self.batch_size:
+            added = False
+            for offset in range(len(self.streams)):
+                i = (self._next_stream + offset) % len(self.streams)
+                item = self.streams[i].get()
+                if item is not None:
+                    batch.append((i, item))
+                    added = True
+                    if len(batch) == self.batch_size:
+                        break
+            if not added:
+                break
+        # Następna paczka zaczyna od kolejnego strumienia, żeby żaden nie był stale pierwszy.
+        self._next_stream = (self._next_stream + 1) % len(self.streams)
+        return batch
+
+    def run(self):
+        while True:
+            batch = self._collect()
+            if not batch:
+                if all(stream.exhausted for stream in self.streams):
+                    break
+                time.sleep(0.002)
+                continue
+            results = self.recognizer.recognize_batch([item[2] for _, item in batch], batch_size=len(batch))
+            for (i, item), (detections, _) in zip(batch, results):
+                self.process_fn(i, item, detections)
+            self.batches += 1
+
+    def stop(self):
+        for stream in self.streams:
+            stream.stop()
@@ -1,47 +1,72 @@
 # src/vision/card_recognizer.py
 from ultralytics import YOLO
 import src.config as config  # Importujemy cały moduł config
+from src.vision.detections import Detections
+from src.vision.inference_backend import resolve_model_path
+from src.metrics import METRICS
 
 class CardRecognizer:
-    def __init__(self, model_path):
+    def __init__(self, model_path, backend=None, int8=None):
+        # Backend 'onnx' / 'openvino' używa modelu wyeksportowanego z .pt; predykcja i postprocessing
+        # (NMS, obiekty Results) pozostają po stronie ultralytics, więc detekcje mają ten sam format.
+        self.backend = backend or config.INFERENCE_BACKEND
         try:
-            self.model = YOLO(model_path)
+            model_path = resolve_model_path(model_path, self.backend, int8)
+            self.model = YOLO(model_path, task='detect')
         except Exception as e:
             raise IOError(f"Nie można załadować modelu z '{model_path}'. Upewnij się, że ścieżka jest poprawna. Błąd: {e}")
 
-    def recognize(self, image):
-        """
-        Rozpoznaje karty, przekazując parametry z pliku konfiguracyjnego
-        bezpośrednio do metody model.predict().
-        """
-        # --- GŁÓWNA ZMIANA JEST TUTAJ ---
+    def _predict(self, source, imgsz=None):
         # Wywołujemy predict z parametrami załadowanymi z naszego pliku config.py
-        results = self.model.predict(
-            source=image,
-            imgsz=config.IMG_SIZE,
+        return self.model.predict(
+            source=source,
+            imgsz=imgsz or config.IMG_SIZE,
             conf=config.CONFIDENCE_THRESHOLD,
             iou=config.IOU_THRESHOLD,
             device=config.DEVICE,
-            augment=config.AUGMENT,
+            # Augmentacja w czasie testu jest dostępna tylko dla modelu PyTorch.
+            augment=config.AUGMENT and self.backend == 'pytorch',
             save=config.SAVE_PREDICT,
             show=config.SHOW_PREDICT,
             verbose=False # Pozostawiamy wyłączone, aby uniknąć bałaganu w konsoli
         )
-        
-        detections = []
+
+    def _detections_from_result(self, result):
+        # Używamy progu z configu, chociaż predict już go zastosował,
+        # to dobra praktyka dla pewności.
+        return Detections.from_result(result, self.model.names, config.CONFIDENCE_THRESHOLD)
+
+    def recognize(self, image, imgsz=None):
+        """
+        Rozpoznaje karty, przekazując parametry z pliku konfiguracyjnego
+        bezpośrednio do metody model.predict(). `imgsz` pozwala nadpisać rozdzielczość wejścia modelu.
+        """
+        with METRICS.timer('yolo'):
+            results = self._predict(image, imgsz)
+        with METRICS.timer('postprocess'):
+            detections = Detections.concatenate([self._detections_from_result(result) for result in results], self.model.names)
+        METRICS.count('inferences')
+        return detections, results
+
+    def recognize_batch(self, images, batch_size=None, imgsz=None):
+        """
+        Rozpoznaje karty na wielu obrazach, wysyłając je do model.predict() paczkami po `batch_size`.
+        Przyjmuje dowolny iterator obrazów i zwraca generator par (detekcje, wynik) w kolejności wejścia,
+        więc cały zbiór nigdy nie jest trzymany w pamięci.
+        """
+        batch_size = batch_size or config.RECOGNITION_BATCH_SIZE
+        batch = []
+        for image in images:
+            batch.append(image)
+            if len(batch) == batch_size:
+                yield from self._recognize_chunk(batch, imgsz)
+                batch = []
+        if batch:
+            yield from self._recognize_chunk(batch, imgsz)
+
+    def _recognize_chunk(self, images, imgsz=None):
+        with METRICS.timer('yolo_batch'):
+            results = self._predict(images, imgsz)
+        METRICS.count('inferences', len(images))
         for result in results:
-            boxes = result.boxes
-            # Używamy progu z configu, chociaż predict już go zastosował,
-            # to dobra praktyka dla pewności.
-            for box in boxes:
-                if box.conf[0] > config.CONFIDENCE_THRESHOLD:
-                    class_id = int(box.cls[0])
-                    class_name = self.model.names[class_id]
-                    detection_info = {
-                        'box': box.xyxy[0].tolist(),
-                        'label': class_name,
-                        'conf': box.conf[0].item()
-                    }
-                    detections.append(detection_info)
-                    
-        return detections, results
\ No newline at end of file
+            yield self._detections_from_result(result), result
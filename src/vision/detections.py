@@ -0,0 +1,77 @@
+import numpy as np
+
+
+class Detections:
+    """
+    Detekcje jednej klatki jako tablice NumPy: ramki xyxy (n, 4), identyfikatory klas i pewności.
+    Nazwy klas (etykiety kart) są odczytywane z `names` dopiero wtedy, gdy są potrzebne.
+    """
+
+    def __init__(self, boxes, class_ids, confs, names):
+        self.boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        self.class_ids = np.asarray(class_ids, dtype=np.int32).reshape(-1)
+        self.confs = np.asarray(confs, dtype=np.float32).reshape(-1)
+        self.names = names
+
+    @classmethod
+    def empty(cls, names=None):
+        return cls(np.empty((0, 4)), np.empty(0), np.empty(0), names or {})
+
+    @classmethod
+    def from_result(cls, result, names, conf_threshold=None):
+        """Jednorazowe skopiowanie tensorów z wyniku ultralytics (opcjonalnie z dodatkowym progiem pewności)."""
+        boxes = result.boxes.cpu().numpy()
+        detections = cls(boxes.xyxy, boxes.cls, boxes.conf, names)
+        return detections[detections.confs > conf_threshold] if conf_threshold is not None else detections
+
+    @classmethod
+    def concatenate(cls, parts, names=None):
+        if not parts:
+            return cls.empty(names)
+        return cls(np.concatenate([p.boxes for p in parts]), np.concatenate([p.class_ids for p in parts]),
+                   np.concatenate([p.confs for p in parts]), parts[0].names)
+
+    def __len__(self):
+        return len(self.class_ids)
+
+    def __getitem__(self, index):
+        """Podzbiór detekcji według maski logicznej albo tablicy indeksów (z zachowaniem ich kolejności)."""
+        return Detections(self.boxes[index], self.class_ids[index], self.confs[index], self.names)
+
+    @property
+    def labels(self):
+        return [self.names[class_id] for class_id in self.class_ids.tolist()]
+
+    @property
+    def centers_y(self):
+        return (self.boxes[:, 1] + self.boxes[:, 3]) / 2
+
+    def unique(self):
+        """Najpewniejsza detekcja każdej klasy, posortowane malejąco według pewności."""
+        order = np.argsort(-self.confs, kind='stable')
+        _, first = np.unique(self.class_ids[order], return_index=True)
+        return self[order[np.sort(first)]]
+
+    def shifted(self, dx, dy):
+        """Detekcje z wycinka obrazu przeniesione do współrzędnych całej klatki."""
+        return Detections(self.boxes + np.array([dx, dy, dx, dy], dtype=np.float32), self.class_ids, self.confs, self.names)
+
+    def nms(self, iou_threshold):
+        """Tłumienie niemaksymalne w obrębie klasy, np. dla kart wykrytych na dwóch zachodzących kafelkach."""
+        order = np.argsort(-self.confs, kind='stable')
+        areas = (self.boxes[:, 2] - self.boxes[:, 0]) * (self.boxes[:, 3] - self.boxes[:, 1])
+        keep = []
+        while len(order):
+            best, rest = order[0], order[1:]
+            keep.append(best)
+            top_left = np.maximum(self.boxes[best, :2], self.boxes[rest, :2])
+            bottom_right = np.minimum(self.boxes[best, 2:], self.boxes[rest, 2:])
+            inter = np.prod(np.clip(bottom_right - top_left, 0, None), axis=1)
+            iou = inter / (areas[best] + areas[rest] - inter)
+            order = rest[(iou <= iou_threshold) | (self.class_ids[rest] != self.class_ids[best])]
+        return self[np.array(keep, dtype=np.intp)]
+
+    def to_dicts(self):
+        """Postać zgodna z JSON: lista słowników {'box', 'label', 'conf'}."""
+        return [{'box': box, 'label': label, 'conf': conf}
+                for box, label, conf in zip(self.boxes.tolist(), self.labels, self.confs.tolist())]
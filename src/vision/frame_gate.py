@@ -0,0 +1,64 @@
+import cv2
+import numpy as np
+
+import src.config as config
+from src.metrics import METRICS
+
+
+def frame_signature(image, size=None):
+    """Pomniejszona klatka w skali szarości (size x size), porównywana blokami przez frame_change()."""
+    size = size or config.FRAME_SIGNATURE_SIZE
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    return cv2.resize(gray, (size, size), interpolation=cv2.INTER_AREA).astype(np.int16)
+
+
+def frame_change(previous, current, grid=None):
+    """
+    Największa średnia różnica jasności w jednym z grid x grid bloków. Porównanie lokalne, a nie jednym hashem
+    całej klatki: nowa karta zmienia mocno kilka bloków, a szum kamery uśrednia się w każdym z nich.
+    """
+    grid = grid or config.FRAME_GATE_GRID
+    cell = previous.shape[0] // grid
+    difference = np.abs(current - previous)[:grid * cell, :grid * cell].astype(np.float32)
+    return float(difference.reshape(grid, cell, grid, cell).mean(axis=(1, 3)).max())
+
+
+class FrameGate:
+    """
+    Opakowanie CardRecognizer z tym samym interfejsem recognize(): gdy żaden blok klatki nie zmienił się
+    względem ostatnio rozpoznanej o więcej niż `threshold` poziomów jasności, zwraca poprzednie detekcje
+    bez inferencji. Co `refresh_frames` pominiętych klatek inferencja i tak jest wykonywana.
+    """
+    stats_key = 'frames'
+
+    def __init__(self, recognizer, threshold=None, refresh_frames=None):
+        self.recognizer = recognizer
+        self.threshold = threshold if threshold is not None else config.FRAME_CHANGE_THRESHOLD
+        self.refresh_frames = refresh_frames or config.FRAME_GATE_REFRESH_FRAMES
+        self.hits = 0
+        self.misses = 0
+        self._last_signature = None
+        self._last_output = None
+        self._skipped = 0
+
+    def recognize(self, image):
+        signature = frame_signature(image)
+        if (self._last_signature is not None and self._skipped < self.refresh_frames
+                and frame_change(self._last_signature, signature) <= self.threshold):
+            self.hits += 1
+            self._skipped += 1
+            METRICS.count('frames_skipped')
+            return self._last_output
+        self.misses += 1
+        self._last_output = self.recognizer.recognize(image)
+        self._last_signature = signature
+        self._skipped = 0
+        return self._last_output
+
+    def reset(self):
+        self._last_signature = None
+        self._last_output = None
+        self._skipped = 0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
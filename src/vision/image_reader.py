@@ -0,0 +1,56 @@
+import glob
+import os
+import queue
+import threading
+
+import cv2
+
+from src.metrics import METRICS
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp', '.tif', '.tiff')
+
+_END = object()
+
+
+def iter_image_paths(source):
+    """Ścieżki obrazów z katalogu (bez podkatalogów) albo ze wzorca glob, posortowane alfabetycznie."""
+    if os.path.isdir(source):
+        paths = (os.path.join(source, name) for name in os.listdir(source))
+    else:
+        paths = glob.glob(source, recursive=True)
+    return sorted(path for path in paths if os.path.isfile(path) and path.lower().endswith(IMAGE_EXTENSIONS))
+
+
+def prefetch_images(paths, prefetch=None):
+    """
+    Generator par (ścieżka, obraz). Dekodowanie odbywa się w wątku tła, który wyprzedza konsumenta
+    o najwyżej `prefetch` obrazów. Nieczytelny plik daje obraz None.
+    """
+    buffer = queue.Queue(maxsize=prefetch or 8)
+    stop_event = threading.Event()
+
+    def reader():
+        for path in paths:
+            if stop_event.is_set():
+                return
+            with METRICS.timer('decode'):
+                image = cv2.imread(path)
+            buffer.put((path, image))
+        buffer.put(_END)
+
+    thread = threading.Thread(target=reader, name='image-reader', daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _END:
+                break
+            yield item
+    finally:
+        stop_event.set()
+        # Odblokowanie wątku czytającego, gdy konsument przerwał iterację przy pełnym buforze.
+        while thread.is_alive():
+            try:
+                buffer.get_nowait()
+            except queue.Empty:
+                thread.join(timeout=0.1)
@@ -0,0 +1,115 @@
+import os
+
+import cv2
+import numpy as np
+
+import src.config as config
+from src.vision.image_reader import iter_image_paths
+
+BACKENDS = ('pytorch', 'onnx', 'openvino')
+
+
+def exported_model_path(model_path, backend, int8=False):
+    """Ścieżka modelu wyeksportowanego obok pliku .pt (nazewnictwo zgodne z eksportem ultralytics)."""
+    stem = os.path.splitext(model_path)[0]
+    if backend == 'onnx':
+        return f"{stem}_int8.onnx" if int8 else f"{stem}.onnx"
+    if backend == 'openvino':
+        return f"{stem}_{'int8_' if int8 else ''}openvino_model"
+    return model_path
+
+
+def _letterbox(image, size):
+    """Skalowanie z zachowaniem proporcji i dopełnieniem do kwadratu, jak w preprocessingu ultralytics."""
+    height, width = image.shape[:2]
+    scale = min(size / height, size / width)
+    new_width, new_height = round(width * scale), round(height * scale)
+    resized = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    top, left = (size - new_height) // 2, (size - new_width) // 2
+    canvas[top:top + new_height, left:left + new_width] = resized
+    return canvas
+
+
+def calibration_tensors(directory=None, size=None, limit=None):
+    """Obrazy kalibracyjne jako tensory NCHW float32 w zakresie 0-1 (RGB), po jednym na obraz."""
+    size = size or config.IMG_SIZE
+    paths = iter_image_paths(directory or config.CALIBRATION_IMAGES_DIR)[:limit or config.CALIBRATION_MAX_IMAGES]
+    if not paths:
+        raise IOError(f"Brak obrazów kalibracyjnych w '{directory or config.CALIBRATION_IMAGES_DIR}'.")
+    for path in paths:
+        image = cv2.imread(path)
+        if image is None:
+            continue
+        rgb = cv2.cvtColor(_letterbox(image, size), cv2.COLOR_BGR2RGB)
+        yield np.ascontiguousarray(rgb.transpose(2, 0, 1)[None], dtype=np.float32) / 255.0
+
+
+def _quantize_onnx(fp32_path, int8_path, calibration_dir=None):
+    try:
+        import onnx
+        from onnxruntime.quantization import CalibrationDataReader, quantize_static
+    except ImportError:
+        raise ImportError("Kwantyzacja INT8 modelu ONNX wymaga pakietów 'onnx' i 'onnxruntime'.")
+
+    graph = onnx.load(fp32_path).graph
+    input_name = graph.input[0].name
+    # Kwantyzujemy tylko warstwy z wagami: wspólna skala INT8 dla współrzędnych ramek (setki pikseli)
+    # i prawdopodobieństw klas (0-1) w głowicy detekcji zaokrągliłaby wszystkie wyniki do zera.
+    exclude = [node.name for node in graph.node if node.op_type not in ('Conv', 'Gemm', 'MatMul')]
+    del graph
+
+    class Reader(CalibrationDataReader):
+        def __init__(self):
+            self.tensors = calibration_tensors(calibration_dir)
+
+        def get_next(self):
+            tensor = next(self.tensors, None)
+            return None if tensor is None else {input_name: tensor}
+
+    quantize_static(fp32_path, int8_path, Reader(), nodes_to_exclude=exclude)
+    return int8_path
+
+
+def _calibration_yaml(model, calibration_dir=None):
+    """Plik danych w formacie ultralytics wskazujący na katalog z obrazami kalibracyjnymi (bez etykiet)."""
+    directory = os.path.abspath(calibration_dir or config.CALIBRATION_IMAGES_DIR)
+    os.makedirs(config.CACHE_DIR, exist_ok=True)
+    path = os.path.join(config.CACHE_DIR, 'calibration.yaml')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"path: {directory}\ntrain: .\nval: .\nnames:\n")
+        for class_id, name in model.names.items():
+            f.write(f"  {class_id}: '{name}'\n")
+    return path
+
+
+def export_model(model_path, backend, int8=False, calibration_dir=None):
+    """
+    Jednorazowy eksport modelu .pt do ONNX albo OpenVINO (opcjonalnie INT8 z kalibracją na obrazach
+    z `calibration_dir`). Zwraca ścieżkę, którą można przekazać bezpośrednio do YOLO().
+    """
+    from ultralytics import YOLO
+
+    model = YOLO(model_path)
+    if backend == 'onnx':
+        fp32_path = exported_model_path(model_path, 'onnx')
+        if not os.path.exists(fp32_path):
+            fp32_path = model.export(format='onnx', imgsz=config.IMG_SIZE, dynamic=True)
+        return _quantize_onnx(fp32_path, exported_model_path(model_path, 'onnx', True), calibration_dir) if int8 else fp32_path
+    if backend == 'openvino':
+        options = {'int8': True, 'data': _calibration_yaml(model, calibration_dir)} if int8 else {}
+        return model.export(format='openvino', imgsz=config.IMG_SIZE, dynamic=True, **options)
+    raise ValueError(f"Nieznany backend inferencji: '{backend}'. Dostępne: {', '.join(BACKENDS)}.")
+
+
+def resolve_model_path(model_path, backend=None, int8=None):
+    """Ścieżka modelu dla wybranego backendu; przy pierwszym użyciu eksportuje model."""
+    backend = backend or config.INFERENCE_BACKEND
+    int8 = config.INFERENCE_INT8 if int8 is None else int8
+    if backend == 'pytorch':
+        return model_path
+    path = exported_model_path(model_path, backend, int8)
+    if not os.path.exists(path):
+        print(f"Eksportuję model do formatu {backend}{' INT8' if int8 else ''} (jednorazowo, zapis do '{path}')...")
+        path = export_model(model_path, backend, int8)
+    return path
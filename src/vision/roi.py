@@ -0,0 +1,159 @@
+import math
+
+import numpy as np
+
+import src.config as config
+from src.vision.detections import Detections
+
+# Ramka bliżej niż tyle pikseli od wewnętrznej krawędzi kafelka jest traktowana jako ucięta.
+EDGE_TOLERANCE = 2
+
+
+def _model_size(pixels):
+    """Rozdzielczość wejścia modelu dla wycinka: natywna, zaokrąglona w górę do wielokrotności 32, najwyżej IMG_SIZE."""
+    return min(config.IMG_SIZE, max(32, math.ceil(pixels / 32) * 32))
+
+
+def region_of_interest(boxes, frame_shape, margin=None):
+    """Prostokąt obejmujący wszystkie ramki, powiększony o `margin` swojego rozmiaru i przycięty do klatki."""
+    margin = config.ROI_MARGIN if margin is None else margin
+    height, width = frame_shape[:2]
+    x1, y1 = boxes[:, :2].min(axis=0)
+    x2, y2 = boxes[:, 2:].max(axis=0)
+    pad_x, pad_y = (x2 - x1) * margin + config.ROI_MIN_PADDING, (y2 - y1) * margin + config.ROI_MIN_PADDING
+    return (max(0, int(x1 - pad_x)), max(0, int(y1 - pad_y)),
+            min(width, int(math.ceil(x2 + pad_x))), min(height, int(math.ceil(y2 + pad_y))))
+
+
+class RoiRecognizer:
+    """
+    Opakowanie CardRecognizer dla kamery: pełną rozdzielczością przetwarzany jest tylko obszar kart.
+    Obszar wyznaczają detekcje z poprzedniej klatki, a gdy ich brak - szybki przebieg w ROI_LOWRES_SIZE.
+    Co ROI_FULL_REFRESH_FRAMES klatek cała klatka jest analizowana normalnie, żeby nie przegapić
+    nowych kart poza obszarem.
+    """
+    stats_key = 'roi'
+
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+        self.counts = {'full': 0, 'lowres': 0, 'roi': 0}
+        self._previous = None
+        self._frames_since_full = 0
+
+    def _full_pass(self, image):
+        self.counts['full'] += 1
+        self._frames_since_full = 0
+        return self.recognizer.recognize(image)
+
+    def recognize(self, image):
+        self._frames_since_full += 1
+        if self._frames_since_full >= config.ROI_FULL_REFRESH_FRAMES:
+            detections, results = self._full_pass(image)
+            self._previous = detections
+            return detections, results
+
+        proposals = self._previous
+        if proposals is None or not len(proposals):
+            self.counts['lowres'] += 1
+            proposals, results = self.recognizer.recognize(image, imgsz=config.ROI_LOWRES_SIZE)
+            if not len(proposals):
+                self._previous = proposals
+                return proposals, results
+
+        x1, y1, x2, y2 = region_of_interest(proposals.boxes, image.shape)
+        height, width = image.shape[:2]
+        if (x2 - x1) * (y2 - y1) > config.ROI_MAX_AREA_FRACTION * width * height:
+            detections, results = self._full_pass(image)
+        else:
+            self.counts['roi'] += 1
+            detections, results = self.recognizer.recognize(image[y1:y2, x1:x2], imgsz=_model_size(max(x2 - x1, y2 - y1)))
+            detections = detections.shifted(x1, y1)
+        self._previous = detections
+        return detections, results
+
+    def reset(self):
+        self._previous = None
+        self._frames_since_full = 0
+
+    def stats(self):
+        return dict(self.counts)
+
+
+def _merge_cut_boxes(detections, cut):
+    """
+    Scala ramki jednej klasy, z których co najmniej jedna jest ucięta krawędzią kafelka, a które na siebie
+    zachodzą: karta większa od zakładki jest widoczna na sąsiednich kafelkach tylko w częściach.
+    Wynikiem jest ramka obejmująca wszystkie części z największą pewnością spośród nich.
+    """
+    count = len(detections)
+    parent = list(range(count))
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    boxes = detections.boxes
+    for i in np.flatnonzero(cut):
+        top_left = np.maximum(boxes[i, :2], boxes[:, :2])
+        bottom_right = np.minimum(boxes[i, 2:], boxes[:, 2:])
+        touching = np.all(bottom_right > top_left, axis=1) & (detections.class_ids == detections.class_ids[i])
+        for j in np.flatnonzero(touching):
+            parent[root(j)] = root(i)
+
+    groups = {}
+    for i in range(count):
+        groups.setdefault(root(i), []).append(i)
+    members = list(groups.values())
+    merged = np.array([[boxes[m, 0].min(), boxes[m, 1].min(), boxes[m, 2].max(), boxes[m, 3].max()] for m in members])
+    return Detections(merged.reshape(-1, 4), detections.class_ids[[m[0] for m in members]],
+                      [detections.confs[m].max() for m in members], detections.names)
+
+
+def tile_origins(length, tile, overlap):
+    if length <= tile:
+        return [0]
+    step = max(1, int(tile * (1 - overlap)))
+    origins = list(range(0, length - tile, step))
+    return origins + [length - tile]
+
+
+class TiledRecognizer:
+    """
+    Opakowanie CardRecognizer dla zdjęć w wysokiej rozdzielczości: obraz jest dzielony na zachodzące
+    kafelki TILE_SIZE x TILE_SIZE rozpoznawane w natywnej rozdzielczości (jedną paczką), a detekcje
+    z kafelków są scalane w obrębie klasy: części karty uciętej krawędziami kafelków łączone są w jedną ramkę,
+    a powtórzenia tej samej karty z zakładki usuwa NMS.
+    """
+
+    def __init__(self, recognizer, tile_size=None, overlap=None):
+        self.recognizer = recognizer
+        self.tile_size = tile_size or config.TILE_SIZE
+        self.overlap = config.TILE_OVERLAP if overlap is None else overlap
+
+    def recognize(self, image):
+        height, width = image.shape[:2]
+        if max(height, width) <= self.tile_size:
+            return self.recognizer.recognize(image)
+        origins = [(x, y) for y in tile_origins(height, self.tile_size, self.overlap)
+                   for x in tile_origins(width, self.tile_size, self.overlap)]
+        tiles = (image[y:y + self.tile_size, x:x + self.tile_size] for x, y in origins)
+        parts, cuts, results = [], [], []
+        for (x, y), (detections, result) in zip(origins, self.recognizer.recognize_batch(tiles, imgsz=_model_size(self.tile_size))):
+            # Ramka dotykająca wewnętrznej krawędzi kafelka jest ucięta; krawędzie leżące na brzegu obrazu nie tną.
+            boxes = detections.boxes
+            cut = np.zeros(len(detections), dtype=bool)
+            if x > 0: cut |= boxes[:, 0] <= EDGE_TOLERANCE
+            if y > 0: cut |= boxes[:, 1] <= EDGE_TOLERANCE
+            if x + self.tile_size < width: cut |= boxes[:, 2] >= self.tile_size - EDGE_TOLERANCE
+            if y + self.tile_size < height: cut |= boxes[:, 3] >= self.tile_size - EDGE_TOLERANCE
+            parts.append(detections.shifted(x, y))
+            cuts.append(cut)
+            results.append(result)
+        detections = Detections.concatenate(parts)
+        return _merge_cut_boxes(detections, np.concatenate(cuts)).nms(config.IOU_THRESHOLD), results
+
+    def recognize_batch(self, images, batch_size=None):
+        for image in images:
+            yield self.recognize(image)
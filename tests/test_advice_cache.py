@@ -0,0 +1,62 @@
+import itertools
+
+import pytest
+
+import src.llm.advice_cache as advice_cache
+from src.llm.advice_cache import AdviceCache, canonical_suits, translate_suits
+from src.llm.llm_coach import cached_advice, store_advice
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = AdviceCache(str(tmp_path / 'advice.sqlite'), 1024 * 1024)
+    yield store
+    store.close()
+
+
+def test_isomorphic_hands_share_canonical_key():
+    key, mapping = canonical_suits(['AH', 'KH'], ['QH', '7D', '2C'])
+    assert canonical_suits(['AS', 'KS'], ['QS', '7C', '2D'])[0] == key
+    assert canonical_suits(['10H', 'KH'], ['QH'])[0] == canonical_suits(['TD', 'KD'], ['QD'])[0]
+    assert canonical_suits(['AH', 'KD'], [])[0] != canonical_suits(['AH', 'KH'], [])[0]
+    assert sorted(mapping) == sorted(mapping.values()) == sorted('HDCS')
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("Masz dwa kiery i asa kier.", "Masz dwa piki i asa pik."),
+    ("Uważaj na piki, przy pikach na stole kolor jest możliwy.", "Uważaj na kiery, przy kierach na stole kolor jest możliwy."),
+    ("Trefle nie pomogą, z treflem i dwoma treflami też nie.", "Karo nie pomogą, z karo i dwoma karo też nie."),
+    ("Dobierz do koloru karo, karowy strit", "Dobierz do koloru trefl, treflowy strit"),
+    ("Kierowy kolor ♥ i ♣", "Pikowy kolor ♠ i ♦"),
+    ("Kierownik kiera nie pomoże", "Kierownik pika nie pomoże"),
+])
+def test_translate_suits_handles_inflected_forms(text, expected):
+    assert translate_suits(text, {'H': 'S', 'S': 'H', 'C': 'D', 'D': 'C'}) == expected
+
+
+def test_cached_advice_is_translated_to_real_suits(store, monkeypatch):
+    monkeypatch.setattr(advice_cache.config, 'ADVICE_CACHE_ENABLED', True)
+    monkeypatch.setattr(advice_cache, '_cache', store)
+    key, mapping = canonical_suits(['AH', 'KH'], ['QH', '7D', '2C'])
+    store_advice(key, "Masz cztery kiery, dobierasz do koloru kierowego.", mapping)
+    other_key, other_mapping = canonical_suits(['AS', 'KS'], ['QS', '7C', '2D'])
+    assert other_key == key
+    assert cached_advice(key, other_mapping) == "Masz cztery piki, dobierasz do koloru pikowego."
+    assert cached_advice(key, mapping) == "Masz cztery kiery, dobierasz do koloru kierowego."
+
+
+def test_advice_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    clock = itertools.count()
+    monkeypatch.setattr(advice_cache.time, 'time', lambda: next(clock))
+    store = AdviceCache(str(tmp_path / 'advice.sqlite'), 30)
+    try:
+        store.put('a', 'x' * 10)
+        store.put('b', 'y' * 10)
+        store.put('c', 'z' * 10)
+        assert store.get('a') == 'x' * 10
+        store.put('d', 'w' * 10)
+        assert store.get('b') is None
+        assert [store.get(key) for key in 'acd'] == ['x' * 10, 'z' * 10, 'w' * 10]
+        assert len(store) == 3
+    finally:
+        store.close()
@@ -0,0 +1,57 @@
+import json
+import threading
+import urllib.request
+
+import cv2
+import numpy as np
+import pytest
+
+from game_analyzer import analysis_record
+from src.metrics import METRICS
+from src.pipeline.analysis_server import AnalysisServer
+from src.vision.detections import Detections
+
+NAMES = {0: 'AS', 1: 'KS', 2: 'QS', 3: '7D', 4: '2C'}
+
+
+class _Recognizer:
+    """Na każdym obrazie te same karty: dwie na dole (ręka) i trzy na górze (flop)."""
+
+    def recognize_batch(self, images, batch_size=None):
+        boxes = [[10, 300, 60, 350], [70, 300, 120, 350], [10, 10, 60, 60], [70, 10, 120, 60], [130, 10, 180, 60]]
+        for _ in images:
+            yield Detections(np.array(boxes), list(NAMES), [0.9] * len(NAMES), NAMES), None
+
+
+@pytest.fixture
+def server():
+    server = AnalysisServer(('127.0.0.1', 0), _Recognizer(), analysis_record, workers=1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _post(server, game):
+    _, image = cv2.imencode('.png', np.zeros((400, 200, 3), dtype=np.uint8))
+    request = urllib.request.Request(f"{server.url}/analyze?game={game}", data=image.tobytes(), method='POST')
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.loads(response.read())
+
+
+def test_worker_timings_reach_metrics_endpoint(server):
+    METRICS.reset()
+    record = _post(server, 'poker')
+    assert record['player_cards'] == ['AS', 'KS']
+    assert 0 < record['equity'] < 1
+    with urllib.request.urlopen(f"{server.url}/metrics", timeout=10) as response:
+        text = response.read().decode('utf-8')
+    assert 'stage="equity"' in text
+    assert 'stage="assign"' in text
+    assert METRICS.snapshot()['stages']['equity']['count'] == 1
+
+
+def test_worker_does_not_print_per_request(server, capfd):
+    capfd.readouterr()
+    _post(server, 'poker')
+    assert "ANALIZA" not in capfd.readouterr().out
@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+import pytest
+
+import src.llm.advice_cache as advice_cache
+from scripts.ollama_stub_server import start_stub_server
+from src.llm.async_coach import AsyncCoach, CoachSession
+
+REPLY = "Przy takim equity podbijaj, a na turnie sprawdzaj tylko małe zakłady przeciwnika."
+
+
+@pytest.fixture
+def stub_server():
+    server = start_stub_server(reply=REPLY, token_delay=0.02, load_delay=0)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def advice_store(tmp_path, monkeypatch):
+    store = advice_cache.AdviceCache(str(tmp_path / 'advice.sqlite'), 1024 * 1024)
+    monkeypatch.setattr(advice_cache.config, 'ADVICE_CACHE_ENABLED', True)
+    monkeypatch.setattr(advice_cache, '_cache', store)
+    yield store
+    store.close()
+
+
+def _chat_requests(server):
+    return [request for request in server.requests if request.get('messages')]
+
+
+def test_advise_streams_tokens_and_stores_advice(stub_server, advice_store):
+    tokens = []
+
+    async def advise():
+        coach = AsyncCoach(host=stub_server.url, timeout=10)
+        try:
+            return await coach.advise('poker|test', "prompt", on_token=tokens.append)
+        finally:
+            await coach.close()
+
+    assert asyncio.run(advise()) == REPLY
+    assert len(tokens) == len(REPLY.split(' '))
+    assert ''.join(tokens) == REPLY
+    assert len(advice_store) == 1
+
+
+def test_cached_advice_skips_server(stub_server):
+    async def advise_twice():
+        coach = AsyncCoach(host=stub_server.url, timeout=10)
+        try:
+            first = await coach.advise('blackjack|test', "prompt")
+            tokens = []
+            second = await coach.advise('blackjack|test', "prompt", on_token=tokens.append)
+            return first, second, tokens
+        finally:
+            await coach.close()
+
+    first, second, tokens = asyncio.run(advise_twice())
+    assert first == second == REPLY
+    assert tokens == [REPLY]
+    assert len(_chat_requests(stub_server)) == 1
+
+
+def test_new_situation_cancels_superseded_advice(stub_server, advice_store):
+    session = CoachSession(AsyncCoach(host=stub_server.url, timeout=10))
+    try:
+        first = session.request('poker|pierwsza', "prompt")
+        deadline = time.monotonic() + 5
+        while not session.text and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert session.text and not first.done()
+
+        # Ta sama sytuacja nie przerywa strumienia.
+        assert session.request('poker|pierwsza', "prompt") is first
+        second = session.request('poker|druga', "prompt")
+        assert first.cancelled()
+        assert second.result(timeout=10) == REPLY
+        assert session.key == 'poker|druga'
+        assert session.text == REPLY
+        assert len(advice_store) == 1
+    finally:
+        session.close()
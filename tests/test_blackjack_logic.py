@@ -0,0 +1,46 @@
+import pytest
+
+import src.config as config
+from src.logic.blackjack_ev import calculate_action_evs
+from src.logic.blackjack_logic import calculate_outcome_probabilities, full_shoe, remove_cards
+
+
+@pytest.mark.parametrize('player_hand, up_card', [(['10H', 'QD'], 'AS'), (['9H', '8D'], 'KS'), (['10C', '7S'], '6D')])
+def test_stand_probabilities_match_ev_engine(player_hand, up_card):
+    win, _, loss = calculate_outcome_probabilities(player_hand, up_card, 'S')
+    assert win - loss == pytest.approx(calculate_action_evs(player_hand, up_card)['S'])
+
+
+def test_unconditioned_probabilities_include_dealer_blackjack():
+    hand, up_card = ['10H', 'QD'], 'AS'
+    shoe = remove_cards(full_shoe(config.BLACKJACK_NUM_DECKS), hand + [up_card])
+    dealer_blackjack = shoe[9] / sum(shoe)
+    peeked = calculate_outcome_probabilities(hand, up_card, 'S', shoe)
+    unconditioned = calculate_outcome_probabilities(hand, up_card, 'S', shoe, no_blackjack=False)
+    assert unconditioned[0] == pytest.approx((1 - dealer_blackjack) * peeked[0])
+    assert unconditioned[2] == pytest.approx(dealer_blackjack + (1 - dealer_blackjack) * peeked[2])
+
+
+def test_peek_does_not_change_low_up_card():
+    assert calculate_outcome_probabilities(['10H', '6D'], '5S', 'H') == pytest.approx(
+        calculate_outcome_probabilities(['10H', '6D'], '5S', 'H', no_blackjack=False))
+
+
+@pytest.mark.parametrize('player_hand, up_card', [(['10H', '6D'], '10S'), (['2H', '3D'], '7S'), (['AH', '5D'], '9C'),
+                                                  (['4H', '4D', '2C'], '6S')])
+def test_hit_probabilities_follow_ev_engine_continuation(player_hand, up_card):
+    win, push, loss = calculate_outcome_probabilities(player_hand, up_card, 'H')
+    assert win + push + loss == pytest.approx(1.0)
+    assert win - loss == pytest.approx(calculate_action_evs(player_hand, up_card)['H'])
+
+
+@pytest.mark.parametrize('up_card', ['6S', 'AH', 'KC'])
+def test_player_blackjack_is_settled_after_peek(up_card):
+    assert calculate_outcome_probabilities(['AS', 'KD'], up_card, 'S') == (1.0, 0.0, 0.0)
+
+
+def test_player_blackjack_pushes_only_with_dealer_blackjack():
+    hand, up_card = ['AS', 'KD'], 'AH'
+    shoe = remove_cards(full_shoe(config.BLACKJACK_NUM_DECKS), hand + [up_card])
+    win, push, loss = calculate_outcome_probabilities(hand, up_card, 'S', shoe, no_blackjack=False)
+    assert (win, push, loss) == pytest.approx((1 - shoe[9] / sum(shoe), shoe[9] / sum(shoe), 0.0))
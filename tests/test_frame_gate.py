@@ -0,0 +1,67 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from src.vision.frame_gate import FrameGate
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class _CountingRecognizer:
+    def __init__(self):
+        self.calls = 0
+
+    def recognize(self, image):
+        self.calls += 1
+        return self.calls, None
+
+
+def _image(name):
+    return cv2.imread(os.path.join(TESTS_DIR, name))
+
+
+def _with_card(image, x_fraction, y_fraction):
+    # Biała karta z czerwonym indeksem, szeroka na 1/10 obrazu.
+    image = image.copy()
+    height, width = image.shape[:2]
+    card_w, card_h = width // 10, width // 10 * 7 // 5
+    x, y = int((width - card_w) * x_fraction), int((height - card_h) * y_fraction)
+    image[y:y + card_h, x:x + card_w] = 235
+    cv2.putText(image, 'K', (x + 5, y + card_h // 3), cv2.FONT_HERSHEY_SIMPLEX, card_w / 60, (0, 0, 200), 2)
+    return image
+
+
+def _with_noise(image, seed):
+    noise = np.random.default_rng(seed).integers(-6, 7, image.shape)
+    return np.clip(image.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+@pytest.mark.parametrize('name', ['test1.png', 'test2.jpg', 'test9.png'])
+def test_unchanged_frame_skips_inference(name):
+    recognizer = _CountingRecognizer()
+    gate = FrameGate(recognizer)
+    image = _image(name)
+    assert gate.recognize(image) == gate.recognize(image.copy()) == gate.recognize(_with_noise(image, 1))
+    assert recognizer.calls == 1
+    assert gate.stats() == {'hits': 2, 'misses': 1}
+
+
+@pytest.mark.parametrize('name', ['test1.png', 'test2.jpg', 'test9.png'])
+@pytest.mark.parametrize('x_fraction, y_fraction', [(0.1, 0.1), (0.5, 0.5), (0.9, 0.8)])
+def test_new_card_triggers_inference(name, x_fraction, y_fraction):
+    recognizer = _CountingRecognizer()
+    gate = FrameGate(recognizer)
+    image = _image(name)
+    gate.recognize(image)
+    assert gate.recognize(_with_card(image, x_fraction, y_fraction)) == (2, None)
+
+
+def test_inference_is_forced_after_refresh_frames():
+    recognizer = _CountingRecognizer()
+    gate = FrameGate(recognizer, refresh_frames=3)
+    image = _image('test1.png')
+    for _ in range(9):
+        gate.recognize(image)
+    assert recognizer.calls == 3
@@ -0,0 +1,53 @@
+import pytest
+
+import game_analyzer
+import src.llm.llm_coach as llm_coach
+
+
+def test_failed_advice_is_not_cached_with_equity(monkeypatch):
+    answers = iter(["Błąd komunikacji z Ollama", "Sprawdzaj."])
+    monkeypatch.setattr(llm_coach, 'get_poker_advice', lambda *args: next(answers))
+    game_analyzer._poker_state_result.cache_clear()
+
+    first = game_analyzer.analyze_spot('poker', 'AS KD', 'QH JC 2D', num_opponents=1, advise=True)
+    second = game_analyzer.analyze_spot('poker', 'AS KD', 'QH JC 2D', num_opponents=1, advise=True)
+    assert first['advice'] == "Błąd komunikacji z Ollama"
+    assert second['advice'] == "Sprawdzaj."
+    assert second['equity'] == first['equity']
+    assert game_analyzer._poker_state_result.cache_info().hits == 1
+
+
+def test_blackjack_advice_is_requested_for_every_analysis(monkeypatch):
+    calls = []
+    monkeypatch.setattr(llm_coach, 'get_blackjack_advice', lambda *args: calls.append(args) or "Dobieraj.")
+    game_analyzer._blackjack_state_result.cache_clear()
+
+    for _ in range(2):
+        record = game_analyzer.analyze_spot('blackjack', '10H 6D', '9S', advise=True)
+    assert record['advice'] == "Dobieraj."
+    assert len(calls) == 2
+    assert game_analyzer._blackjack_state_result.cache_info().hits == 1
+
+
+def test_blackjack_accepts_identical_cards_from_several_decks():
+    record = game_analyzer.analyze_spot('blackjack', '8H 8H', '8H')
+    assert record['player_cards'] == ['8H', '8H']
+    assert record['player_value'] == 16
+
+
+def test_poker_rejects_duplicate_cards():
+    with pytest.raises(ValueError):
+        game_analyzer.analyze_spot('poker', 'AS AS', '')
+    with pytest.raises(ValueError):
+        game_analyzer.analyze_spot('poker', 'AS KD', 'AS 7C 2D')
+
+
+def test_opponents_count_is_validated():
+    with pytest.raises(ValueError):
+        game_analyzer.analyze_spot('poker', 'AS KD', '', num_opponents=0)
+    assert game_analyzer.analyze_spot('poker', 'AS KD', '', num_opponents=3)['num_opponents'] == 3
+    assert game_analyzer.analyze_spot('poker', 'AS KD', '')['num_opponents'] == game_analyzer.config.POKER_NUM_OPPONENTS
+    with pytest.raises(ValueError, match='najwyżej dla 22'):
+        game_analyzer.analyze_spot('poker', 'AS KD', '', num_opponents=30)
+    with pytest.raises(ValueError, match='najwyżej dla 22'):
+        game_analyzer.analyze_spot('poker', 'AS KD', 'QH JC 2D 7S 9H', num_opponents=23)
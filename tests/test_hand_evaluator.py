@@ -0,0 +1,133 @@
+import random
+from itertools import combinations, combinations_with_replacement
+
+import pytest
+
+from src.logic.hand_evaluator import RANKS, SUITS, card_to_int, evaluate, hand_category
+
+# Evaluator sprzed przejścia na tablice (poker_logic._evaluate_hand), jako wzorzec kategorii i kolejności układów.
+RANK_VALUES = {rank: i for i, rank in enumerate(RANKS)}
+
+
+def _reference_is_straight(ranks):
+    unique_ranks = sorted(set(ranks), reverse=True)
+    if len(unique_ranks) < 5:
+        return False, None
+    for i in range(len(unique_ranks) - 4):
+        if unique_ranks[i] - unique_ranks[i + 4] == 4:
+            return True, unique_ranks[i]
+    # Stary evaluator sprawdzał strita A-5 przed wyższymi, więc A23456 oceniał jako strita do piątki;
+    # tablice poprawiają ten błąd (test_wheel_does_not_hide_higher_straight), wzorzec też.
+    if set(unique_ranks) >= {12, 0, 1, 2, 3}:
+        return True, 3
+    return False, None
+
+
+def reference_evaluate(hand):
+    ranks = sorted([RANK_VALUES[card[0]] for card in hand], reverse=True)
+    suits = [card[1] for card in hand]
+
+    is_flush = None
+    for suit in SUITS:
+        if suits.count(suit) >= 5:
+            is_flush = suit
+            break
+
+    flush_ranks = sorted([RANK_VALUES[card[0]] for card in hand if is_flush and card[1] == is_flush], reverse=True)
+    is_straight, straight_top_rank = _reference_is_straight(flush_ranks if is_flush else ranks)
+
+    if is_flush and is_straight:
+        return (8, straight_top_rank)
+
+    rank_counts = {rank: ranks.count(rank) for rank in set(ranks)}
+    counts = sorted(rank_counts.items(), key=lambda item: (item[1], item[0]), reverse=True)
+
+    if counts[0][1] == 4:
+        return (7, [counts[0][0]] + [r for r in ranks if r != counts[0][0]][:1])
+    if counts[0][1] == 3 and counts[1][1] >= 2:
+        return (6, [counts[0][0], counts[1][0]])
+    if is_flush:
+        return (5, flush_ranks[:5])
+    if is_straight:
+        return (4, straight_top_rank)
+    if counts[0][1] == 3:
+        return (3, [counts[0][0]] + [r for r in ranks if r != counts[0][0]][:2])
+    if counts[0][1] == 2 and counts[1][1] == 2:
+        return (2, [counts[0][0], counts[1][0]] + [r for r in ranks if r not in [counts[0][0], counts[1][0]]][:1])
+    if counts[0][1] == 2:
+        return (1, [counts[0][0]] + [r for r in ranks if r != counts[0][0]][:3])
+    return (0, ranks[:5])
+
+
+def _reference_key(hand):
+    category, kickers = reference_evaluate(hand)
+    return category, tuple(kickers) if isinstance(kickers, list) else (kickers,)
+
+
+def _rank_multiset_hands(size):
+    # Każdy układ rang (najwyżej 4 karty jednej rangi) bez koloru: kolory przydzielane po kolei,
+    # więc karty jednej rangi mają różne kolory, a żaden kolor nie ma 5 kart.
+    for ranks in combinations_with_replacement(RANKS, size):
+        if max(ranks.count(rank) for rank in set(ranks)) <= 4:
+            yield [rank + SUITS[i % 4] for i, rank in enumerate(ranks)]
+
+
+def _flush_hands():
+    # Wszystkie zestawy 5-7 różnych rang w jednym kolorze (kolory i pokery) oraz kolor z dodatkowymi kartami.
+    for size in (5, 6, 7):
+        for ranks in combinations(RANKS, size):
+            yield [rank + 'H' for rank in ranks]
+    rng = random.Random(1)
+    for ranks in combinations(RANKS, 5):
+        extra = rng.sample([rank + suit for rank in RANKS for suit in 'DCS'], 2)
+        yield [rank + 'H' for rank in ranks] + extra
+
+
+def _random_hands(size, count, seed):
+    deck = [rank + suit for rank in RANKS for suit in SUITS]
+    rng = random.Random(seed)
+    return [rng.sample(deck, size) for _ in range(count)]
+
+
+def _assert_same_ordering(hands):
+    values = {}
+    for hand in hands:
+        key = _reference_key(hand)
+        value = evaluate([card_to_int(card) for card in hand])
+        assert hand_category(value) == key[0], hand
+        assert values.setdefault(key, value) == value, hand
+    # Ta sama kolejność: wzorzec i tablice porządkują różne układy identycznie.
+    ordered = [values[key] for key in sorted(values)]
+    assert all(lower < higher for lower, higher in zip(ordered, ordered[1:]))
+
+
+@pytest.mark.parametrize('size', [5, 6, 7])
+def test_all_rank_multisets_match_reference(size):
+    _assert_same_ordering(_rank_multiset_hands(size))
+
+
+def test_flushes_match_reference():
+    _assert_same_ordering(_flush_hands())
+
+
+def test_random_hands_match_reference():
+    _assert_same_ordering(_random_hands(5, 20000, 5) + _random_hands(6, 20000, 6) + _random_hands(7, 60000, 7))
+
+
+def test_all_distinct_five_card_values():
+    # 7462 różne układy 5 kart, każdy osiągalny z wielozbioru rang albo koloru.
+    values = {evaluate([card_to_int(card) for card in hand]) for hand in _rank_multiset_hands(5)}
+    values |= {evaluate([card_to_int(card) for card in hand]) for hand in _flush_hands() if len(hand) == 5}
+    assert len(values) == 7462
+
+
+def test_wheel_does_not_hide_higher_straight():
+    six_high = evaluate([card_to_int(card) for card in ['AD', '2H', '3D', '4C', '5S', '6H', '9C']])
+    wheel = evaluate([card_to_int(card) for card in ['AD', '2H', '3D', '4C', '5S', 'KH', '9C']])
+    assert hand_category(six_high) == hand_category(wheel) and six_high > wheel
+
+
+@pytest.mark.parametrize('count', [4, 8])
+def test_evaluate_rejects_wrong_card_count(count):
+    with pytest.raises(ValueError):
+        evaluate(list(range(count)))
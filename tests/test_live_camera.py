@@ -0,0 +1,52 @@
+import threading
+
+import numpy as np
+import pytest
+
+import src.config as config
+from src.pipeline.live_camera import LiveCameraPipeline
+
+
+class _Camera:
+    def read(self):
+        return True, np.zeros((4, 4, 3), dtype=np.uint8)
+
+
+class _Recognizer:
+    """Zgłasza błąd dla pierwszych `failures` klatek (None - dla każdej)."""
+
+    def __init__(self, failures=None):
+        self.failures = failures
+        self.calls = 0
+        self.recognized = threading.Event()
+
+    def recognize(self, frame):
+        self.calls += 1
+        if self.failures is None or self.calls <= self.failures:
+            raise ValueError("uszkodzona klatka")
+        self.recognized.set()
+        return 'detekcje', None
+
+
+def test_inference_error_skips_frame(monkeypatch):
+    monkeypatch.setattr(config, 'LIVE_MAX_CONSECUTIVE_ERRORS', 10)
+    recognizer = _Recognizer(failures=3)
+    results = []
+    pipeline = LiveCameraPipeline(_Camera(), recognizer, results.append, None)
+    thread = threading.Thread(target=pipeline.run, kwargs={'show': False})
+    thread.start()
+    try:
+        assert recognizer.recognized.wait(5)
+    finally:
+        pipeline.stop_event.set()
+        thread.join(5)
+    assert pipeline.error is None
+    assert pipeline.snapshot()[1] == 'detekcje'
+
+
+def test_repeated_inference_errors_stop_pipeline(monkeypatch):
+    monkeypatch.setattr(config, 'LIVE_MAX_CONSECUTIVE_ERRORS', 3)
+    pipeline = LiveCameraPipeline(_Camera(), _Recognizer(), lambda detections: None, None)
+    with pytest.raises(RuntimeError) as error:
+        pipeline.run(show=False)
+    assert isinstance(error.value.__cause__, ValueError)
@@ -0,0 +1,30 @@
+import urllib.request
+
+from src.metrics import Metrics, start_prometheus_server
+
+
+def test_prometheus_server_listens_locally_by_default():
+    metrics = Metrics()
+    metrics.record('equity', 0.01)
+    server = start_prometheus_server(port=0, metrics=metrics)
+    try:
+        host, port = server.server_address[:2]
+        assert host == '127.0.0.1'
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=10) as response:
+            assert 'stage="equity"' in response.read().decode('utf-8')
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_drained_timings_merge_into_other_metrics():
+    worker, parent = Metrics(), Metrics()
+    worker.record('equity', 0.02)
+    worker.record('equity', 0.04)
+    worker.count('hands', 2)
+    parent.merge(worker.drain())
+    assert worker.snapshot() == {'stages': {}, 'counters': {}}
+    snapshot = parent.snapshot()
+    assert snapshot['stages']['equity']['count'] == 2
+    assert abs(snapshot['stages']['equity']['total_s'] - 0.06) < 1e-9
+    assert snapshot['counters'] == {'hands': 2}
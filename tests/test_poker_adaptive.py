@@ -0,0 +1,61 @@
+from concurrent.futures import Future
+
+import pytest
+
+import src.logic.poker_adaptive as poker_adaptive
+
+
+class _LazyFuture(Future):
+    """Paczka liczona dopiero przy odczycie wyniku, więc niepobrane wyniki można anulować."""
+
+    def __init__(self, fn, args):
+        super().__init__()
+        self.fn, self.args = fn, args
+
+    def result(self, timeout=None):
+        if not self.done() and self.set_running_or_notify_cancel():
+            try:
+                self.set_result(self.fn(*self.args))
+            except Exception as e:
+                self.set_exception(e)
+        return super().result(timeout)
+
+
+class _LazyPool:
+    def __init__(self, fail_after=None):
+        self.futures = []
+        self.fail_after = fail_after
+
+    def submit(self, fn, *args):
+        if self.fail_after is not None and len(self.futures) >= self.fail_after:
+            fn = _fail
+        self.futures.append(_LazyFuture(fn, args))
+        return self.futures[-1]
+
+
+def _fail(*args):
+    raise RuntimeError("proces puli zakończył się błędem")
+
+
+def _run(monkeypatch, pool, target_stderr):
+    monkeypatch.setattr(poker_adaptive, '_get_pool', lambda workers: pool)
+    return poker_adaptive.calculate_equity_adaptive(['AH', 'KD'], [], 3, target_stderr=target_stderr,
+                                                    max_simulations=200000, chunk_size=1000, workers=4, seed=1)
+
+
+def test_early_stop_cancels_outstanding_chunks(monkeypatch):
+    pool = _LazyPool()
+    equity, (low, high), samples = _run(monkeypatch, pool, target_stderr=0.01)
+    assert low <= equity <= high
+    assert samples < 200000
+    assert all(future.done() for future in pool.futures)
+    assert any(future.cancelled() for future in pool.futures)
+    assert samples == 1000 + 1000 * sum(not future.cancelled() for future in pool.futures)
+
+
+def test_failed_chunk_cancels_outstanding_chunks(monkeypatch):
+    pool = _LazyPool(fail_after=2)
+    with pytest.raises(RuntimeError):
+        _run(monkeypatch, pool, target_stderr=0.0001)
+    assert all(future.done() for future in pool.futures)
+    assert sum(future.cancelled() for future in pool.futures) == 3
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+import game_analyzer
+from src.logic.poker_logic import calculate_equity
+from src.logic.poker_ranges import calculate_range_equity
+from src.vision.detections import Detections
+
+NAMES = {i: card for i, card in enumerate(['AH', 'KH', 'QH', '7D', '2C', '9S', '3D', '4S'])}
+
+
+def _detections(count):
+    # Dwie najniższe karty to ręka, reszta leży wyżej w jednym rzędzie.
+    boxes = [[10 + 60 * i, 300, 50 + 60 * i, 350] if i < 2 else [10 + 60 * i, 10, 50 + 60 * i, 60] for i in range(count)]
+    return Detections(np.array(boxes, dtype=float), np.arange(count), np.ones(count), NAMES)
+
+
+@pytest.mark.parametrize('engine', ['numpy', 'python'])
+@pytest.mark.parametrize('my_cards, community_cards', [
+    ([], ['AS']),
+    (['AS'], []),
+    (['AS', 'KD', 'QC'], []),
+    (['AS', 'KD'], ['2C', '3C', '4C', '5C', '6C', '7C']),
+    (['AS', 'KD'], ['AS']),
+])
+def test_calculate_equity_rejects_invalid_card_counts(engine, my_cards, community_cards):
+    with pytest.raises(ValueError):
+        calculate_equity(my_cards, community_cards, 1, 100, exact_budget=0, engine=engine)
+
+
+def test_calculate_equity_valid_spot():
+    assert 0.0 < calculate_equity(['AH', 'KH'], ['QH', '7D', '2C'], 1, 2000, exact_budget=0) < 1.0
+
+
+@pytest.mark.parametrize('count', [1, 8])
+def test_analyze_poker_detections_skips_invalid_hands(count):
+    assert game_analyzer.analyze_poker_detections(_detections(count), advise=False) is None
+
+
+def test_analyze_poker_detections_flop():
+    result = game_analyzer.analyze_poker_detections(_detections(5), advise=False)
+    assert result['player_cards'] == ['AH', 'KH']
+    assert result['community_cards'] == ['QH', '7D', '2C']
+    assert result['stage'] == 'Flop'
+
+
+class _RecordingCoach:
+    key = None
+
+    def request(self, key, prompt, suit_mapping, on_token=None):
+        self.key, self.prompt = key, prompt
+
+
+def test_streamed_advice_uses_opponents_from_ranges(monkeypatch):
+    monkeypatch.setattr(game_analyzer.config, 'POKER_OPPONENT_RANGES', ['QQ+', 'any', 'any'])
+    coach = _RecordingCoach()
+    result = game_analyzer.analyze_live_detections(_detections(5), game_analyzer.analyze_poker_detections, coach)
+    assert result['num_opponents'] == 3
+    assert '|3|' in coach.key
+    assert 'Liczba przeciwników: 3' in coach.prompt
+
+
+@pytest.mark.parametrize('my_cards, community_cards', [(['AS'], []), (['AS', 'KD'], ['2C', '3C', '4C', '5C', '6C', '7C']),
+                                                       (['AS', 'KD'], ['AS', '7C', '2D'])])
+def test_range_equity_rejects_invalid_cards(my_cards, community_cards):
+    with pytest.raises(ValueError):
+        calculate_range_equity(my_cards, community_cards, ['QQ+'])
+
+
+@pytest.mark.parametrize('engine', ['numpy', 'python'])
+@pytest.mark.parametrize('community_cards, num_opponents', [([], 23), ([], 30), (['QH', '7D', '2C'], 23)])
+def test_calculate_equity_rejects_more_opponents_than_seats(engine, community_cards, num_opponents):
+    with pytest.raises(ValueError):
+        calculate_equity(['AS', 'KD'], community_cards, num_opponents, 100, engine=engine)
+
+
+def test_calculate_equity_accepts_full_table():
+    assert 0.0 <= calculate_equity(['AS', 'KD'], [], 22, 200, exact_budget=0) <= 1.0
+
+
+@pytest.mark.parametrize('engine', ['numpy', 'python'])
+def test_exact_equity_agrees_with_monte_carlo(engine):
+    # Turn przeciwko jednemu przeciwnikowi: 46 * C(45, 2) = 45540 rozdań mieści się w budżecie dokładnego liczenia.
+    my_cards, community_cards = ['AH', 'KH'], ['QH', '7D', '2C', '9S']
+    exact = calculate_equity(my_cards, community_cards, 1, exact_budget=50000)
+    sampled = calculate_equity(my_cards, community_cards, 1, 40000, exact_budget=0, engine=engine)
+    assert abs(exact - sampled) < 0.015
+
+
+@pytest.mark.parametrize('engine', ['numpy', 'python', 'ranges'])
+def test_tie_splits_pot_only_among_tied_players(engine):
+    # Strit do króla: remisuje każdy przeciwnik z 9, więc często tylko jeden z dwóch dzieli pulę (1/2, nie 1/3).
+    my_cards, community_cards = ['2C', '9D'], ['KD', 'QC', 'JH', 'TS', '2S']
+    exact = calculate_equity(my_cards, community_cards, 2, exact_budget=10 ** 6)
+    if engine == 'ranges':
+        sampled = calculate_range_equity(my_cards, community_cards, ['any', 'any'], simulations=40000, seed=0)
+    else:
+        sampled = calculate_equity(my_cards, community_cards, 2, 20000, exact_budget=0, engine=engine)
+    assert abs(exact - 0.5859) < 0.001
+    assert abs(exact - sampled) < 0.01
@@ -0,0 +1,27 @@
+import random
+
+import numpy as np
+import pytest
+
+import src.config as config
+from src.logic.hand_evaluator import evaluate
+from src.logic.poker_logic import calculate_equity
+from src.logic.poker_vectorized import _score_holdings, deal
+
+
+def test_score_holdings_matches_hand_evaluator():
+    dealt = deal(range(52), 2 * 3 + 5, 2000, np.random.default_rng(0))
+    holdings, boards = dealt[:, :6].reshape(-1, 3, 2), dealt[:, 6:]
+    scores = _score_holdings(holdings, boards)
+    expected = [[evaluate(list(hand) + list(board)) for hand in hands] for hands, board in zip(holdings.tolist(), boards.tolist())]
+    assert scores.tolist() == expected
+
+
+@pytest.mark.parametrize('community_cards, num_opponents', [([], 3), (['QH', '7D', '2C'], 3), (['QH', '7D', '2C', '9S'], 5)])
+def test_numpy_engine_matches_python_loop(community_cards, num_opponents, monkeypatch):
+    monkeypatch.setattr(config, 'POKER_USE_PREFLOP_TABLE', False)
+    random.seed(0)
+    kwargs = dict(simulations=20000, exact_budget=0)
+    python_equity = calculate_equity(['AH', 'KH'], community_cards, num_opponents, engine='python', **kwargs)
+    numpy_equity = calculate_equity(['AH', 'KH'], community_cards, num_opponents, engine='numpy', **kwargs)
+    assert abs(python_equity - numpy_equity) < 0.02
@@ -0,0 +1,61 @@
+import numpy as np
+
+from src.vision.detections import Detections
+from src.vision.roi import TiledRecognizer, tile_origins
+
+NAMES = {0: 'AS', 1: 'KH'}
+
+
+class _TileDetector:
+    """Udaje model: na każdym kafelku zgłasza widoczną w nim część kart (ramka przycięta do kafelka)."""
+
+    def __init__(self, cards, tile_size, width, height, overlap):
+        self.cards = cards
+        self.origins = [(x, y) for y in tile_origins(height, tile_size, overlap) for x in tile_origins(width, tile_size, overlap)]
+        self.tile_size = tile_size
+
+    def recognize_batch(self, tiles, imgsz=None):
+        for (x, y), tile in zip(self.origins, tiles):
+            boxes, class_ids = [], []
+            for class_id, (x1, y1, x2, y2) in self.cards:
+                box = [max(x1 - x, 0), max(y1 - y, 0), min(x2 - x, self.tile_size), min(y2 - y, self.tile_size)]
+                if box[2] > box[0] and box[3] > box[1]:
+                    boxes.append(box)
+                    class_ids.append(class_id)
+            yield Detections(np.array(boxes).reshape(-1, 4), class_ids, [0.9] * len(boxes), NAMES), None
+
+
+def _recognize(cards, width=1500, height=600, tile_size=832, overlap=0.2):
+    detector = _TileDetector(cards, tile_size, width, height, overlap)
+    tiled = TiledRecognizer(detector, tile_size=tile_size, overlap=overlap)
+    detections, _ = tiled.recognize(np.zeros((height, width, 3), dtype=np.uint8))
+    return detections
+
+
+def test_card_larger_than_overlap_is_merged_across_tiles():
+    # Kafelki mają 832 px i zachodzą na siebie o około 165 px, a karta ma 400 px szerokości.
+    card = (500, 100, 900, 500)
+    detections = _recognize([(0, card)])
+    assert detections.labels == ['AS']
+    np.testing.assert_allclose(detections.boxes[0], card)
+
+
+def test_card_inside_overlap_is_reported_once():
+    card = (700, 100, 800, 250)
+    detections = _recognize([(1, card)])
+    assert detections.labels == ['KH']
+    np.testing.assert_allclose(detections.boxes[0], card)
+
+
+def test_cards_away_from_seams_are_kept():
+    cards = [(0, (50, 50, 200, 250)), (1, (1200, 300, 1400, 550))]
+    detections = _recognize(cards)
+    assert sorted(detections.labels) == ['AS', 'KH']
+    assert len(detections) == 2
+
+
+def test_card_spanning_three_tiles_is_merged():
+    card = (600, 100, 1500, 300)
+    detections = _recognize([(0, card)], width=2000, height=400)
+    assert len(detections) == 1
+    np.testing.assert_allclose(detections.boxes[0], card)
@@ -0,0 +1,60 @@
+import threading
+
+import numpy as np
+
+from game_analyzer import analyze_blackjack_detections
+from src.logic.blackjack_ev import ShoeTracker
+from src.vision.detections import Detections
+
+FULL = 4 * 52
+
+
+def test_cards_are_counted_once_per_round():
+    tracker = ShoeTracker(num_decks=4, empty_frames=2)
+    tracker.observe(['10H', '6D', '9S'])
+    tracker.observe(['10H', '6D', '9S'])
+    tracker.observe(['10H', '6D', '9S', '5C'])
+    assert tracker.cards_remaining == FULL - 4
+
+
+def test_identical_cards_from_several_decks_are_counted():
+    tracker = ShoeTracker(num_decks=4)
+    shoe = tracker.observe(['8H', '8H', 'KS'])
+    assert tracker.cards_remaining == FULL - 3
+    assert shoe[7] == 16 - 2
+
+
+def test_rounds_end_after_several_empty_frames():
+    tracker = ShoeTracker(num_decks=4, empty_frames=3)
+    tracker.observe(['10H', '6D', '9S'])
+    tracker.observe([])
+    tracker.observe(['10H', '6D', '9S'])  # pojedyncza pusta klatka to zgubione detekcje, nie nowe rozdanie
+    assert tracker.cards_remaining == FULL - 3
+
+    for _ in range(3):
+        tracker.observe([])
+    tracker.observe(['10H', 'AS', '7C'])
+    tracker.new_round()
+    tracker.observe(['10H', '2D', 'QC'])
+    assert tracker.cards_remaining == FULL - 9
+
+    tracker.reset()
+    assert tracker.cards_remaining == FULL
+
+
+def test_cards_are_counted_without_player_dealer_split():
+    tracker = ShoeTracker(num_decks=4)
+    detections = Detections(np.array([[10, 300, 60, 350]]), [0], [0.9], {0: 'AS'})
+    assert analyze_blackjack_detections(detections, tracker, advise=False) is None
+    assert tracker.cards_remaining == FULL - 1
+
+
+def test_concurrent_observers_count_cards_once():
+    tracker = ShoeTracker(num_decks=4)
+    threads = [threading.Thread(target=lambda: [tracker.observe(['10H', '6D', '9S']) for _ in range(500)]) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    tracker.new_round()
+    for thread in threads:
+        thread.join()
+    assert tracker.cards_remaining in (FULL - 3, FULL - 6)
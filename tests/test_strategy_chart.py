@@ -0,0 +1,25 @@
+from itertools import product
+
+import pytest
+
+import src.logic.strategy_chart as strategy_chart
+from src.logic.blackjack_logic import Rules, get_basic_strategy_move
+
+
+@pytest.mark.parametrize('rules', [Rules(decks, *flags) for decks in (1, 2, 4, 6, 8) for flags in product((False, True), repeat=3)])
+def test_supported_rules_have_prebuilt_chart(rules):
+    path = strategy_chart.chart_path(rules)
+    assert strategy_chart._read_chart(path, rules) is not None, path
+
+
+def test_missing_chart_falls_back_without_generating(monkeypatch, capsys):
+    def build_chart(rules):
+        raise AssertionError("tablica nie może być generowana podczas analizy")
+
+    monkeypatch.setattr(strategy_chart, 'build_chart', build_chart)
+    strategy_chart.load_chart.cache_clear()
+    rules = Rules(3, False, False, True)
+    fallback = Rules(*strategy_chart.config.BLACKJACK_FALLBACK_CHART_RULES)
+    assert strategy_chart.load_chart(rules) == strategy_chart.load_chart(fallback)
+    assert "build_strategy_chart.py --decks 3" in capsys.readouterr().err
+    assert get_basic_strategy_move(['10H', '6D'], '10S', rules)[1] == 'H'
@@ -0,0 +1,126 @@
+import json
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from game_analyzer import analyze_videos
+from src.pipeline.video_streams import MultiStreamProcessor, VideoStream, VideoWriterThread
+from src.vision.detections import Detections
+
+FRAMES = 30
+FPS = 30
+NAMES = {0: 'AS', 1: 'KS', 2: 'QS', 3: '7D', 4: '2C', 5: '9H'}
+
+
+def _frame_index(frame):
+    # Klatka testowa ma jednolitą jasność 8 * indeks.
+    return int(round(frame.mean() / 8))
+
+
+@pytest.fixture
+def video_path(tmp_path):
+    path = str(tmp_path / 'stol.avi')
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), FPS, (64, 48))
+    for i in range(FRAMES):
+        writer.write(np.full((48, 64, 3), 8 * i, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def _read_all(stream):
+    items = []
+    while not stream.exhausted:
+        item = stream.get()
+        if item is None:
+            time.sleep(0.001)
+            continue
+        items.append(item)
+    return items
+
+
+@pytest.mark.parametrize('stride, sample_fps, expected_stride', [(3, None, 3), (None, 10, 3), (None, 30, 1), (4, 15, 2)])
+def test_stream_decodes_every_nth_frame(video_path, stride, sample_fps, expected_stride):
+    stream = VideoStream(video_path, stride=stride, sample_fps=sample_fps)
+    items = _read_all(stream)
+    assert stream.stride == expected_stride
+    assert [index for index, _, _ in items] == list(range(0, FRAMES, expected_stride))
+    assert [_frame_index(frame) for _, _, frame in items] == list(range(0, FRAMES, expected_stride))
+    assert [timestamp for _, timestamp, _ in items] == pytest.approx([i / FPS for i in range(0, FRAMES, expected_stride)])
+    assert stream.output_fps == pytest.approx(FPS / expected_stride)
+
+
+class _ListStream:
+    def __init__(self, name, count):
+        self.name = name
+        self.items = [(i, i / FPS, (name, i)) for i in range(count)]
+
+    def get(self):
+        return self.items.pop(0) if self.items else None
+
+    @property
+    def exhausted(self):
+        return not self.items
+
+    def stop(self):
+        pass
+
+
+class _BatchRecorder:
+    def __init__(self):
+        self.batches = []
+
+    def recognize_batch(self, images, batch_size=None):
+        self.batches.append(list(images))
+        return [(image, None) for image in images]
+
+
+def test_batches_take_frames_round_robin():
+    streams = [_ListStream('a', 4), _ListStream('b', 4), _ListStream('c', 1)]
+    recognizer = _BatchRecorder()
+    processed = []
+    processor = MultiStreamProcessor(streams, recognizer, lambda i, item, detections: processed.append(detections), batch_size=4)
+    processor.run()
+
+    assert recognizer.batches[0] == [('a', 0), ('b', 0), ('c', 0), ('a', 1)]
+    # Następna paczka zaczyna od kolejnego strumienia.
+    assert recognizer.batches[1] == [('b', 1), ('a', 2), ('b', 2), ('a', 3)]
+    assert recognizer.batches[2] == [('b', 3)]
+    for name in 'ab':
+        assert [i for stream, i in processed if stream == name] == [0, 1, 2, 3]
+
+
+def test_failed_encoder_does_not_block(tmp_path):
+    writer = VideoWriterThread(str(tmp_path / 'nagranie.mp4'), FPS, fourcc='ZZZZ', queue_size=1)
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    with pytest.raises(IOError):
+        for _ in range(100):
+            writer.put(frame)
+    writer.close()
+    assert isinstance(writer.error, IOError)
+    assert writer.written == 0
+
+
+class _HandRecognizer:
+    """Klatki 0-14: ręka i flop; od klatki 15 dochodzi turn. Klatki 5-9 bez karty 2C (chwilowo zasłonięta)."""
+
+    def recognize_batch(self, images, batch_size=None):
+        boxes = [[10, 300, 60, 350], [70, 300, 120, 350], [10, 10, 60, 60], [70, 10, 120, 60], [130, 10, 180, 60], [190, 10, 240, 60]]
+        for image in images:
+            index = _frame_index(image)
+            class_ids = [0, 1, 2, 3, 4, 5] if index >= 15 else [0, 1, 2, 3] if 5 <= index < 10 else [0, 1, 2, 3, 4]
+            yield Detections(np.array(boxes)[class_ids], class_ids, [0.9] * len(class_ids), NAMES), None
+
+
+def test_records_are_written_only_when_hand_changes(video_path, tmp_path):
+    output = tmp_path / 'wyniki.jsonl'
+    analyze_videos([video_path], 'poker', _HandRecognizer(), str(output))
+    records = [json.loads(line) for line in output.read_text(encoding='utf-8').splitlines()]
+
+    assert [record['frame'] for record in records] == [0, 5, 10, 15]
+    assert records[0]['community_cards'] == ['QS', '7D', '2C']
+    assert records[-1]['community_cards'] == ['QS', '7D', '2C', '9H']
+    assert records[-1]['time_s'] == pytest.approx(0.5)
+    assert all(record['stream'] == video_path for record in records)
+    assert set(records[0]) >= {'image', 'detections', 'player_cards', 'equity', 'stage'}